@@ -24,10 +24,22 @@ API_CONFIG = {
             'gpt-4': 8192,
             'gpt-4-turbo-preview': 128000
         },
-        'pricing': {  # Per 1K tokens (approximate)
-            'gpt-3.5-turbo': 0.002,
-            'gpt-4': 0.03,
-            'gpt-4-turbo-preview': 0.01
+        'pricing': {  # USD per 1K tokens (approximate); cached prompt tokens are billed at a discount
+            'gpt-3.5-turbo': {'prompt': 0.0005, 'completion': 0.0015, 'cached': 0.00025},
+            'gpt-4': {'prompt': 0.03, 'completion': 0.06, 'cached': 0.015},
+            'gpt-4-turbo-preview': {'prompt': 0.01, 'completion': 0.03, 'cached': 0.005}
+        },
+        'rate_limits': {  # Shared per API key and model across all sessions
+            'gpt-3.5-turbo': {'rpm': 3500, 'tpm': 90000},
+            'gpt-4': {'rpm': 500, 'tpm': 10000},
+            'gpt-4-turbo-preview': {'rpm': 500, 'tpm': 30000},
+            'default': {'rpm': 500, 'tpm': 10000}
+        },
+        'batch_discount': 0.5  # Batch API price relative to interactive calls
+    },
+    'anthropic': {  # Only used as a hedge backup (see GENERATION_SETTINGS)
+        'pricing': {
+            'claude-3-5-haiku-latest': {'prompt': 0.0008, 'completion': 0.004, 'cached': 0.00008}
         }
     }
 }
@@ -275,19 +287,77 @@ GENERATION_SETTINGS = {
     'default_max_tokens': 1500,
     'default_temperature': 0.7,
     'max_retries': 3,
-    'timeout_seconds': 30,
+    'timeout_seconds': 30,  # Per attempt
+    'deadline_seconds': 90,  # Overall budget across retries
+    'retry_base_delay': 1.0,
+    'retry_max_delay': 20.0,
+    'max_parallel_requests': 4,  # Concurrent API calls within one generation
+    'series_post_retries': 1,  # Extra attempts for a single failed post in a parallel series
+    'max_input_tokens': 1200,  # User-provided text is truncated to this many tokens
+    'min_completion_tokens': 64,  # Smallest completion budget left when shrinking to fit the context
+    'context_overflow': 'compress',  # 'compress' truncates the user prompt, 'reject' fails fast
+    'encoding_retry_seconds': 30,  # Wait before retrying a failed tiktoken download, doubled per failure
+    'encoding_retry_max_seconds': 15 * 60,
+    'adaptive_max_tokens': True,  # Size max_tokens from observed completion lengths
+    'adaptive_min_samples': 10,
+    'max_continuations': 2,  # Follow-up requests when a completion is cut off at max_tokens
+    'hedging_enabled': False,  # Race a backup request when the first token is slow (non-streamed calls only)
+    'hedge_delay_seconds': 2.0,  # Time to wait for the primary's first token
+    'hedge_backup': 'fallback',  # 'same' model, 'fallback' model or 'anthropic'
+    'hedge_fallback_model': 'gpt-3.5-turbo',
+    'hedge_anthropic_model': 'claude-3-5-haiku-latest',
     'history_limit': 100,
     'export_formats': ['txt', 'json', 'csv', 'pdf'],
     'supported_languages': ['tr', 'en'],
     'default_language': 'tr'
 }
 
+# Response Cache Settings
+CACHE_SETTINGS = {
+    'enabled': True,
+    'memory_max_entries': 256,
+    'ttl_seconds': 6 * 60 * 60,
+    'disk_enabled': True,
+    'disk_max_bytes': 50 * 1024 * 1024,
+    'key_status_ttl_seconds': 60 * 60,  # Validation result and model list per API key
+    'invalid_key_ttl_seconds': 5 * 60,
+    'key_check_error_ttl_seconds': 30,  # Inconclusive checks (network errors) are retried soon
+    'analysis_memo_max_entries': 2048  # ContentAnalyzer results, keyed by content hash
+}
+
+# Shared HTTP Connection Pool Settings
+HTTP_POOL_SETTINGS = {
+    'max_connections': 100,
+    'max_keepalive_connections': 20,
+    'keepalive_expiry': 60,  # Seconds an idle connection is kept open
+    'connect_timeout': 10,
+    'max_generators': 64  # Long-lived generators kept per process
+}
+
+# Per-model Circuit Breaker Settings
+CIRCUIT_BREAKER_SETTINGS = {
+    'enabled': True,
+    'window_seconds': 60,  # Recent calls considered when deciding to trip
+    'min_calls': 5,
+    'failure_rate_threshold': 0.5,  # Timeouts, connection errors and 5xx responses
+    'slow_call_seconds': 25,
+    'slow_call_rate_threshold': 0.8,
+    'open_seconds': 30,  # Fail fast this long before probing the model again
+    'half_open_max_calls': 1,
+    'probe_timeout_seconds': 120,  # A probe silent this long counts as failed and re-opens the breaker
+    'fallback_model': 'gpt-3.5-turbo'  # Used while a model's breaker is open; None fails fast
+}
+
 # File Paths
 PATHS = {
     'data_dir': 'data',
     'exports_dir': 'data/exports',
     'templates_dir': 'data/templates',
     'history_file': 'data/history.json',
+    'cache_dir': 'data/cache',
+    'batch_dir': 'data/batches',
+    'usage_ledger': 'data/usage_ledger.jsonl',
+    'metrics_file': 'data/metrics.prom',
     'settings_file': 'data/user_settings.json',
     'logs_dir': 'logs'
 }
@@ -1,6 +1,15 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+import contextvars
+import inspect
 from utils.api_handler import APIHandler
-from typing import Dict, List, Optional
+from utils.batch_runner import (BatchRunner, OpenAIBatchRunner, read_batch_output,
+                                read_manifest, write_batch_file)
+from utils.client_registry import key_id
+from utils.config import GENERATION_SETTINGS
+from utils.tokenizer import get_completion_sizer, get_tokenizer
+from utils.usage_ledger import get_usage_ledger
+from typing import Any, Callable, Dict, List, Optional
 
 class BaseGenerator(ABC):
     """Base class for all content generators"""
@@ -15,7 +24,7 @@ class BaseGenerator(ABC):
         """
         self.api_key = api_key
         self.model = model
-        self.api_handler = APIHandler(api_key, model)
+        self.api_handler = APIHandler(api_key, model, generator=self.__class__.__name__)
     
     @abstractmethod
     def generate_content(self, **kwargs) -> Dict:
@@ -64,8 +73,9 @@ class BaseGenerator(ABC):
         text = re.sub(r'\s+', ' ', text)
         
         # Limit length to prevent excessive token usage
-        if len(text) > 5000:
-            text = text[:5000] + "..."
+        truncated = get_tokenizer(self.model).truncate(text, GENERATION_SETTINGS['max_input_tokens'])
+        if truncated != text:
+            text = truncated + "..."
         
         return text
     
@@ -113,19 +123,20 @@ class BaseGenerator(ABC):
     
     def get_usage_stats(self) -> Dict:
         """
-        Get usage statistics for the generator
+        Get usage statistics for this generator and API key from the usage ledger
         
         Returns:
             Dictionary with usage stats
         """
-        # This would typically connect to a database or file
-        # For now, return dummy stats
+        usage = get_usage_ledger().summary(generator=self.__class__.__name__, key_id=key_id(self.api_key))
         return {
-            "total_generations": 0,
-            "total_tokens_used": 0,
-            "average_generation_time": 0,
-            "favorite_tone": "professional",
-            "most_used_platform": "instagram"
+            "total_generations": usage["calls"],
+            "total_tokens_used": usage["total_tokens"],
+            "prompt_tokens": usage["prompt_tokens"],
+            "completion_tokens": usage["completion_tokens"],
+            "cached_tokens": usage["cached_tokens"],
+            "total_cost": usage["cost"],
+            "average_generation_time": usage["average_latency"]
         }
     
     def export_content(self, content: str, filename: str, format_type: str = "txt") -> bool:
@@ -169,6 +180,121 @@ class BaseGenerator(ABC):
             print(f"Export failed: {str(e)}")
             return False
     
+    def _sized_max_tokens(self, bucket: str, default: int) -> int:
+        """Size max_tokens from observed completions in bucket, if adaptive sizing is on"""
+        if not GENERATION_SETTINGS['adaptive_max_tokens']:
+            return default
+        return get_completion_sizer().suggest(bucket, default)
+    
+    def _record_completion(self, bucket: str, result: Dict) -> Dict:
+        """Feed a finished result into adaptive max_tokens sizing"""
+        get_completion_sizer().record(bucket, result)
+        return result
+    
+    def _run_parallel(self, calls: List[Callable[[], Any]]) -> List[Any]:
+        """
+        Run independent API calls concurrently
+        
+        Args:
+            calls: Zero-argument callables, e.g. lambdas around generate_content
+        
+        Returns:
+            Return values in the same order as calls
+        """
+        max_workers = min(len(calls), GENERATION_SETTINGS['max_parallel_requests'])
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [self._submit_with_context(executor, call) for call in calls]
+            return [future.result() for future in futures]
+    
+    def _submit(self, call: Callable[[], Any]) -> Future:
+        """Start a single call in the background and return its future"""
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = self._submit_with_context(executor, call)
+        executor.shutdown(wait=False)
+        return future
+    
+    def _submit_with_context(self, executor: ThreadPoolExecutor, call: Callable[[], Any]) -> Future:
+        """Submit call so it sees the caller's context variables (e.g. the progress hook)"""
+        return executor.submit(contextvars.copy_context().run, call)
+    
+    def run_batch(self,
+                  input_path: str,
+                  output_path: str,
+                  runner: Optional[BatchRunner] = None,
+                  poll_interval: float = 30,
+                  timeout: float = 24 * 60 * 60) -> Dict:
+        """
+        Submit an exported batch file and wait for its output
+        
+        Args:
+            input_path: JSONL written by one of the export_*_batch methods
+            output_path: Where to save the batch output JSONL
+            runner: Batch runner to use (defaults to the OpenAI Batch API)
+            poll_interval: Seconds between status checks
+            timeout: Longest time to wait for the batch
+        
+        Returns:
+            Dict with batch_id, status and output_path
+        """
+        runner = runner or OpenAIBatchRunner(self.api_handler.client)
+        return runner.run(input_path, output_path, poll_interval, timeout)
+    
+    def _batch_params(self, method: Callable, params: Dict) -> Dict:
+        """Fill in the defaults of a generate_* method for one batch item"""
+        bound = inspect.signature(method).bind(**params)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        
+        # Batch requests never touch the interactive cache or in-flight calls
+        arguments.pop('bypass_cache', None)
+        arguments.pop('coalesce', None)
+        return arguments
+    
+    def _write_batch(self, lines: List[Dict], manifest: Dict, input_path: str) -> Dict:
+        """Write batch lines with the manifest needed to post-process the output"""
+        write_batch_file(lines, input_path, manifest)
+        return {
+            "success": True,
+            "input_path": input_path,
+            "request_count": len(lines),
+            "item_count": len(manifest)
+        }
+    
+    def _read_batch(self, output_path: str, input_path: str):
+        """
+        Read batch output together with the manifest written at export time
+        
+        Returns:
+            Tuple of (manifest, dict of custom_id to result dict)
+        """
+        manifest = read_manifest(input_path)
+        outputs = read_batch_output(output_path)
+        results = {
+            custom_id: self.api_handler.batch_result(output)
+            for custom_id, output in outputs.items()
+        }
+        return manifest, results
+    
+    def _missing_batch_result(self, custom_id: str) -> Dict:
+        """Failed result for a manifest entry that has no line in the batch output"""
+        return {
+            "success": False,
+            "error": f"Batch çıktısında '{custom_id}' isteğinin sonucu bulunamadı.",
+            "error_type": "batch"
+        }
+    
+    def _summarize_batch(self, results: Dict) -> Dict:
+        """Aggregate per-item batch results"""
+        succeeded = [result for result in results.values() if result['success']]
+        return {
+            "success": bool(succeeded),
+            "results": results,
+            "succeeded": len(succeeded),
+            "failed": len(results) - len(succeeded),
+            "tokens_used": sum(result['tokens_used'] for result in succeeded),
+            "cost_estimate": round(sum(result['cost_estimate'] for result in succeeded), 4)
+        }
+    
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
         from datetime import datetime
@@ -1,5 +1,9 @@
+import time
+from typing import Optional
 from generators.base_generator import BaseGenerator
 from utils.api_handler import PromptOptimizer
+from utils.batch_runner import build_batch_line
+from utils.metrics import labeled, timed
 from prompts.email_prompts import EmailPrompts
 
 class EmailGenerator(BaseGenerator):
@@ -19,6 +23,7 @@ class EmailGenerator(BaseGenerator):
         # Default to generate_email if no specific method is called
         return self.generate_email(**kwargs)
     
+    @labeled("email_type")
     def generate_email(self,
                       email_type: str,
                       company_name: str,
@@ -36,7 +41,9 @@ class EmailGenerator(BaseGenerator):
                       preheader_text: str = "",
                       email_length: str = "Orta",
                       custom_instructions: str = "",
-                      creativity_level: float = 0.6) -> dict:
+                      creativity_level: float = 0.6,
+                      bypass_cache: bool = False,
+                      coalesce: Optional[bool] = None) -> dict:
         """
         Generate a complete email marketing content
         
@@ -58,24 +65,256 @@ class EmailGenerator(BaseGenerator):
             email_length: Email length preference
             custom_instructions: Additional instructions
             creativity_level: AI creativity level (0-1)
+            bypass_cache: Always call the API instead of reusing cached results
+            coalesce: Share the results of identical requests already in flight;
+                None only at temperature 0, True also for sampled requests
         
         Returns:
             Dict with generated email content and metadata
         """
         
-        # Generate subject line first
-        subject_result = self.generate_subject_line(
+        start_time = time.time()
+        
+        request = self._build_email_request(
             email_type=email_type,
-            main_topic=main_topic,
             company_name=company_name,
+            main_topic=main_topic,
+            target_audience=target_audience,
+            email_goal=email_goal,
             tone=tone,
+            include_personalization=include_personalization,
+            include_social_proof=include_social_proof,
             include_urgency=include_urgency,
-            include_discount=include_discount
+            include_discount=include_discount,
+            cta_text=cta_text,
+            cta_url=cta_url,
+            email_length=email_length,
+            custom_instructions=custom_instructions,
+            creativity_level=creativity_level
         )
         
+        # The body prompt does not depend on the subject, so both calls run at once
+        subject_result, content_result = self._run_parallel([
+            lambda: self.generate_subject_line(
+                email_type=email_type,
+                main_topic=main_topic,
+                company_name=company_name,
+                tone=tone,
+                include_urgency=include_urgency,
+                include_discount=include_discount,
+                bypass_cache=bypass_cache,
+                coalesce=coalesce
+            ),
+            lambda: self.api_handler.generate_content(**request, bypass_cache=bypass_cache, coalesce=coalesce)
+        ])
+        
+        self._record_completion(f"email:{email_length}", content_result)
+        
         if not subject_result['success']:
             return subject_result
         
+        if content_result['success']:
+            result = self._combine_email_results(
+                subject_result=subject_result,
+                content_result=content_result,
+                preheader_text=preheader_text,
+                cta_text=cta_text,
+                sender_name=sender_name or company_name
+            )
+            result['generation_time'] = round(time.time() - start_time, 2)
+            return result
+        else:
+            return content_result
+    
+    @labeled("email_type")
+    def stream_email(self,
+                    email_type: str,
+                    company_name: str,
+                    main_topic: str,
+                    target_audience: str = "Mevcut Müşteriler",
+                    email_goal: str = "Satış Artışı",
+                    tone: str = "professional",
+                    include_personalization: bool = True,
+                    include_social_proof: bool = False,
+                    include_urgency: bool = False,
+                    include_discount: bool = False,
+                    cta_text: str = "Hemen İncele",
+                    cta_url: str = "",
+                    sender_name: str = "",
+                    preheader_text: str = "",
+                    email_length: str = "Orta",
+                    custom_instructions: str = "",
+                    creativity_level: float = 0.6,
+                    bypass_cache: bool = False,
+                    coalesce: Optional[bool] = None):
+        """
+        Stream the email body as it is generated
+        
+        Takes the same arguments as generate_email. The subject line is
+        generated in the background while the body streams. Once the stream
+        is exhausted, ``stream.result`` holds the same dict as generate_email,
+        or the failed subject line result if the subject could not be generated.
+        
+        Returns:
+            ContentStream yielding body text deltas
+        """
+        
+        start_time = time.time()
+        
+        subject_future = self._submit(lambda: self.generate_subject_line(
+            email_type=email_type,
+            main_topic=main_topic,
+            company_name=company_name,
+            tone=tone,
+            include_urgency=include_urgency,
+            include_discount=include_discount,
+            bypass_cache=bypass_cache,
+            coalesce=coalesce
+        ))
+        
+        request = self._build_email_request(
+            email_type=email_type,
+            company_name=company_name,
+            main_topic=main_topic,
+            target_audience=target_audience,
+            email_goal=email_goal,
+            tone=tone,
+            include_personalization=include_personalization,
+            include_social_proof=include_social_proof,
+            include_urgency=include_urgency,
+            include_discount=include_discount,
+            cta_text=cta_text,
+            cta_url=cta_url,
+            email_length=email_length,
+            custom_instructions=custom_instructions,
+            creativity_level=creativity_level
+        )
+        
+        def finalize(content_result: dict) -> dict:
+            self._record_completion(f"email:{email_length}", content_result)
+            subject_result = subject_future.result()
+            if not subject_result['success']:
+                return subject_result
+            
+            result = self._combine_email_results(
+                subject_result=subject_result,
+                content_result=content_result,
+                preheader_text=preheader_text,
+                cta_text=cta_text,
+                sender_name=sender_name or company_name
+            )
+            result['generation_time'] = round(time.time() - start_time, 2)
+            result['streamed'] = True
+            result['time_to_first_token'] = content_result.get('time_to_first_token', 0.0)
+            result['tokens_per_second'] = content_result.get('tokens_per_second', 0.0)
+            return result
+        
+        return self.api_handler.stream_content(
+            **request,
+            finalize=finalize,
+            bypass_cache=bypass_cache,
+            coalesce=coalesce
+        )
+    
+    def export_email_batch(self, emails: list, input_path: str) -> dict:
+        """
+        Write fully-built email requests as Batch API JSONL
+        
+        Each email becomes two requests, '<custom_id>:subject' and
+        '<custom_id>:body', that are joined again by ingest_email_batch.
+        
+        Args:
+            emails: generate_email keyword arguments for each email, optionally
+                with a 'custom_id' (defaults to email-1, email-2, ...)
+            input_path: Where to write the batch input JSONL
+        
+        Returns:
+            Dict with input_path and request_count
+        """
+        lines = []
+        manifest = {}
+        
+        for index, params in enumerate(emails, 1):
+            params = dict(params)
+            custom_id = params.pop('custom_id', f"email-{index}")
+            params = self._batch_params(self.generate_email, params)
+            
+            subject_request = self._build_subject_request(
+                email_type=params['email_type'],
+                main_topic=params['main_topic'],
+                company_name=params['company_name'],
+                tone=params['tone'],
+                include_urgency=params['include_urgency'],
+                include_discount=params['include_discount'],
+                count=1
+            )
+            body_request = self._build_email_request(**{
+                name: value for name, value in params.items()
+                if name not in ('sender_name', 'preheader_text')
+            })
+            
+            lines.append(build_batch_line(f"{custom_id}:subject", self.api_handler.build_batch_body(**subject_request)))
+            lines.append(build_batch_line(f"{custom_id}:body", self.api_handler.build_batch_body(**body_request)))
+            manifest[custom_id] = params
+        
+        return self._write_batch(lines, manifest, input_path)
+    
+    def ingest_email_batch(self, output_path: str, input_path: str) -> dict:
+        """
+        Combine and post-process the output of a batch written by export_email_batch
+        
+        Args:
+            output_path: Batch output JSONL
+            input_path: The batch input JSONL (its manifest is read alongside)
+        
+        Returns:
+            Dict with per-email results keyed by custom_id and aggregate usage
+        """
+        manifest, outputs = self._read_batch(output_path, input_path)
+        
+        results = {}
+        for custom_id, params in manifest.items():
+            subject_id, body_id = f"{custom_id}:subject", f"{custom_id}:body"
+            subject_result = self._parse_subject_result(
+                outputs.get(subject_id) or self._missing_batch_result(subject_id), 1
+            )
+            content_result = outputs.get(body_id) or self._missing_batch_result(body_id)
+            
+            if not subject_result['success']:
+                results[custom_id] = subject_result
+            elif not content_result['success']:
+                results[custom_id] = content_result
+            else:
+                results[custom_id] = self._combine_email_results(
+                    subject_result=subject_result,
+                    content_result=content_result,
+                    preheader_text=params['preheader_text'],
+                    cta_text=params['cta_text'],
+                    sender_name=params['sender_name'] or params['company_name']
+                )
+                results[custom_id]['batch'] = True
+        
+        return self._summarize_batch(results)
+    
+    @timed("prompt_build_seconds", labels=("email_type",))
+    def _build_email_request(self,
+                            email_type: str,
+                            company_name: str,
+                            main_topic: str,
+                            target_audience: str,
+                            email_goal: str,
+                            tone: str,
+                            include_personalization: bool,
+                            include_social_proof: bool,
+                            include_urgency: bool,
+                            include_discount: bool,
+                            cta_text: str,
+                            cta_url: str,
+                            email_length: str,
+                            custom_instructions: str,
+                            creativity_level: float) -> dict:
+        """Build the API request arguments for the email body"""
+        
         # Get email-specific prompt
         base_prompt = self.prompts.get_email_prompt(
             email_type=email_type,
@@ -128,38 +367,45 @@ class EmailGenerator(BaseGenerator):
             target_audience=target_audience
         )
         
-        # Generate email content
-        content_result = self.api_handler.generate_content(
-            prompt=optimized_prompt,
-            system_prompt=system_prompt,
-            max_tokens=self._get_max_tokens_for_length(email_length),
-            temperature=creativity_level
+        return {
+            'prompt': optimized_prompt,
+            'system_prompt': system_prompt,
+            'max_tokens': self._get_max_tokens_for_length(email_length),
+            'temperature': creativity_level,
+            'template': "email_body"
+        }
+    
+    @timed("post_process_seconds")
+    def _combine_email_results(self,
+                              subject_result: dict,
+                              content_result: dict,
+                              preheader_text: str,
+                              cta_text: str,
+                              sender_name: str) -> dict:
+        """Combine subject and body results into the final email result"""
+        
+        # Process and structure the email
+        processed_email = self._process_email_content(
+            subject=subject_result['subject'],
+            content=content_result['content'],
+            preheader=preheader_text,
+            cta_text=cta_text,
+            sender_name=sender_name
         )
         
-        if content_result['success']:
-            # Process and structure the email
-            processed_email = self._process_email_content(
-                subject=subject_result['subject'],
-                content=content_result['content'],
-                preheader=preheader_text,
-                cta_text=cta_text,
-                sender_name=sender_name or company_name
-            )
-            
-            # Combine results
-            result = {
-                'success': True,
-                'email_data': processed_email,
-                'model': self.model,
-                'tokens_used': content_result['tokens_used'] + subject_result.get('tokens_used', 0),
-                'generation_time': content_result['generation_time'] + subject_result.get('generation_time', 0),
-                'cost_estimate': content_result['cost_estimate'] + subject_result.get('cost_estimate', 0)
-            }
-            
-            return result
-        else:
-            return content_result
+        # Combine results
+        return {
+            'success': True,
+            'email_data': processed_email,
+            'model': self.model,
+            'tokens_used': content_result['tokens_used'] + subject_result.get('tokens_used', 0),
+            'generation_time': content_result['generation_time'] + subject_result.get('generation_time', 0),
+            'cost_estimate': content_result['cost_estimate'] + subject_result.get('cost_estimate', 0),
+            'cache_hit': content_result.get('cache_hit', False),
+            'cache_stats': content_result.get('cache_stats', {})
+        }
     
+    @labeled("email_type")
     def generate_subject_line(self,
                             email_type: str,
                             main_topic: str,
@@ -167,7 +413,9 @@ class EmailGenerator(BaseGenerator):
                             tone: str = "professional",
                             include_urgency: bool = False,
                             include_discount: bool = False,
-                            count: int = 1) -> dict:
+                            count: int = 1,
+                            bypass_cache: bool = False,
+                            coalesce: Optional[bool] = None) -> dict:
         """
         Generate email subject lines
         
@@ -179,29 +427,60 @@ class EmailGenerator(BaseGenerator):
             include_urgency: Include urgency elements
             include_discount: Include discount elements
             count: Number of subject lines to generate
+            bypass_cache: Always call the API instead of reusing a cached result
+            coalesce: Share the result of an identical request already in flight;
+                None only at temperature 0, True also for sampled requests
         
         Returns:
             Dict with generated subject lines
         """
         
-        subject_prompt = self.prompts.get_subject_line_prompt(
+        request = self._build_subject_request(
             email_type=email_type,
             main_topic=main_topic,
             company_name=company_name,
+            tone=tone,
             include_urgency=include_urgency,
             include_discount=include_discount,
             count=count
         )
         
-        system_prompt = f"Sen uzman bir email marketing specialist'ısın. {tone} tonunda etkili konu satırları oluşturuyorsun."
+        result = self.api_handler.generate_content(**request, bypass_cache=bypass_cache, coalesce=coalesce)
         
-        result = self.api_handler.generate_content(
-            prompt=subject_prompt,
-            system_prompt=system_prompt,
-            max_tokens=200,
-            temperature=0.8
+        return self._parse_subject_result(result, count)
+    
+    def _build_subject_request(self,
+                              email_type: str,
+                              main_topic: str,
+                              company_name: str,
+                              tone: str,
+                              include_urgency: bool,
+                              include_discount: bool,
+                              count: int) -> dict:
+        """Build the API request arguments for the subject line(s)"""
+        
+        subject_prompt = self.prompts.get_subject_line_prompt(
+            email_type=email_type,
+            main_topic=main_topic,
+            company_name=company_name,
+            include_urgency=include_urgency,
+            include_discount=include_discount,
+            count=count
         )
         
+        system_prompt = self.prompts.get_subject_system_prompt(tone)
+        
+        return {
+            'prompt': subject_prompt,
+            'system_prompt': system_prompt,
+            'max_tokens': 200,
+            'temperature': 0.8,
+            'template': "email_subject"
+        }
+    
+    def _parse_subject_result(self, result: dict, count: int) -> dict:
+        """Extract the subject line(s) from a subject generation result"""
+        
         if result['success']:
             if count == 1:
                 # Single subject line
@@ -217,6 +496,7 @@ class EmailGenerator(BaseGenerator):
         
         return result
     
+    @labeled("email_type")
     def generate_email_series(self,
                             email_type: str,
                             company_name: str,
@@ -249,11 +529,14 @@ class EmailGenerator(BaseGenerator):
             kwargs.get('tone', 'professional')
         )
         
+        # A cut-off series is continued one round at a time instead of regenerated
         result = self.api_handler.generate_content(
             prompt=series_prompt,
             system_prompt=system_prompt,
             max_tokens=self._get_max_tokens_for_length("Uzun") * series_count,
-            temperature=kwargs.get('creativity_level', 0.6)
+            temperature=kwargs.get('creativity_level', 0.6),
+            max_continuations=series_count,
+            template="email_series"
         )
         
         if result['success']:
@@ -296,7 +579,7 @@ class EmailGenerator(BaseGenerator):
             "Orta": 600,
             "Uzun": 1000
         }
-        return token_mapping.get(length, 600)
+        return self._sized_max_tokens(f"email:{length}", token_mapping.get(length, 600))
     
     def _process_email_content(self, 
                              subject: str, 
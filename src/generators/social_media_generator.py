@@ -1,5 +1,10 @@
+import time
+from typing import Optional
 from generators.base_generator import BaseGenerator
-from utils.api_handler import PromptOptimizer
+from utils.api_handler import TRANSIENT_ERROR_TYPES, ContentStream, PromptOptimizer
+from utils.batch_runner import build_batch_line
+from utils.config import GENERATION_SETTINGS
+from utils.metrics import labeled, timed
 from prompts.social_media_prompts import SocialMediaPrompts
 
 class SocialMediaGenerator(BaseGenerator):
@@ -19,6 +24,7 @@ class SocialMediaGenerator(BaseGenerator):
         # Default to generate_post if no specific method is called
         return self.generate_post(**kwargs)
     
+    @labeled("platform")
     def generate_post(self,
                      platform: str,
                      topic: str,
@@ -29,7 +35,9 @@ class SocialMediaGenerator(BaseGenerator):
                      include_emojis: bool = True,
                      include_cta: bool = True,
                      custom_instructions: str = "",
-                     creativity_level: float = 0.7) -> dict:
+                     creativity_level: float = 0.7,
+                     bypass_cache: bool = False,
+                     coalesce: Optional[bool] = None) -> dict:
         """
         Generate a social media post
         
@@ -44,11 +52,177 @@ class SocialMediaGenerator(BaseGenerator):
             include_cta: Include call-to-action
             custom_instructions: Additional instructions
             creativity_level: AI creativity level (0-1)
+            bypass_cache: Always call the API instead of reusing a cached result
+            coalesce: Share the result of an identical request already in flight;
+                None only at temperature 0, True also for sampled requests
         
         Returns:
             Dict with generated content and metadata
         """
         
+        request = self._build_post_request(
+            platform=platform,
+            topic=topic,
+            target_audience=target_audience,
+            tone=tone,
+            post_type=post_type,
+            include_hashtags=include_hashtags,
+            include_emojis=include_emojis,
+            include_cta=include_cta,
+            custom_instructions=custom_instructions,
+            creativity_level=creativity_level
+        )
+        
+        # Generate content
+        result = self.api_handler.generate_content(**request, bypass_cache=bypass_cache, coalesce=coalesce)
+        self._record_completion(f"social:{platform}", result)
+        
+        if result['success']:
+            # Post-process content
+            processed_content = self._post_process_content(
+                result['content'], 
+                platform, 
+                include_hashtags,
+                include_emojis
+            )
+            result['content'] = processed_content
+        
+        return result
+    
+    @labeled("platform")
+    def stream_post(self,
+                   platform: str,
+                   topic: str,
+                   target_audience: str = "Genel Kitle",
+                   tone: str = "professional",
+                   post_type: str = "promotional",
+                   include_hashtags: bool = True,
+                   include_emojis: bool = True,
+                   include_cta: bool = True,
+                   custom_instructions: str = "",
+                   creativity_level: float = 0.7,
+                   bypass_cache: bool = False,
+                   coalesce: Optional[bool] = None) -> ContentStream:
+        """
+        Stream a social media post as it is generated
+        
+        Takes the same arguments as generate_post. Iterate over the returned
+        stream to receive text deltas; once exhausted, ``stream.result`` holds
+        the post-processed content and metadata in the generate_post format.
+        
+        Returns:
+            ContentStream yielding text deltas
+        """
+        
+        request = self._build_post_request(
+            platform=platform,
+            topic=topic,
+            target_audience=target_audience,
+            tone=tone,
+            post_type=post_type,
+            include_hashtags=include_hashtags,
+            include_emojis=include_emojis,
+            include_cta=include_cta,
+            custom_instructions=custom_instructions,
+            creativity_level=creativity_level
+        )
+        
+        def finalize(result: dict) -> dict:
+            self._record_completion(f"social:{platform}", result)
+            result['content'] = self._post_process_content(
+                result['content'],
+                platform,
+                include_hashtags,
+                include_emojis
+            )
+            return result
+        
+        return self.api_handler.stream_content(
+            **request,
+            finalize=finalize,
+            bypass_cache=bypass_cache,
+            coalesce=coalesce
+        )
+    
+    def generate_multi_platform(self,
+                                topic: str,
+                                platforms: list = None,
+                                target_audience: str = "Genel Kitle",
+                                tone: str = "professional",
+                                post_type: str = "promotional",
+                                include_hashtags: bool = True,
+                                include_emojis: bool = True,
+                                include_cta: bool = True,
+                                custom_instructions: str = "",
+                                creativity_level: float = 0.7,
+                                bypass_cache: bool = False,
+                                coalesce: Optional[bool] = None) -> dict:
+        """
+        Generate the same brief for several platforms concurrently
+        
+        Args:
+            topic: Main topic or subject
+            platforms: Platforms to generate for (defaults to all four)
+            Other arguments are the same as generate_post and apply to every platform
+        
+        Returns:
+            Dict with per-platform results keyed by platform and aggregate
+            cost/latency; generation_time is wall-clock for the whole fan-out
+        """
+        
+        platforms = platforms or ['instagram', 'twitter', 'linkedin', 'facebook']
+        start_time = time.time()
+        
+        results = self._run_parallel([
+            lambda platform=platform: self.generate_post(
+                platform=platform,
+                topic=topic,
+                target_audience=target_audience,
+                tone=tone,
+                post_type=post_type,
+                include_hashtags=include_hashtags,
+                include_emojis=include_emojis,
+                include_cta=include_cta,
+                custom_instructions=custom_instructions,
+                creativity_level=creativity_level,
+                bypass_cache=bypass_cache,
+                coalesce=coalesce
+            )
+            for platform in platforms
+        ])
+        results = dict(zip(platforms, results))
+        
+        succeeded = [result for result in results.values() if result['success']]
+        failed = [result for result in results.values() if not result['success']]
+        
+        return {
+            'success': bool(succeeded),
+            'results': results,
+            'platforms': platforms,
+            'succeeded': len(succeeded),
+            'failed': len(failed),
+            'error': failed[0]['error'] if failed and not succeeded else None,
+            'model': self.model,
+            'tokens_used': sum(result['tokens_used'] for result in succeeded),
+            'cost_estimate': round(sum(result['cost_estimate'] for result in succeeded), 4),
+            'generation_time': round(time.time() - start_time, 2),
+            'slowest_platform_time': max((result['generation_time'] for result in succeeded), default=0)
+        }
+    
+    @timed("prompt_build_seconds", labels=("platform",))
+    def _build_post_request(self,
+                           platform: str,
+                           topic: str,
+                           target_audience: str,
+                           tone: str,
+                           post_type: str,
+                           include_hashtags: bool,
+                           include_emojis: bool,
+                           include_cta: bool,
+                           custom_instructions: str,
+                           creativity_level: float) -> dict:
+        """Build the API request arguments for a single post"""
+        
         # Get platform-specific prompt
         base_prompt = self.prompts.get_platform_prompt(
             platform=platform,
@@ -85,30 +259,73 @@ class SocialMediaGenerator(BaseGenerator):
             target_audience=target_audience
         )
         
-        # Generate content
-        result = self.api_handler.generate_content(
-            prompt=optimized_prompt,
-            system_prompt=system_prompt,
-            max_tokens=self._get_max_tokens(platform),
-            temperature=creativity_level
-        )
+        return {
+            'prompt': optimized_prompt,
+            'system_prompt': system_prompt,
+            'max_tokens': self._get_max_tokens(platform),
+            'temperature': creativity_level,
+            'template': "social_post"
+        }
+    
+    def export_post_batch(self, posts: list, input_path: str) -> dict:
+        """
+        Write fully-built post requests as Batch API JSONL
         
-        if result['success']:
-            # Post-process content
-            processed_content = self._post_process_content(
-                result['content'], 
-                platform, 
-                include_hashtags,
-                include_emojis
-            )
-            result['content'] = processed_content
+        Args:
+            posts: generate_post keyword arguments for each post, optionally
+                with a 'custom_id' (defaults to post-1, post-2, ...)
+            input_path: Where to write the batch input JSONL
         
-        return result
+        Returns:
+            Dict with input_path and request_count
+        """
+        lines = []
+        manifest = {}
+        
+        for index, params in enumerate(posts, 1):
+            params = dict(params)
+            custom_id = params.pop('custom_id', f"post-{index}")
+            params = self._batch_params(self.generate_post, params)
+            
+            request = self._build_post_request(**params)
+            lines.append(build_batch_line(custom_id, self.api_handler.build_batch_body(**request)))
+            manifest[custom_id] = params
+        
+        return self._write_batch(lines, manifest, input_path)
     
+    def ingest_post_batch(self, output_path: str, input_path: str) -> dict:
+        """
+        Post-process the output of a batch written by export_post_batch
+        
+        Args:
+            output_path: Batch output JSONL
+            input_path: The batch input JSONL (its manifest is read alongside)
+        
+        Returns:
+            Dict with per-post results keyed by custom_id and aggregate usage
+        """
+        manifest, outputs = self._read_batch(output_path, input_path)
+        
+        results = {}
+        for custom_id, params in manifest.items():
+            result = outputs.get(custom_id) or self._missing_batch_result(custom_id)
+            if result['success']:
+                result['content'] = self._post_process_content(
+                    result['content'],
+                    params['platform'],
+                    params['include_hashtags'],
+                    params['include_emojis']
+                )
+            results[custom_id] = result
+        
+        return self._summarize_batch(results)
+    
+    @labeled("platform")
     def generate_content_series(self,
                               platform: str,
                               theme: str,
                               post_count: int = 5,
+                              parallel: bool = False,
                               **kwargs) -> dict:
         """
         Generate a series of related social media posts
@@ -117,12 +334,16 @@ class SocialMediaGenerator(BaseGenerator):
             platform: Social media platform
             theme: Overall theme for the series
             post_count: Number of posts to generate
+            parallel: Generate an outline first, then every post concurrently
             **kwargs: Additional arguments for individual posts
         
         Returns:
             Dict with generated content series
         """
         
+        if parallel:
+            return self._generate_series_parallel(platform, theme, post_count, **kwargs)
+        
         series_prompt = self.prompts.get_series_prompt(
             platform=platform,
             theme=theme,
@@ -138,7 +359,8 @@ class SocialMediaGenerator(BaseGenerator):
             prompt=series_prompt,
             system_prompt=system_prompt,
             max_tokens=self._get_max_tokens(platform) * post_count,
-            temperature=kwargs.get('creativity_level', 0.7)
+            temperature=kwargs.get('creativity_level', 0.7),
+            template="social_series"
         )
         
         if result['success']:
@@ -150,6 +372,136 @@ class SocialMediaGenerator(BaseGenerator):
         
         return result
     
+    def _generate_series_parallel(self,
+                                  platform: str,
+                                  theme: str,
+                                  post_count: int,
+                                  **kwargs) -> dict:
+        """Generate a series outline, then each post against it in parallel"""
+        
+        start_time = time.time()
+        tone = kwargs.get('tone', 'professional')
+        creativity_level = kwargs.get('creativity_level', 0.7)
+        system_prompt = self.prompts.get_system_prompt(platform, tone)
+        
+        outline_result = self.api_handler.generate_content(
+            prompt=self.prompts.get_series_outline_prompt(platform, theme, post_count),
+            system_prompt=system_prompt,
+            max_tokens=60 * post_count,
+            temperature=creativity_level,
+            template="social_series"
+        )
+        
+        if not outline_result['success']:
+            return outline_result
+        
+        outline = self._parse_series_outline(outline_result['content'], theme, post_count)
+        
+        post_results = self._run_parallel([
+            lambda post_number=post_number: self._generate_series_post(
+                platform=platform,
+                theme=theme,
+                outline=outline,
+                post_number=post_number,
+                system_prompt=system_prompt,
+                creativity_level=creativity_level,
+                include_hashtags=kwargs.get('include_hashtags', True),
+                include_emojis=kwargs.get('include_emojis', True)
+            )
+            for post_number in range(1, post_count + 1)
+        ])
+        
+        succeeded = [result for result in post_results if result['success']]
+        failed = [result for result in post_results if not result['success']]
+        
+        if not succeeded:
+            return failed[0]
+        
+        posts = [result['content'] for result in succeeded]
+        all_results = [outline_result] + succeeded
+        
+        return {
+            'success': True,
+            'content': "\n\n---\n\n".join(posts),
+            'posts': posts,
+            'series_count': len(posts),
+            'outline': outline,
+            'failed_posts': [result['post_number'] for result in failed],
+            'post_metrics': [
+                {
+                    'post_number': result['post_number'],
+                    'success': result['success'],
+                    'tokens_used': result.get('tokens_used', 0),
+                    'generation_time': result.get('generation_time', 0),
+                    'attempts': result['series_attempts'],
+                    'error': result.get('error')
+                }
+                for result in post_results
+            ],
+            'model': self.model,
+            'tokens_used': sum(result['tokens_used'] for result in all_results),
+            'cost_estimate': round(sum(result['cost_estimate'] for result in all_results), 4),
+            'outline_time': outline_result['generation_time'],
+            'generation_time': round(time.time() - start_time, 2),
+            'timestamp': time.time()
+        }
+    
+    def _generate_series_post(self,
+                              platform: str,
+                              theme: str,
+                              outline: list,
+                              post_number: int,
+                              system_prompt: str,
+                              creativity_level: float,
+                              include_hashtags: bool,
+                              include_emojis: bool) -> dict:
+        """Generate one post of a parallel series, retrying it alone if it fails"""
+        
+        prompt = self.prompts.get_series_post_prompt(platform, theme, outline, post_number)
+        max_attempts = 1 + GENERATION_SETTINGS['series_post_retries']
+        
+        for attempt in range(1, max_attempts + 1):
+            result = self.api_handler.generate_content(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                max_tokens=self._get_max_tokens(platform),
+                temperature=creativity_level,
+                template="social_series"
+            )
+            
+            # Only transient failures can succeed on another attempt
+            if result['success'] or result.get('error_type') not in TRANSIENT_ERROR_TYPES:
+                break
+        
+        if result['success']:
+            result['content'] = self._post_process_content(
+                result['content'],
+                platform,
+                include_hashtags,
+                include_emojis
+            )
+        
+        result['post_number'] = post_number
+        result['series_attempts'] = attempt
+        return result
+    
+    def _parse_series_outline(self, content: str, theme: str, post_count: int) -> list:
+        """Parse a numbered outline into one entry per post"""
+        import re
+        
+        outline = []
+        for line in content.strip().split('\n'):
+            match = re.match(r'^\s*(?:Post\s*)?\d+\s*[.):/-]\s*(.+)$', line)
+            if match:
+                outline.append(match.group(1).strip())
+        
+        # Fill in generic entries if the model returned fewer lines than asked
+        outline = outline[:post_count]
+        for post_number in range(len(outline) + 1, post_count + 1):
+            outline.append(f"{theme} - Bölüm {post_number}")
+        
+        return outline
+    
     def generate_hashtags(self,
                          topic: str,
                          platform: str = "instagram",
@@ -196,8 +548,9 @@ class SocialMediaGenerator(BaseGenerator):
             'linkedin': 1000,
             'facebook': 800
         }
-        return token_limits.get(platform, 800)
+        return self._sized_max_tokens(f"social:{platform}", token_limits.get(platform, 800))
     
+    @timed("post_process_seconds", labels=("platform",))
     def _post_process_content(self, 
                             content: str, 
                             platform: str,
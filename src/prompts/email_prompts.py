@@ -1,6 +1,38 @@
 class EmailPrompts:
     """Email marketing content generation prompts"""
     
+    # Identical for every email type and tone, so it leads the system prompt as a
+    # stable prefix the provider can cache; per-request settings come after it
+    SYSTEM_INSTRUCTIONS = """Sen uzman bir email marketing specialist'ısın. Aşağıda belirtilen email türü ve ton için email içerikleri oluşturuyorsun.
+
+Email Yazım Kuralları:
+1. Kişisel ve samimi dil kullan
+2. Değer odaklı içerik üret
+3. Açık ve net CTA ekle
+4. Mobile-friendly formatlamaya dikkat et
+5. Spam trigger kelimelerden kaçın
+6. Okuyucuya fayda sağla
+
+Teknik Gereksinimler:
+- Konu satırı: 30-50 karakter
+- Preheader: 90 karakter altı
+- İçerik: Tarayarak okunabilir
+- CTA: Net ve eylem odaklı
+- Kişiselleştirme unsurları
+
+Kaçınılacaklar:
+- Aşırı satış odaklı dil
+- Spam tetikleyici kelimeler
+- Çok uzun paragraflar
+- Belirsiz CTA'lar
+- Kişiselleştirme eksikliği
+- Değer katmayan içerik
+
+İçeriği yaratıcı, özgün ve hedef kitle için uygun olacak şekilde oluştur."""
+    
+    # Shared prefix of the subject line system prompt
+    SUBJECT_INSTRUCTIONS = "Sen uzman bir email marketing specialist'ısın ve etkili konu satırları oluşturuyorsun."
+    
     def get_system_prompt(self, email_type: str, tone: str = "professional") -> str:
         """Get system prompt for email generation"""
         
@@ -48,35 +80,21 @@ class EmailPrompts:
         email_info = email_type_specs.get(email_type, email_type_specs["newsletter"])
         tone_desc = tone_descriptions.get(tone, "profesyonel")
         
-        return f"""Sen uzman bir email marketing specialist'ısın. {tone_desc} tonunda {email_type} türünde email içerikleri oluşturuyorsun.
+        return f"""{self.SYSTEM_INSTRUCTIONS}
+
+Bu İstek İçin:
+- Email Türü: {email_type}
+- Ton: {tone_desc}
 
 Email Türü Özellikleri:
 - Amaç: {email_info['purpose']}
 - Yapı: {email_info['structure']}
-- Kilit Unsurlar: {email_info['key_elements']}
-
-Email Yazım Kuralları:
-1. Kişisel ve samimi dil kullan
-2. Değer odaklı içerik üret
-3. Açık ve net CTA ekle
-4. Mobile-friendly formatlamaya dikkat et
-5. Spam trigger kelimelerden kaçın
-6. Okuyucuya fayda sağla
-
-Teknik Gereksinimler:
-- Konu satırı: 30-50 karakter
-- Preheader: 90 karakter altı
-- İçerik: Tarayarak okunabilir
-- CTA: Net ve eylem odaklı
-- Kişiselleştirme unsurları
+- Kilit Unsurlar: {email_info['key_elements']}"""
 
-Kaçınılacaklar:
-- Aşırı satış odaklı dil
-- Spam tetikleyici kelimeler
-- Çok uzun paragraflar
-- Belirsiz CTA'lar
-- Kişiselleştirme eksikliği
-- Değer katmayan içerik"""
+    def get_subject_system_prompt(self, tone: str = "professional") -> str:
+        """Get system prompt for subject line generation"""
+        
+        return f"{self.SUBJECT_INSTRUCTIONS}\nTon: {tone}"
 
     def get_email_prompt(self,
                         email_type: str,
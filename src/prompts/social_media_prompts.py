@@ -1,6 +1,27 @@
 class SocialMediaPrompts:
     """Social media content generation prompts"""
     
+    # Identical for every platform and tone, so it leads the system prompt as a
+    # stable prefix the provider can cache; per-request settings come after it
+    SYSTEM_INSTRUCTIONS = """Sen uzman bir sosyal medya content creator'ısın. Aşağıda belirtilen platform ve ton için içerik oluşturuyorsun.
+
+İçerik Kuralları:
+1. Hedef kitleye uygun dil kullan
+2. Platform sınırlarını göz önünde bulundur
+3. Engagement arttıracak unsurlar ekle
+4. Brand voice'i koruy
+5. Actionable content üret
+6. Türkçe dilbilgisi kurallarına uy
+
+Kaçınılacaklar:
+- Spam benzeri içerik
+- Alakasız hashtag'ler
+- Aşırı tanıtım yapma
+- Yanlış bilgi verme
+- Hedef kitle dışı dil kullanma
+
+İçeriği yaratıcı, özgün ve hedef kitle için uygun olacak şekilde oluştur."""
+    
     def get_system_prompt(self, platform: str, tone: str = "professional") -> str:
         """Get system prompt for social media content generation"""
         
@@ -38,27 +59,16 @@ class SocialMediaPrompts:
         platform_info = platform_specs.get(platform, platform_specs["instagram"])
         tone_desc = tone_descriptions.get(tone, "profesyonel")
         
-        return f"""Sen uzman bir sosyal medya content creator'ısın. {platform.title()} platformu için {tone_desc} tonunda içerik oluşturuyorsun.
+        return f"""{self.SYSTEM_INSTRUCTIONS}
+
+Bu İstek İçin:
+- Platform: {platform.title()}
+- Ton: {tone_desc}
 
 Platform Özellikleri:
 - Stil: {platform_info['style']}
 - Özellikler: {platform_info['features']}
-- En İyi Uygulamalar: {platform_info['best_practices']}
-
-İçerik Kuralları:
-1. Hedef kitleye uygun dil kullan
-2. Platform sınırlarını göz önünde bulundur
-3. Engagement arttıracak unsurlar ekle
-4. Brand voice'i koruy
-5. Actionable content üret
-6. Türkçe dilbilgisi kurallarına uy
-
-Kaçınılacaklar:
-- Spam benzeri içerik
-- Alakasız hashtag'ler
-- Aşırı tanıtım yapma
-- Yanlış bilgi verme
-- Hedef kitle dışı dil kullanma"""
+- En İyi Uygulamalar: {platform_info['best_practices']}"""
 
     def get_platform_prompt(self, 
                            platform: str,
@@ -157,6 +167,52 @@ Post İçerikleri:
 
 Her post platform özelliklerine uygun olsun ve engaging elements içersin."""
 
+    def get_series_outline_prompt(self,
+                                 platform: str,
+                                 theme: str,
+                                 post_count: int) -> str:
+        """Get prompt for a compact outline of a content series"""
+        
+        return f"""Theme: {theme}
+Platform: {platform.title()}
+Post Sayısı: {post_count}
+
+{post_count} post'luk, birbiriyle bağlantılı bir content series için kısa bir taslak oluştur.
+
+Önerilen Yapı:
+{self._get_series_structure(post_count)}
+
+Format:
+- Tam olarak {post_count} satır yaz
+- Her satır "N. Başlık: tek cümlelik odak noktası" şeklinde olsun
+- Post içeriklerini yazma, sadece taslağı ver"""
+
+    def get_series_post_prompt(self,
+                              platform: str,
+                              theme: str,
+                              outline: list,
+                              post_number: int) -> str:
+        """Get prompt for writing one post of a series against its outline"""
+        
+        post_count = len(outline)
+        outline_text = "\n".join(f"{i}. {item}" for i, item in enumerate(outline, 1))
+        
+        return f"""Theme: {theme}
+Platform: {platform.title()}
+
+Seri Taslağı:
+{outline_text}
+
+Bu serinin {post_number}. post'unu yaz: {outline[post_number - 1]}
+
+Kurallar:
+1. Sadece {post_number}. post'u yaz, diğer post'ları yazma
+2. Post'un başına "{post_number}/{post_count}" numarasını ekle
+3. Post bağımsız değer sağlamalı ama seriye referans vermeli
+4. {"Seriyi özetle ve güçlü bir CTA ile bitir" if post_number == post_count else "Bir sonraki post için merak uyandır"}
+
+Post platform özelliklerine uygun olsun ve engaging elements içersin."""
+
     def get_hashtag_prompt(self, 
                           topic: str, 
                           platform: str, 
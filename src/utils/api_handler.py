@@ -1,23 +1,69 @@
 import openai
-import streamlit as st
-from typing import Dict, List, Optional
-import json
+import asyncio
+import copy
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import time
 import logging
 
+from utils.circuit_breaker import CircuitOpen, Permit, get_circuit_breaker, is_upstream_failure
+from utils.client_registry import get_client_registry, get_openai_client, key_id
+from utils.config import API_CONFIG, CIRCUIT_BREAKER_SETTINGS, GENERATION_SETTINGS, get_env_config
+from utils.hedging import Attempt, anthropic_stream, get_hedge_stats, openai_stream, run_hedged
+from utils.key_validator import get_key_validator
+from utils.metrics import current_labels, get_metrics
+from utils.progress import ProgressHook, get_progress_hook
+from utils.prompt_cache import get_prompt_cache_stats
+from utils.response_cache import ResponseCache, get_response_cache
+from utils.rate_limiter import RateLimitWaitTooLong, estimate_tokens, get_rate_limiter
+from utils.retry import DeadlineExceeded, RetryPolicy
+from utils.single_flight import Flight, get_single_flight
+from utils.tokenizer import ContextLengthExceeded, fit_to_context, get_encoding_loader, get_tokenizer
+from utils.usage_ledger import get_usage_ledger
+
+# Sent after a completion stopped at max_tokens so the model picks up mid-text
+CONTINUATION_PROMPT = (
+    "Yanıtın uzunluk sınırı nedeniyle yarıda kesildi. Tam olarak kaldığın yerden devam et; "
+    "önceki metni tekrarlama ve yeni bir giriş yazma."
+)
+
+# Failure types that may succeed on another attempt; the rest fail the same way again
+TRANSIENT_ERROR_TYPES = ("timeout", "connection", "server")
+
 class APIHandler:
     """Handle API calls to various AI services"""
     
-    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo"):
+    def __init__(self,
+                 api_key: str,
+                 model: str = "gpt-3.5-turbo",
+                 progress_hook: Optional[ProgressHook] = None,
+                 generator: Optional[str] = None):
         self.api_key = api_key
         self.model = model
-        self.client = openai.OpenAI(api_key=api_key)
+        # Attributes spend in the usage ledger (e.g. the generator class name)
+        self.generator = generator
+        # None follows the hook of the calling context (see utils.progress)
+        self.progress_hook = progress_hook
+        # Shared per key so every handler reuses the same keep-alive connection pool
+        self.client = get_openai_client(api_key)
+        self.retry_policy = RetryPolicy()
+        self.rate_limiter = get_rate_limiter(api_key, model)
+        # Download the tokenizer's BPE file now rather than inside the first request
+        get_encoding_loader().warm([model])
+        # Race a backup request when the first token is slow (see utils.hedging);
+        # applies to generate_content only, streams are never hedged
+        self.hedging = GENERATION_SETTINGS['hedging_enabled']
+        self._fallback_handlers = {}
         
     def generate_content(self, 
                         prompt: str, 
                         max_tokens: int = 1500, 
                         temperature: float = 0.7,
-                        system_prompt: str = None) -> Dict:
+                        system_prompt: str = None,
+                        bypass_cache: bool = False,
+                        coalesce: Optional[bool] = None,
+                        max_continuations: Optional[int] = None,
+                        template: Optional[str] = None) -> Dict:
         """
         Generate content using OpenAI API
         
@@ -26,177 +72,1172 @@ class APIHandler:
             max_tokens: Maximum tokens to generate
             temperature: Creativity level (0-1)
             system_prompt: System instructions
+            bypass_cache: Skip cached results and always call the API (e.g. regenerate)
+            coalesce: Share one upstream call with identical requests already in flight;
+                None does so only at temperature 0, True also for sampled requests
+            max_continuations: Continuation rounds allowed when the output is cut off
+                at max_tokens (defaults to GENERATION_SETTINGS['max_continuations'])
+            template: Prompt template name the provider prompt cache hit ratio is tracked under
             
         Returns:
             Dict with generated content and metadata
         """
         try:
-            # Prepare messages
-            messages = []
-            
-            if system_prompt:
-                messages.append({
-                    "role": "system", 
-                    "content": system_prompt
-                })
-            
-            messages.append({
-                "role": "user", 
-                "content": prompt
-            })
-            
+            messages, max_tokens, preflight = self._prepare_request(prompt, system_prompt, max_tokens)
+        except ContextLengthExceeded as e:
+            return self._error_result(e)
+        
+        if max_continuations is None:
+            max_continuations = GENERATION_SETTINGS['max_continuations']
+        
+        request_key = self._request_key(messages, max_tokens, temperature)
+        
+        cached_result = self._cache_lookup(request_key, bypass_cache)
+        if cached_result:
+            return {**cached_result, **preflight}
+        
+        if self._coalesces(coalesce, temperature, bypass_cache):
+            result, shared = get_single_flight().do(
+                request_key,
+                lambda: self._generate(messages, max_tokens, temperature, request_key, max_continuations),
+                timeout=self.retry_policy.deadline_seconds
+            )
+            result = self._coalesced_result(result) if shared else result
+        else:
+            result = self._generate(messages, max_tokens, temperature, request_key, max_continuations)
+        
+        self._record_prompt_cache(result, template)
+        return {**result, **preflight}
+    
+    def _generate(self,
+                  messages: List[Dict],
+                  max_tokens: int,
+                  temperature: float,
+                  request_key: str,
+                  max_continuations: int) -> Dict:
+        """Call the API for a request that was not served from cache"""
+        try:
+            handler, permit = self._route()
+        except CircuitOpen as e:
+            return self._error_result(e)
+        
+        result = handler._call_api(messages, max_tokens, temperature, request_key, max_continuations, permit)
+        if handler is not self:
+            result["rerouted_from"] = self.model
+        return result
+    
+    def _call_api(self,
+                  messages: List[Dict],
+                  max_tokens: int,
+                  temperature: float,
+                  request_key: str,
+                  max_continuations: int,
+                  permit: Optional[Permit]) -> Dict:
+        """Make the upstream call on this handler's model once routing has allowed it"""
+        attempts = []
+        reservation = None
+        start_time = None
+        settled = False
+        
+        try:
             # API call with progress indicator
-            with st.spinner("AI içerik oluşturuyor..."):
+            with self._progress().task("AI içerik oluşturuyor..."):
+                reservation = self.rate_limiter.acquire(estimate_tokens(messages, max_tokens, self.model))
                 start_time = time.time()
                 
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    top_p=1,
-                    frequency_penalty=0,
-                    presence_penalty=0
-                )
+                if self.hedging:
+                    result = self._hedged_completion(messages, max_tokens, temperature, reservation)
+                else:
+                    response = self._create_completion(messages, max_tokens, temperature, attempts)
+                    result = self._build_result(response, 0)
                 
                 end_time = time.time()
             
-            # Extract content
-            content = response.choices[0].message.content
+            self._settle_call(permit, reservation, start_time, result["tokens_used"])
+            settled = True
+            result["generation_time"] = round(end_time - start_time, 2)
+            result["queue_wait"] = round(reservation.wait_time, 2)
+            result = self._continue_truncated(messages, result, max_tokens, temperature, max_continuations)
+            self._record_usage(result)
+            self._observe_latency(result, "generate")
+            result = self._cache_store(request_key, result)
             
-            # Calculate metrics
-            generation_time = end_time - start_time
-            tokens_used = response.usage.total_tokens
-            cost_estimate = self._calculate_cost(tokens_used)
+        except Exception as e:
+            if not settled:
+                self._settle_call(permit, reservation, start_time, 0, e)
+            result = self._error_result(e)
+        except BaseException:
+            # Interrupted, e.g. by a Streamlit rerun: hand back the breaker probe and the reservation
+            if not settled:
+                self._settle_call(permit, reservation, None, 0)
+            raise
+        
+        return self._with_attempts(result, attempts)
+    
+    def _create_completion(self,
+                           messages: List[Dict],
+                           max_tokens: int,
+                           temperature: float,
+                           attempts: List[Dict]):
+        """Make one chat completion call under the retry policy"""
+        return self.retry_policy.call(
+            lambda timeout: self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                top_p=1,
+                frequency_penalty=0,
+                presence_penalty=0,
+                timeout=timeout
+            ),
+            attempts
+        )
+    
+    def _route(self) -> Tuple["APIHandler", Optional[Permit]]:
+        """
+        Pick the handler for the next upstream call from circuit breaker state
+        
+        Returns:
+            Tuple of (this handler, or one for the fallback model while this model's
+            breaker is open; the breaker permit the call's outcome is reported with)
+        
+        Raises:
+            CircuitOpen: If the breaker is open and the fallback is unavailable too
+        """
+        breaker = get_circuit_breaker(self.model)
+        if breaker is None:
+            return self, None
+        permit = breaker.allow()
+        if permit:
+            return self, permit
+        
+        fallback_model = CIRCUIT_BREAKER_SETTINGS['fallback_model']
+        if fallback_model and fallback_model != self.model:
+            permit = get_circuit_breaker(fallback_model).allow()
+            if permit:
+                return self._fallback_handler(fallback_model), permit
+        
+        raise CircuitOpen(self.model, breaker.retry_after())
+    
+    def _fallback_handler(self, model: str) -> "APIHandler":
+        """Copy of this handler bound to another model, sharing clients and settings"""
+        handler = self._fallback_handlers.get(model)
+        if handler is None:
+            handler = copy.copy(self)
+            handler.model = model
+            handler.rate_limiter = get_rate_limiter(self.api_key, model)
+            handler._fallback_handlers = {}
+            self._fallback_handlers[model] = handler
+        return handler
+    
+    def _record_outcome(self, permit: Optional[Permit], start_time: Optional[float], error: Optional[Exception] = None):
+        """Report a routed call to this model's breaker; start_time is None if it never went out"""
+        breaker = get_circuit_breaker(self.model)
+        if breaker is None:
+            return
+        if start_time is None:
+            breaker.release(permit)
+            return
+        breaker.record(permit, time.time() - start_time, failed=error is not None and is_upstream_failure(error))
+    
+    def _settle_call(self,
+                     permit: Optional[Permit],
+                     reservation,
+                     start_time: Optional[float],
+                     tokens_used: int,
+                     error: Optional[Exception] = None):
+        """Reconcile a call's rate limit reservation and report it to the breaker"""
+        if reservation:
+            self.rate_limiter.reconcile(reservation, tokens_used)
+        self._record_outcome(permit, start_time, error)
+    
+    def _hedged_completion(self, messages: List[Dict], max_tokens: int, temperature: float, reservation) -> Dict:
+        """
+        Stream the request and race a backup if its first token is slow
+        
+        Hedged calls take the place of the retry policy: a failed primary
+        fires the backup straight away. Spend on cancelled attempts is
+        recorded in the usage ledger and reported as hedge_extra_cost.
+        A cancelled attempt never reports its usage, so that spend is
+        estimated from the text it streamed and its ledger rows are marked
+        as estimates.
+        
+        Args:
+            reservation: The caller's rate limit reservation, settled here
+                against the primary's own usage
+        
+        Returns:
+            Result dict from the winning attempt
+        """
+        timeout = self.retry_policy.timeout_seconds
+        primary = Attempt(
+            "primary", self.model, messages,
+            openai_stream(self.client, self.model, messages, max_tokens, temperature, timeout)
+        )
+        primary.reservation = reservation
+        backups = []
+        
+        def start_backup() -> Optional[Attempt]:
+            backup = self._hedge_backup(messages, max_tokens, temperature, timeout)
+            if backup is not None:
+                backups.append(backup)
+            return backup
+        
+        try:
+            outcome = run_hedged(
+                primary,
+                start_backup,
+                GENERATION_SETTINGS['hedge_delay_seconds'],
+                self.retry_policy.deadline_seconds
+            )
+        except BaseException:
+            # The caller settles the primary's reservation
+            for backup in backups:
+                self._settle_attempt(backup)
+            raise
+        
+        extra_cost = 0.0
+        for attempt in outcome.attempts:
+            self._settle_attempt(attempt)
+        # Failed attempts are not billed; cancelled ones are, for what they generated
+        for loser in outcome.losers:
+            if loser.error:
+                continue
+            loser_result = self._make_result(
+                loser.content, loser.usage_counts(), time.time() - loser.started_at, model=loser.model
+            )
+            loser_result["usage_estimated"] = loser.usage_estimated
+            self._record_usage(loser_result)
+            extra_cost += loser_result["cost_estimate"]
+        get_hedge_stats().record(outcome, extra_cost)
+        
+        winner = outcome.winner
+        result = self._make_result(winner.content, winner.usage_counts(), 0, model=winner.model)
+        result.update({
+            "finish_reason": winner.finish_reason,
+            "hedged": outcome.fired,
+            "hedge_winner": winner.name,
+            "hedge_extra_cost": round(extra_cost, 6)
+        })
+        return result
+    
+    @staticmethod
+    def _settle_attempt(attempt: Attempt):
+        """Reconcile a hedge attempt's reservation with what it used; failed attempts are not billed"""
+        if attempt.reservation is None:
+            return
+        usage = attempt.usage_counts()
+        tokens_used = 0 if attempt.error else usage["prompt_tokens"] + usage["completion_tokens"]
+        attempt.reservation.limiter.reconcile(attempt.reservation, tokens_used)
+    
+    def _hedge_backup(self, messages: List[Dict], max_tokens: int, temperature: float, timeout: float) -> Optional[Attempt]:
+        """
+        Build the backup attempt configured by GENERATION_SETTINGS['hedge_backup']
+        
+        OpenAI backups run on their model's rate limit budget; if it has no
+        room right now, no backup is fired rather than queueing one.
+        """
+        backup = GENERATION_SETTINGS['hedge_backup']
+        
+        if backup == "anthropic":
+            client = get_client_registry().get_anthropic_client(get_env_config()['anthropic_api_key'])
+            if client is not None:
+                model = GENERATION_SETTINGS['hedge_anthropic_model']
+                return Attempt(
+                    "backup", model, messages,
+                    anthropic_stream(client, model, messages, max_tokens, temperature, timeout)
+                )
+            logging.warning("Anthropic hedge backup unavailable, hedging on the same model")
+        
+        model = GENERATION_SETTINGS['hedge_fallback_model'] if backup == "fallback" else self.model
+        reservation = get_rate_limiter(self.api_key, model).try_acquire(estimate_tokens(messages, max_tokens, model))
+        if reservation is None:
+            logging.info(f"Rate limit budget of {model} is spent, not firing the hedge backup")
+            return None
+        attempt = Attempt(
+            "backup", model, messages,
+            openai_stream(self.client, model, messages, max_tokens, temperature, timeout)
+        )
+        attempt.reservation = reservation
+        return attempt
+    
+    def _continue_truncated(self,
+                            messages: List[Dict],
+                            result: Dict,
+                            max_tokens: int,
+                            temperature: float,
+                            max_continuations: int) -> Dict:
+        """
+        Ask the model to carry on from where a truncated completion stopped
+        
+        Each round sends the partial output back as context and appends only
+        the new text, which is far cheaper than regenerating from scratch.
+        A failed round keeps the text produced so far.
+        
+        Returns:
+            Result with the joined content and continuation_rounds; the rounds'
+            call telemetry goes to continuation_attempts, not retry_count
+        """
+        result["continuation_rounds"] = 0
+        continuation_attempts = []
+        
+        while result["finish_reason"] == "length" and result["continuation_rounds"] < max_continuations:
+            continuation = self._continuation_request(messages, result, max_tokens)
+            if continuation is None:
+                break
             
-            return {
-                "success": True,
-                "content": content,
-                "model": self.model,
-                "tokens_used": tokens_used,
-                "generation_time": round(generation_time, 2),
-                "cost_estimate": cost_estimate,
-                "timestamp": time.time()
-            }
+            continuation_messages, continuation_max_tokens = continuation
+            reservation = None
+            try:
+                reservation = self.rate_limiter.acquire(
+                    estimate_tokens(continuation_messages, continuation_max_tokens, self.model)
+                )
+                start_time = time.time()
+                response = self._create_completion(
+                    continuation_messages, continuation_max_tokens, temperature, continuation_attempts
+                )
+                end_time = time.time()
+            except Exception as e:
+                if reservation:
+                    self.rate_limiter.reconcile(reservation, 0)
+                logging.warning(f"Continuation failed, keeping truncated content: {str(e)}")
+                break
             
-        except openai.AuthenticationError:
+            self.rate_limiter.reconcile(reservation, response.usage.total_tokens)
+            self._merge_continuation(result, response, end_time - start_time, reservation.wait_time)
+        
+        if continuation_attempts:
+            result["continuation_attempts"] = continuation_attempts
+        return result
+    
+    def _continuation_request(self, messages: List[Dict], result: Dict, max_tokens: int):
+        """
+        Build the messages for the next continuation round
+        
+        Returns:
+            Tuple of (messages, max_tokens), or None if the partial output
+            no longer fits the context window
+        """
+        continuation_messages = messages + [
+            {"role": "assistant", "content": result["content"]},
+            {"role": "user", "content": CONTINUATION_PROMPT}
+        ]
+        try:
+            continuation_messages, max_tokens, _ = fit_to_context(
+                continuation_messages, max_tokens, self.model, allow_compress=False
+            )
+        except ContextLengthExceeded:
+            return None
+        return continuation_messages, max_tokens
+    
+    def _merge_continuation(self, result: Dict, response, generation_time: float, queue_wait: float):
+        """Append one continuation round to the result and update its metrics"""
+        result["content"] += response.choices[0].message.content or ""
+        result["finish_reason"] = response.choices[0].finish_reason
+        for counter, value in self._usage_counts(response.usage).items():
+            result[counter] += value
+        result["tokens_used"] = result["prompt_tokens"] + result["completion_tokens"]
+        result["cost_estimate"] = self._calculate_cost(
+            result["prompt_tokens"], result["completion_tokens"], result["cached_tokens"], model=result["model"]
+        )
+        result["generation_time"] = round(result["generation_time"] + generation_time, 2)
+        result["queue_wait"] = round(result["queue_wait"] + queue_wait, 2)
+        result["continuation_rounds"] += 1
+    
+    def _progress(self) -> ProgressHook:
+        """Get the progress hook for the current call"""
+        return self.progress_hook or get_progress_hook()
+    
+    def _prepare_request(self, prompt: str, system_prompt: str, max_tokens: int):
+        """
+        Build the messages and fit them to the model's context window
+        
+        Returns:
+            Tuple of (messages, max_tokens, preflight info for the result)
+        """
+        messages = self._build_messages(prompt, system_prompt)
+        return fit_to_context(messages, max_tokens, self.model)
+    
+    def _build_messages(self, prompt: str, system_prompt: str = None) -> List[Dict]:
+        """Build the chat messages list for a request"""
+        messages = []
+        
+        if system_prompt:
+            messages.append({
+                "role": "system", 
+                "content": system_prompt
+            })
+        
+        messages.append({
+            "role": "user", 
+            "content": prompt
+        })
+        
+        return messages
+    
+    def stream_content(self, 
+                      prompt: str, 
+                      max_tokens: int = 1500, 
+                      temperature: float = 0.7,
+                      system_prompt: str = None,
+                      finalize: Optional[Callable[[Dict], Dict]] = None,
+                      bypass_cache: bool = False,
+                      coalesce: Optional[bool] = None,
+                      template: Optional[str] = None) -> "ContentStream":
+        """
+        Stream content from OpenAI API as it is generated
+        
+        Streams are not hedged even when hedging is enabled: deltas already
+        shown to the user cannot be swapped for a backup's text.
+        
+        Args:
+            prompt: User prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Creativity level (0-1)
+            system_prompt: System instructions
+            finalize: Optional hook applied to the successful result once streaming ends
+            bypass_cache: Skip cached results and always call the API (e.g. regenerate)
+            coalesce: Wait for an identical stream already in flight instead of starting another;
+                None does so only at temperature 0, True also for sampled requests
+            template: Prompt template name the provider prompt cache hit ratio is tracked under
+            
+        Returns:
+            ContentStream yielding text deltas; its ``result`` holds the metadata
+        """
+        try:
+            messages, max_tokens, preflight = self._prepare_request(prompt, system_prompt, max_tokens)
+        except ContextLengthExceeded as e:
+            return ContentStream(self, [], max_tokens, temperature, error_result=self._error_result(e))
+        
+        request_key = self._request_key(messages, max_tokens, temperature)
+        cached_result = self._cache_lookup(request_key, bypass_cache)
+        
+        flight, leader = None, False
+        if not cached_result and self._coalesces(coalesce, temperature, bypass_cache):
+            flight, leader = get_single_flight().join(request_key)
+        
+        return ContentStream(
+            handler=self,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            finalize=finalize,
+            request_key=request_key,
+            cached_result=cached_result,
+            flight=flight,
+            leader=leader,
+            preflight=preflight,
+            template=template
+        )
+    
+    @staticmethod
+    def _coalesces(coalesce: Optional[bool], temperature: float, bypass_cache: bool) -> bool:
+        """Whether a request shares an identical in-flight call"""
+        if bypass_cache:
+            return False
+        # Every waiter gets the leader's text, so sampled requests must opt in
+        return temperature == 0 if coalesce is None else coalesce
+    
+    def _request_key(self, messages: List[Dict], max_tokens: int, temperature: float) -> str:
+        """Hash of everything that determines the completion"""
+        return ResponseCache.make_key(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+    
+    def _cache_lookup(self, request_key: str, bypass_cache: bool = False) -> Optional[Dict]:
+        """Look up a request in the response cache"""
+        cache = get_response_cache()
+        if cache is None or bypass_cache:
+            return None
+        
+        cached = cache.get(request_key)
+        if cached is None:
+            return None
+        
+        # Nothing was spent on a cache hit
+        cached.update({
+            "tokens_used": 0,
+            "cost_estimate": 0.0,
+            "generation_time": 0.0,
+            "timestamp": time.time(),
+            "cache_hit": True,
+            "cache_stats": cache.stats()
+        })
+        return cached
+    
+    def _cache_store(self, request_key: str, result: Dict) -> Dict:
+        """Store a successful result in the response cache and annotate it"""
+        cache = get_response_cache()
+        if cache is None:
+            return result
+        
+        if result.get("success"):
+            cache.set(request_key, result)
+        
+        result["cache_hit"] = False
+        result["cache_stats"] = cache.stats()
+        return result
+    
+    def _coalesced_result(self, result: Dict) -> Dict:
+        """Copy of another caller's result; the spend is reported by that caller"""
+        result = dict(result)
+        if result.get("success"):
+            result.update({
+                "tokens_used": 0,
+                "cost_estimate": 0.0,
+                "timestamp": time.time()
+            })
+        result["coalesced"] = True
+        return result
+    
+    def _build_result(self, response, generation_time: float) -> Dict:
+        """Build the result dict from a chat completion response"""
+        result = self._make_result(
+            content=response.choices[0].message.content,
+            usage=self._usage_counts(response.usage),
+            generation_time=generation_time
+        )
+        result["finish_reason"] = response.choices[0].finish_reason
+        return result
+    
+    def _make_result(self, content: str, usage: Dict, generation_time: float, model: Optional[str] = None) -> Dict:
+        """
+        Build a successful result dict with cost metrics
+        
+        Args:
+            content: Generated text
+            usage: prompt_tokens, completion_tokens and cached_tokens (see _usage_counts)
+            generation_time: Seconds spent generating
+            model: Model that produced the content, if not this handler's model
+        """
+        model = model or self.model
+        cost_estimate = self._calculate_cost(
+            usage["prompt_tokens"], usage["completion_tokens"], usage["cached_tokens"], model=model
+        )
+        
+        return {
+            "success": True,
+            "content": content,
+            "model": model,
+            "tokens_used": usage["prompt_tokens"] + usage["completion_tokens"],
+            **usage,
+            "generation_time": round(generation_time, 2),
+            "cost_estimate": cost_estimate,
+            "timestamp": time.time()
+        }
+    
+    @staticmethod
+    def _usage_counts(usage) -> Dict:
+        """Token counts from an API usage object or a Batch API usage dict"""
+        if not isinstance(usage, dict):
+            usage = usage.model_dump()
+        details = usage.get("prompt_tokens_details") or {}
+        return {
+            "prompt_tokens": usage.get("prompt_tokens") or 0,
+            "completion_tokens": usage.get("completion_tokens") or 0,
+            "cached_tokens": details.get("cached_tokens") or 0
+        }
+    
+    def _observe_latency(self, result: Dict, operation: str, **labels):
+        """Record queue wait, latency and time-to-first-token histograms for a fresh result"""
+        metrics = get_metrics()
+        labels = {"model": result["model"], "operation": operation, **labels}
+        metrics.observe("generation_queue_wait_seconds", result.get("queue_wait", 0.0), **labels)
+        metrics.observe("generation_latency_seconds", result["generation_time"], **labels)
+        if "time_to_first_token" in result:
+            metrics.observe("generation_time_to_first_token_seconds", result["time_to_first_token"], **labels)
+    
+    def _record_usage(self, result: Dict):
+        """Append a fresh successful result to the usage ledger"""
+        if not result.get("success"):
+            return
+        get_usage_ledger().record(
+            key_id=key_id(self.api_key),
+            model=result["model"],
+            generator=self.generator,
+            prompt_tokens=result["prompt_tokens"],
+            completion_tokens=result["completion_tokens"],
+            cached_tokens=result["cached_tokens"],
+            latency=result["generation_time"],
+            cost=result["cost_estimate"],
+            batch=result.get("batch", False),
+            estimated=result.get("usage_estimated", False)
+        )
+    
+    def _record_prompt_cache(self, result: Dict, template: Optional[str]):
+        """Count a fresh result's cached prompt tokens towards its template's hit ratio"""
+        if not template or not result.get("success") or result.get("cache_hit") or result.get("coalesced"):
+            return
+        get_prompt_cache_stats().record(template, result["prompt_tokens"], result["cached_tokens"])
+    
+    def _with_attempts(self, result: Dict, attempts: List[Dict]) -> Dict:
+        """Attach per-attempt retry telemetry to a result"""
+        if attempts:
+            result["attempts"] = attempts
+            result["retry_count"] = len(attempts) - 1
+        return result
+    
+    def _error_result(self, error: Exception) -> Dict:
+        """Map an API exception to a failure result dict"""
+        if isinstance(error, openai.AuthenticationError):
             return {
                 "success": False,
                 "error": "API anahtarı geçersiz. Lütfen doğru API anahtarını girin.",
                 "error_type": "authentication"
             }
-            
-        except openai.RateLimitError:
+        
+        # Quota exhaustion is reported as a 429 with a dedicated error code
+        if isinstance(error, openai.RateLimitError) and getattr(error, "code", None) == "insufficient_quota":
+            return {
+                "success": False,
+                "error": "API quota yetersiz. Lütfen billing bilgilerinizi kontrol edin.",
+                "error_type": "quota"
+            }
+        
+        if isinstance(error, (openai.RateLimitError, RateLimitWaitTooLong)):
             return {
                 "success": False,
                 "error": "Rate limit aşıldı. Lütfen biraz bekleyip tekrar deneyin.",
                 "error_type": "rate_limit"
             }
-            
-        except openai.InsufficientQuotaError:
+        
+        if isinstance(error, ContextLengthExceeded) or getattr(error, "code", None) == "context_length_exceeded":
             return {
                 "success": False,
-                "error": "API quota yetersiz. Lütfen billing bilgilerinizi kontrol edin.",
-                "error_type": "quota"
+                "error": f"İstem modelin bağlam sınırını aşıyor. Lütfen girdileri kısaltın. ({str(error)})",
+                "error_type": "context_length"
             }
-            
-        except Exception as e:
-            logging.error(f"API call failed: {str(e)}")
+        
+        if isinstance(error, CircuitOpen):
             return {
                 "success": False,
-                "error": f"Bir hata oluştu: {str(e)}",
-                "error_type": "general"
+                "error": f"{error.model} şu anda yanıt vermiyor (servis kesintisi). "
+                         f"Lütfen {max(1, round(error.retry_after))} saniye sonra tekrar deneyin.",
+                "error_type": "circuit_open"
             }
+        
+        if isinstance(error, (openai.APITimeoutError, DeadlineExceeded, TimeoutError)):
+            return {
+                "success": False,
+                "error": "İstek zaman aşımına uğradı. Lütfen tekrar deneyin.",
+                "error_type": "timeout"
+            }
+        
+        if isinstance(error, openai.APIConnectionError):
+            return {
+                "success": False,
+                "error": "AI servisine bağlanılamadı. Lütfen bağlantınızı kontrol edip tekrar deneyin.",
+                "error_type": "connection"
+            }
+        
+        if isinstance(error, openai.InternalServerError):
+            return {
+                "success": False,
+                "error": "AI servisi geçici bir hata döndürdü. Lütfen tekrar deneyin.",
+                "error_type": "server"
+            }
+        
+        logging.error(f"API call failed: {str(error)}")
+        return {
+            "success": False,
+            "error": f"Bir hata oluştu: {str(error)}",
+            "error_type": "general"
+        }
     
-    def _calculate_cost(self, tokens: int) -> float:
-        """Calculate estimated cost based on model and tokens"""
-        # Pricing per 1K tokens (approximate, as of late 2024)
-        pricing = {
-            "gpt-3.5-turbo": 0.002,
-            "gpt-4": 0.03,
-            "gpt-4-turbo-preview": 0.01
+    def build_batch_body(self,
+                         prompt: str,
+                         max_tokens: int = 1500,
+                         temperature: float = 0.7,
+                         system_prompt: str = None,
+                         template: Optional[str] = None) -> Dict:
+        """Build the chat completion body for one Batch API input line (template is not sent)"""
+        return {
+            "model": self.model,
+            "messages": self._build_messages(prompt, system_prompt),
+            "max_tokens": max_tokens,
+            "temperature": temperature
         }
+    
+    def batch_result(self, output: Dict) -> Dict:
+        """
+        Turn one parsed Batch API output entry into a result dict
+        
+        Args:
+            output: Entry returned by batch_runner.read_batch_output
+        
+        Returns:
+            Result dict in the generate_content format, priced at the batch rate
+        """
+        if "error" in output:
+            return {
+                "success": False,
+                "error": output["error"],
+                "error_type": "batch"
+            }
+        
+        result = self._make_result(output["content"], self._usage_counts(output["usage"]), 0)
+        result["cost_estimate"] = round(result["cost_estimate"] * API_CONFIG['openai']['batch_discount'], 6)
+        result["finish_reason"] = output.get("finish_reason")
+        result["batch"] = True
+        self._record_usage(result)
+        return result
+    
+    def _calculate_cost(self,
+                        prompt_tokens: int,
+                        completion_tokens: int = 0,
+                        cached_tokens: int = 0,
+                        model: Optional[str] = None) -> float:
+        """
+        Calculate estimated cost from the pricing tables in API_CONFIG
+        
+        Args:
+            prompt_tokens: All prompt tokens, including cached ones
+            completion_tokens: Generated tokens
+            cached_tokens: Prompt tokens served from the provider's prompt cache
+            model: Model to price, defaults to this handler's model
+        """
+        pricing = {**API_CONFIG['openai']['pricing'], **API_CONFIG['anthropic']['pricing']}
+        rates = pricing.get(model or self.model, pricing['gpt-3.5-turbo'])
         
-        base_price = pricing.get(self.model, 0.002)
-        return round((tokens / 1000) * base_price, 4)
+        cost = (
+            (prompt_tokens - cached_tokens) * rates['prompt']
+            + cached_tokens * rates['cached']
+            + completion_tokens * rates['completion']
+        ) / 1000
+        return round(cost, 6)
     
     def validate_api_key(self) -> bool:
-        """Validate if API key is working"""
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": "Test"}],
-                max_tokens=5
-            )
-            return True
-        except:
-            return False
+        """Validate if API key is working (cached per key, see utils.key_validator)"""
+        return bool(get_key_validator().validate(self.api_key)["valid"])
     
     def get_available_models(self) -> List[str]:
-        """Get list of available models"""
-        try:
-            models = self.client.models.list()
-            gpt_models = [
-                model.id for model in models.data 
-                if model.id.startswith(('gpt-3.5', 'gpt-4'))
-            ]
-            return sorted(gpt_models)
-        except:
-            return ["gpt-3.5-turbo", "gpt-4"]
+        """Get list of available models (cached per key)"""
+        return get_key_validator().get_models(self.api_key) or ["gpt-3.5-turbo", "gpt-4"]
 
-class ContentAnalyzer:
-    """Analyze generated content quality and metrics"""
+class ContentStream:
+    """Iterable over streamed content deltas that records latency metrics"""
     
-    @staticmethod
-    def analyze_content(content: str) -> Dict:
-        """Analyze content and return metrics"""
+    def __init__(self,
+                 handler: APIHandler,
+                 messages: List[Dict],
+                 max_tokens: int,
+                 temperature: float,
+                 finalize: Optional[Callable[[Dict], Dict]] = None,
+                 request_key: Optional[str] = None,
+                 cached_result: Optional[Dict] = None,
+                 flight: Optional[Flight] = None,
+                 leader: bool = False,
+                 preflight: Optional[Dict] = None,
+                 error_result: Optional[Dict] = None,
+                 template: Optional[str] = None):
+        self.handler = handler
+        self.messages = messages
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.finalize = finalize
+        self.request_key = request_key
+        self.cached_result = cached_result
+        self.flight = flight
+        self.leader = leader
+        self.preflight = preflight or {}
+        self.error_result = error_result
+        self.template = template
+        self.rerouted_from = None
+        # Iteration happens outside the generator call, so keep its metric labels
+        self.metric_labels = current_labels()
+        self.content = ""
+        self.result = None
+    
+    def __iter__(self) -> Iterator[str]:
+        if self.error_result:
+            # The request was rejected before anything was sent
+            self.result = self.error_result
+            return
+        
+        if self.flight is not None and not self.leader:
+            # An identical stream is already running; wait for it and replay its result
+            shared = self.flight.wait(self.handler.retry_policy.deadline_seconds)
+            if shared and shared.get("success"):
+                self.cached_result = self.handler._coalesced_result(shared)
+        
+        if self.cached_result:
+            # Replay the cached completion as a single delta
+            self.content = self.cached_result["content"]
+            yield self.content
+            self._finish(dict(self.cached_result))
+            return
+        
+        raw_result = None
+        try:
+            raw_result = yield from self._stream()
+        finally:
+            if self.leader:
+                get_single_flight().land(self.request_key, self.flight, raw_result)
+        
+        if raw_result["success"]:
+            self._finish(dict(raw_result))
+        else:
+            self.result = raw_result
+    
+    def _finish(self, result: Dict):
+        result.update(self.preflight)
+        self.result = self.finalize(result) if self.finalize else result
+    
+    def _stream(self) -> Iterator[str]:
+        """Stream from the API, yielding deltas and returning the raw result dict"""
+        parts = []
+        usage = None
+        finish_reason = None
+        chunk_count = 0
+        first_token_time = None
+        attempts = []
+        reservation = None
+        start_time = None
+        stream = None
+        
+        try:
+            handler, permit = self.handler._route()
+        except CircuitOpen as e:
+            return self.handler._error_result(e)
+        if handler is not self.handler:
+            # The rest of the stream runs on the fallback model
+            self.rerouted_from = self.handler.model
+            self.handler = handler
+        limiter = self.handler.rate_limiter
+        
         try:
-            from textblob import TextBlob
+            reservation = limiter.acquire(estimate_tokens(self.messages, self.max_tokens, self.handler.model))
+            start_time = time.time()
             
-            blob = TextBlob(content)
+            # Only opening the stream is retried; deltas already yielded cannot be replayed
+            stream = self.handler.retry_policy.call(
+                lambda timeout: self.handler.client.chat.completions.create(
+                    model=self.handler.model,
+                    messages=self.messages,
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                    top_p=1,
+                    frequency_penalty=0,
+                    presence_penalty=0,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    timeout=timeout
+                ),
+                attempts
+            )
             
-            # Basic metrics
-            word_count = len(content.split())
-            char_count = len(content)
-            sentence_count = len(blob.sentences)
+            for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                if chunk.choices[0].finish_reason:
+                    finish_reason = chunk.choices[0].finish_reason
+                
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if first_token_time is None:
+                        first_token_time = time.time()
+                    chunk_count += 1
+                    parts.append(delta)
+                    self.content = "".join(parts)
+                    yield delta
             
-            # Readability (simple approximation)
-            avg_sentence_length = word_count / max(sentence_count, 1)
-            readability_score = max(0, 100 - (avg_sentence_length * 2))
+            end_time = time.time()
             
-            # Sentiment analysis
-            sentiment = blob.sentiment
+        except Exception as e:
+            self.handler._settle_call(permit, reservation, start_time, 0, e)
+            return self.handler._with_attempts(self.handler._error_result(e), attempts)
+        except BaseException:
+            # The consumer dropped the stream (GeneratorExit) or Streamlit stopped the
+            # script run mid-stream: hand back the breaker probe and the reservation
+            self.handler._settle_call(permit, reservation, None, 0)
+            raise
+        finally:
+            if stream is not None:
+                stream.close()
+        
+        self.handler._record_outcome(permit, start_time)
+        
+        # Usage is only reported on the final chunk; fall back to local counts
+        if usage:
+            counts = self.handler._usage_counts(usage)
+        else:
+            counts = {
+                "prompt_tokens": get_tokenizer(self.handler.model).count_messages(self.messages),
+                "completion_tokens": chunk_count,
+                "cached_tokens": 0
+            }
+        actual_tokens = counts["prompt_tokens"] + counts["completion_tokens"] if usage else reservation.estimated_tokens
+        limiter.reconcile(reservation, actual_tokens)
+        
+        time_to_first_token = (first_token_time or end_time) - start_time
+        streaming_time = end_time - (first_token_time or end_time)
+        tokens_per_second = counts["completion_tokens"] / streaming_time if streaming_time > 0 else 0.0
+        
+        result = self.handler._make_result(self.content, counts, end_time - start_time)
+        result = self.handler._with_attempts(result, attempts)
+        self.handler._record_usage(result)
+        self.handler._record_prompt_cache(result, self.template)
+        if self.rerouted_from:
+            result["rerouted_from"] = self.rerouted_from
+        result.update({
+            "streamed": True,
+            "finish_reason": finish_reason,
+            "queue_wait": round(reservation.wait_time, 2),
+            "time_to_first_token": round(time_to_first_token, 2),
+            "tokens_per_second": round(tokens_per_second, 1)
+        })
+        self.handler._observe_latency(result, "stream", **self.metric_labels)
+        return self.handler._cache_store(self.request_key, result)
+
+class AsyncAPIHandler(APIHandler):
+    """Handle concurrent API calls with a bounded number of in-flight requests"""
+    
+    def __init__(self,
+                 api_key: str,
+                 model: str = "gpt-3.5-turbo",
+                 max_concurrency: int = 5,
+                 progress_hook: Optional[ProgressHook] = None,
+                 generator: Optional[str] = None):
+        super().__init__(api_key, model, progress_hook=progress_hook, generator=generator)
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = None
+        self._semaphore_loop = None
+        self._loop = None
+        self._loop_lock = threading.Lock()
+    
+    @property
+    def async_client(self) -> openai.AsyncOpenAI:
+        """Async client shared per key on the running event loop's connection pool"""
+        return get_client_registry().get_async_openai_client(self.api_key)
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the concurrency semaphore bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def agenerate_content(self, 
+                               prompt: str, 
+                               max_tokens: int = 1500, 
+                               temperature: float = 0.7,
+                               system_prompt: str = None,
+                               bypass_cache: bool = False,
+                               coalesce: Optional[bool] = None,
+                               max_continuations: Optional[int] = None,
+                               template: Optional[str] = None) -> Dict:
+        """
+        Generate content using OpenAI API without blocking the event loop
+        
+        Args:
+            prompt: User prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Creativity level (0-1)
+            system_prompt: System instructions
+            bypass_cache: Skip cached results and always call the API
+            coalesce: Share one upstream call with identical requests already in flight;
+                None does so only at temperature 0, True also for sampled requests
+            max_continuations: Continuation rounds allowed when the output is cut off
+                at max_tokens (defaults to GENERATION_SETTINGS['max_continuations'])
+            template: Prompt template name the provider prompt cache hit ratio is tracked under
             
-            # Extract hashtags and mentions
-            words = content.split()
-            hashtags = [word for word in words if word.startswith('#')]
-            mentions = [word for word in words if word.startswith('@')]
+        Returns:
+            Dict with generated content and metadata
+        """
+        try:
+            messages, max_tokens, preflight = self._prepare_request(prompt, system_prompt, max_tokens)
+        except ContextLengthExceeded as e:
+            return self._error_result(e)
+        
+        if max_continuations is None:
+            max_continuations = GENERATION_SETTINGS['max_continuations']
+        
+        request_key = self._request_key(messages, max_tokens, temperature)
+        
+        cached_result = self._cache_lookup(request_key, bypass_cache)
+        if cached_result:
+            return {**cached_result, **preflight}
+        
+        if self._coalesces(coalesce, temperature, bypass_cache):
+            result, shared = await get_single_flight().ado(
+                request_key,
+                lambda: self._agenerate(messages, max_tokens, temperature, request_key, max_continuations)
+            )
+            result = self._coalesced_result(result) if shared else result
+        else:
+            result = await self._agenerate(messages, max_tokens, temperature, request_key, max_continuations)
+        
+        self._record_prompt_cache(result, template)
+        return {**result, **preflight}
+    
+    async def _agenerate(self,
+                         messages: List[Dict],
+                         max_tokens: int,
+                         temperature: float,
+                         request_key: str,
+                         max_continuations: int) -> Dict:
+        """Call the API for a request that was not served from cache"""
+        try:
+            handler, permit = self._route()
+        except CircuitOpen as e:
+            return self._error_result(e)
+        
+        result = await handler._acall_api(messages, max_tokens, temperature, request_key, max_continuations, permit)
+        if handler is not self:
+            result["rerouted_from"] = self.model
+        return result
+    
+    async def _acall_api(self,
+                         messages: List[Dict],
+                         max_tokens: int,
+                         temperature: float,
+                         request_key: str,
+                         max_continuations: int,
+                         permit: Optional[Permit]) -> Dict:
+        """Async counterpart of _call_api"""
+        attempts = []
+        reservation = None
+        start_time = None
+        settled = False
+        
+        try:
+            async with self._get_semaphore():
+                reservation = await self.rate_limiter.aacquire(estimate_tokens(messages, max_tokens, self.model))
+                start_time = time.time()
+                
+                response = await self._acreate_completion(messages, max_tokens, temperature, attempts)
+                
+                end_time = time.time()
             
-            return {
-                "word_count": word_count,
-                "char_count": char_count,
-                "sentence_count": sentence_count,
-                "avg_sentence_length": round(avg_sentence_length, 1),
-                "readability_score": round(readability_score, 1),
-                "sentiment_polarity": round(sentiment.polarity, 2),
-                "sentiment_subjectivity": round(sentiment.subjectivity, 2),
-                "hashtags": hashtags,
-                "mentions": mentions,
-                "hashtag_count": len(hashtags),
-                "mention_count": len(mentions)
-            }
+            self._settle_call(permit, reservation, start_time, response.usage.total_tokens)
+            settled = True
+            result = self._build_result(response, end_time - start_time)
+            result["queue_wait"] = round(reservation.wait_time, 2)
+            result = await self._acontinue_truncated(messages, result, max_tokens, temperature, max_continuations)
+            self._record_usage(result)
+            self._observe_latency(result, "async")
+            result = self._cache_store(request_key, result)
             
         except Exception as e:
-            # Fallback basic analysis
-            word_count = len(content.split())
-            char_count = len(content)
+            if not settled:
+                self._settle_call(permit, reservation, start_time, 0, e)
+            result = self._error_result(e)
+        except BaseException:
+            # Cancelled: hand back the breaker probe and the reservation
+            if not settled:
+                self._settle_call(permit, reservation, None, 0)
+            raise
+        
+        return self._with_attempts(result, attempts)
+    
+    async def _acreate_completion(self,
+                                  messages: List[Dict],
+                                  max_tokens: int,
+                                  temperature: float,
+                                  attempts: List[Dict]):
+        """Make one async chat completion call under the retry policy"""
+        return await self.retry_policy.acall(
+            lambda timeout: self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                top_p=1,
+                frequency_penalty=0,
+                presence_penalty=0,
+                timeout=timeout
+            ),
+            attempts
+        )
+    
+    async def _acontinue_truncated(self,
+                                   messages: List[Dict],
+                                   result: Dict,
+                                   max_tokens: int,
+                                   temperature: float,
+                                   max_continuations: int) -> Dict:
+        """Async counterpart of _continue_truncated"""
+        result["continuation_rounds"] = 0
+        continuation_attempts = []
+        
+        while result["finish_reason"] == "length" and result["continuation_rounds"] < max_continuations:
+            continuation = self._continuation_request(messages, result, max_tokens)
+            if continuation is None:
+                break
             
-            return {
-                "word_count": word_count,
-                "char_count": char_count,
-                "sentence_count": content.count('.') + content.count('!') + content.count('?'),
-                "error": f"Advanced analysis failed: {str(e)}"
-            }
+            continuation_messages, continuation_max_tokens = continuation
+            reservation = None
+            try:
+                async with self._get_semaphore():
+                    reservation = await self.rate_limiter.aacquire(
+                        estimate_tokens(continuation_messages, continuation_max_tokens, self.model)
+                    )
+                    start_time = time.time()
+                    response = await self._acreate_completion(
+                        continuation_messages, continuation_max_tokens, temperature, continuation_attempts
+                    )
+                    end_time = time.time()
+            except Exception as e:
+                if reservation:
+                    self.rate_limiter.reconcile(reservation, 0)
+                logging.warning(f"Continuation failed, keeping truncated content: {str(e)}")
+                break
+            
+            self.rate_limiter.reconcile(reservation, response.usage.total_tokens)
+            self._merge_continuation(result, response, end_time - start_time, reservation.wait_time)
+        
+        if continuation_attempts:
+            result["continuation_attempts"] = continuation_attempts
+        return result
+    
+    async def agather_generate(self, requests: List[Dict]) -> List[Dict]:
+        """
+        Run several generation requests concurrently
+        
+        Args:
+            requests: List of keyword argument dicts for agenerate_content
+            
+        Returns:
+            List of result dicts in the same order as requests
+        """
+        return await asyncio.gather(
+            *(self.agenerate_content(**request) for request in requests)
+        )
+    
+    def gather_generate(self, requests: List[Dict]) -> List[Dict]:
+        """
+        Run several generation requests concurrently from synchronous code
+        
+        Args:
+            requests: List of keyword argument dicts for agenerate_content
+            
+        Returns:
+            List of result dicts in the same order as requests
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self.agather_generate(requests),
+            self._get_background_loop()
+        )
+        return future.result()
+    
+    def _get_background_loop(self) -> asyncio.AbstractEventLoop:
+        """Get the event loop that sync callers share, so pooled connections stay usable"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="async-api-handler",
+                    daemon=True
+                ).start()
+            return self._loop
 
 class PromptOptimizer:
     """Optimize prompts for better results"""
@@ -239,19 +1280,20 @@ class PromptOptimizer:
             "persuasive": "ikna edici ve satış odaklı"
         }
         
-        # Build optimized prompt
-        optimized_prompt = base_prompt
+        # Per-request settings only, always in the same order; the general
+        # instructions live in the static system prompt prefix so it can be cached
+        settings = []
         
         if platform and platform.lower() in platform_specs:
-            optimized_prompt += f"\n\nPlatform özelikleri: {platform_specs[platform.lower()]}"
+            settings.append(f"Platform özelikleri: {platform_specs[platform.lower()]}")
         
         if tone in tone_specs:
-            optimized_prompt += f"\nTon: {tone_specs[tone]}"
+            settings.append(f"Ton: {tone_specs[tone]}")
         
         if target_audience:
-            optimized_prompt += f"\nHedef kitle: {target_audience}"
+            settings.append(f"Hedef kitle: {target_audience}")
         
-        # Add general optimization instructions
-        optimized_prompt += "\n\nLütfen içeriği yaratıcı, özgün ve hedef kitle için uygun olacak şekilde oluşturun."
+        if not settings:
+            return base_prompt
         
-        return optimized_prompt
\ No newline at end of file
+        return base_prompt + "\n\n" + "\n".join(settings)
\ No newline at end of file
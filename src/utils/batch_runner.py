@@ -0,0 +1,269 @@
+import json
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+from utils.config import PATHS
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Statuses after which a batch will not change any more
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def build_batch_line(custom_id: str, body: Dict) -> Dict:
+    """Build one Batch API input line for a chat completion request"""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": body
+    }
+
+
+def manifest_path(input_path: str) -> str:
+    """Path of the manifest that sits next to a batch input file"""
+    return f"{input_path}.manifest.json"
+
+
+def write_batch_file(lines: List[Dict], path: str, manifest: Optional[Dict] = None) -> str:
+    """
+    Write Batch API input lines as JSONL
+
+    Args:
+        lines: Lines built with build_batch_line
+        path: Output JSONL path
+        manifest: Per-item metadata needed to post-process the results later
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    if manifest is not None:
+        with open(manifest_path(path), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def read_manifest(input_path: str) -> Dict:
+    """Read the manifest written alongside a batch input file"""
+    with open(manifest_path(input_path), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_batch_output(path: str) -> Dict[str, Dict]:
+    """
+    Read a Batch API output file
+
+    Returns:
+        Dict mapping custom_id to {"content", "usage", "finish_reason"} or {"error"}
+    """
+    results = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for raw_line in f:
+            if not raw_line.strip():
+                continue
+            line = json.loads(raw_line)
+            response = line.get("response") or {}
+            body = response.get("body") or {}
+
+            if line.get("error") or response.get("status_code") != 200:
+                error = line.get("error") or body.get("error") or {}
+                results[line["custom_id"]] = {
+                    "error": error.get("message", "Batch isteği başarısız oldu.")
+                }
+                continue
+
+            choice = body["choices"][0]
+            results[line["custom_id"]] = {
+                "content": choice["message"]["content"],
+                "finish_reason": choice.get("finish_reason"),
+                "usage": body.get("usage", {})
+            }
+    return results
+
+
+class BatchRunner(ABC):
+    """Submit a batch input file, wait for it and fetch the output"""
+
+    @abstractmethod
+    def submit(self, input_path: str) -> str:
+        """Submit an input JSONL file and return the batch id"""
+        pass
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Get the batch status (validating, in_progress, completed, ...)"""
+        pass
+
+    @abstractmethod
+    def download(self, batch_id: str, output_path: str) -> str:
+        """Save the output JSONL of a completed batch, failed requests included"""
+        pass
+
+    def wait(self, batch_id: str, poll_interval: float = 30, timeout: float = 24 * 60 * 60) -> str:
+        """Poll until the batch reaches a terminal status or the timeout passes"""
+        deadline = time.time() + timeout
+        status = self.status(batch_id)
+        while status not in TERMINAL_STATUSES and time.time() < deadline:
+            time.sleep(poll_interval)
+            status = self.status(batch_id)
+        return status
+
+    def run(self,
+            input_path: str,
+            output_path: str,
+            poll_interval: float = 30,
+            timeout: float = 24 * 60 * 60) -> Dict:
+        """
+        Submit, wait and download in one go
+
+        Returns:
+            Dict with batch_id, status and output_path (None unless completed)
+        """
+        batch_id = self.submit(input_path)
+        status = self.wait(batch_id, poll_interval, timeout)
+        if status != "completed":
+            return {"batch_id": batch_id, "status": status, "output_path": None}
+        return {
+            "batch_id": batch_id,
+            "status": status,
+            "output_path": self.download(batch_id, output_path)
+        }
+
+
+class OpenAIBatchRunner(BatchRunner):
+    """Run batches through the OpenAI Batch API"""
+
+    def __init__(self, client, completion_window: str = "24h"):
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def download(self, batch_id: str, output_path: str) -> str:
+        batch = self.client.batches.retrieve(batch_id)
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+        # Successful requests go to the output file and failed ones to the error
+        # file; either is None when it would be empty
+        with open(output_path, "wb") as f:
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if not file_id:
+                    continue
+                content = self.client.files.content(file_id).read()
+                f.write(content)
+                if content and not content.endswith(b"\n"):
+                    f.write(b"\n")
+        return output_path
+
+
+def echo_responder(body: Dict) -> str:
+    """Default local responder: echoes the start of the user prompt"""
+    prompt = body["messages"][-1]["content"]
+    return f"[Yerel batch yanıtı] {prompt[:200]}"
+
+
+class LocalBatchRunner(BatchRunner):
+    """File-based stand-in for the Batch API that never touches the network"""
+
+    def __init__(self,
+                 batch_dir: Optional[str] = None,
+                 responder: Callable[[Dict], str] = echo_responder):
+        """
+        Initialize the local runner
+
+        Args:
+            batch_dir: Directory holding one folder per submitted batch
+            responder: Produces the completion text for a request body
+        """
+        self.batch_dir = batch_dir or PATHS['batch_dir']
+        self.responder = responder
+
+    def _path(self, batch_id: str, name: str) -> str:
+        return os.path.join(self.batch_dir, batch_id, name)
+
+    def submit(self, input_path: str) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex[:12]}"
+        os.makedirs(os.path.join(self.batch_dir, batch_id), exist_ok=True)
+        with open(input_path, "r", encoding="utf-8") as src, \
+                open(self._path(batch_id, "input.jsonl"), "w", encoding="utf-8") as dst:
+            dst.write(src.read())
+        self._set_status(batch_id, "validating")
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        with open(self._path(batch_id, "status.json"), "r", encoding="utf-8") as f:
+            status = json.load(f)["status"]
+
+        # Process on first poll, mimicking an asynchronous job
+        if status == "validating":
+            self._process(batch_id)
+            status = "completed"
+        return status
+
+    def download(self, batch_id: str, output_path: str) -> str:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with open(self._path(batch_id, "output.jsonl"), "r", encoding="utf-8") as src, \
+                open(output_path, "w", encoding="utf-8") as dst:
+            dst.write(src.read())
+        return output_path
+
+    def _set_status(self, batch_id: str, status: str):
+        with open(self._path(batch_id, "status.json"), "w", encoding="utf-8") as f:
+            json.dump({"status": status, "updated_at": time.time()}, f)
+
+    def _process(self, batch_id: str):
+        self._set_status(batch_id, "in_progress")
+        with open(self._path(batch_id, "input.jsonl"), "r", encoding="utf-8") as src, \
+                open(self._path(batch_id, "output.jsonl"), "w", encoding="utf-8") as dst:
+            for raw_line in src:
+                if not raw_line.strip():
+                    continue
+                line = json.loads(raw_line)
+                dst.write(json.dumps(self._respond(line), ensure_ascii=False) + "\n")
+        self._set_status(batch_id, "completed")
+
+    def _respond(self, line: Dict) -> Dict:
+        body = line["body"]
+        content = self.responder(body)
+        prompt_tokens = sum(len(m.get("content") or "") for m in body["messages"]) // 4
+        completion_tokens = len(content) // 4
+
+        return {
+            "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+            "custom_id": line["custom_id"],
+            "response": {
+                "status_code": 200,
+                "request_id": uuid.uuid4().hex,
+                "body": {
+                    "object": "chat.completion",
+                    "model": body["model"],
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens
+                    }
+                }
+            },
+            "error": None
+        }
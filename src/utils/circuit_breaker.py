@@ -0,0 +1,233 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import openai
+
+from utils.config import CIRCUIT_BREAKER_SETTINGS
+from utils.retry import DeadlineExceeded
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Errors that say the upstream is unhealthy; client errors (auth, quota, bad request) do not
+UPSTREAM_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    DeadlineExceeded,
+    TimeoutError
+)
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a model whose breaker is open"""
+
+    def __init__(self, model: str, retry_after: float):
+        super().__init__(f"Circuit open for {model}, retry in {retry_after:.0f}s")
+        self.model = model
+        self.retry_after = retry_after
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    return isinstance(error, UPSTREAM_ERRORS)
+
+
+class Permit:
+    """Admission granted by CircuitBreaker.allow, handed back to record or release"""
+
+    def __init__(self, generation: int):
+        # State the call was admitted in; outcomes from an earlier state are ignored
+        self.generation = generation
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker driven by recent error rate and latency"""
+
+    def __init__(self,
+                 window_seconds: float = 60,
+                 min_calls: int = 5,
+                 failure_rate_threshold: float = 0.5,
+                 slow_call_seconds: float = 25,
+                 slow_call_rate_threshold: float = 0.8,
+                 open_seconds: float = 30,
+                 half_open_max_calls: int = 1,
+                 probe_timeout_seconds: float = 120):
+        """
+        Initialize the breaker
+
+        Args:
+            window_seconds: How far back calls are counted
+            min_calls: Calls needed in the window before the breaker can trip
+            failure_rate_threshold: Share of upstream failures that opens the breaker
+            slow_call_seconds: Calls slower than this count as slow
+            slow_call_rate_threshold: Share of slow calls that opens the breaker
+            open_seconds: Time calls fail fast before a probe is let through
+            half_open_max_calls: Concurrent probes allowed while half-open
+            probe_timeout_seconds: A probe that reports no outcome for this long
+                (e.g. a leaked stream) counts as failed and re-opens the breaker
+        """
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.probe_timeout_seconds = probe_timeout_seconds
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_started_at = 0.0
+        # Bumped on every state change so late outcomes can be told apart
+        self._generation = 0
+        self._calls = deque()
+        self._lock = threading.Lock()
+        self._stats = {"rejected": 0, "trips": 0}
+
+    def allow(self) -> Optional[Permit]:
+        """
+        Admit a call if it may go through now; half-open admits a limited number of probes
+
+        Returns:
+            Permit to report the call's outcome with, or None if the call is rejected
+        """
+        with self._lock:
+            now = time.time()
+            if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+                self._state = HALF_OPEN
+                self._generation += 1
+                self._probes = 0
+            elif (self._state == HALF_OPEN and self._probes >= self.half_open_max_calls
+                  and now - self._probe_started_at >= self.probe_timeout_seconds):
+                # The probes never reported back; treat them as failed rather than wait forever
+                self._trip(now)
+
+            if self._state == CLOSED:
+                return Permit(self._generation)
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                self._probe_started_at = now
+                return Permit(self._generation)
+
+            self._stats["rejected"] += 1
+            return None
+
+    def record(self, permit: Optional[Permit], latency: float, failed: bool = False):
+        """
+        Record the outcome of a call admitted with permit
+
+        Calls admitted before the last state change are ignored, so only a
+        half-open probe can close or re-open the breaker.
+        """
+        now = time.time()
+        slow = latency >= self.slow_call_seconds
+
+        with self._lock:
+            if not self._is_current(permit):
+                return
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if failed or slow:
+                    self._trip(now)
+                else:
+                    self._state = CLOSED
+                    self._generation += 1
+                    self._calls.clear()
+                return
+
+            self._calls.append((now, failed, slow))
+            self._evict(now)
+            if self._state == CLOSED and self._should_trip():
+                self._trip(now)
+
+    def release(self, permit: Optional[Permit]):
+        """Give back an admitted call that never reached the upstream"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._is_current(permit):
+                self._probes = max(0, self._probes - 1)
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker lets a probe through"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (time.time() - self._opened_at))
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            self._evict(time.time())
+            calls = len(self._calls)
+            failures = sum(1 for _, failed, _ in self._calls if failed)
+            slow = sum(1 for _, _, is_slow in self._calls if is_slow)
+            state = self._state
+            if state == OPEN and time.time() - self._opened_at >= self.open_seconds:
+                state = HALF_OPEN
+            return {
+                **self._stats,
+                "state": state,
+                "calls": calls,
+                "failure_rate": round(failures / calls, 3) if calls else 0.0,
+                "slow_rate": round(slow / calls, 3) if calls else 0.0,
+                "retry_after": round(max(0.0, self.open_seconds - (time.time() - self._opened_at)), 1)
+                if state == OPEN else 0.0
+            }
+
+    def _should_trip(self) -> bool:
+        calls = len(self._calls)
+        if calls < self.min_calls:
+            return False
+        failures = sum(1 for _, failed, _ in self._calls if failed)
+        slow = sum(1 for _, _, is_slow in self._calls if is_slow)
+        return (failures / calls >= self.failure_rate_threshold
+                or slow / calls >= self.slow_call_rate_threshold)
+
+    def _is_current(self, permit: Optional[Permit]) -> bool:
+        return permit is not None and permit.generation == self._generation
+
+    def _trip(self, now: float):
+        self._state = OPEN
+        self._generation += 1
+        self._opened_at = now
+        self._calls.clear()
+        self._stats["trips"] += 1
+
+    def _evict(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(model: str) -> Optional[CircuitBreaker]:
+    """Get the process-wide breaker for a model, or None if breakers are disabled"""
+    if not CIRCUIT_BREAKER_SETTINGS['enabled']:
+        return None
+
+    with _breakers_lock:
+        breaker = _breakers.get(model)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                window_seconds=CIRCUIT_BREAKER_SETTINGS['window_seconds'],
+                min_calls=CIRCUIT_BREAKER_SETTINGS['min_calls'],
+                failure_rate_threshold=CIRCUIT_BREAKER_SETTINGS['failure_rate_threshold'],
+                slow_call_seconds=CIRCUIT_BREAKER_SETTINGS['slow_call_seconds'],
+                slow_call_rate_threshold=CIRCUIT_BREAKER_SETTINGS['slow_call_rate_threshold'],
+                open_seconds=CIRCUIT_BREAKER_SETTINGS['open_seconds'],
+                half_open_max_calls=CIRCUIT_BREAKER_SETTINGS['half_open_max_calls'],
+                probe_timeout_seconds=CIRCUIT_BREAKER_SETTINGS['probe_timeout_seconds']
+            )
+            _breakers[model] = breaker
+        return breaker
+
+
+def get_circuit_breaker_states() -> Dict:
+    """Snapshot of every breaker that has seen traffic, keyed by model"""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {model: breaker.snapshot() for model, breaker in breakers.items()}
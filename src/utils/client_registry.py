@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Type
+
+import httpx
+import openai
+
+from utils.config import GENERATION_SETTINGS, HTTP_POOL_SETTINGS
+
+
+class ConnectionStats:
+    """Counts requests and new TCP connections on the shared HTTP pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def on_request(self, request: httpx.Request):
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def on_async_request(self, request: httpx.Request):
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._atrace
+
+    def _trace(self, event_name: str, info: Dict):
+        # httpcore reports this once per freshly opened connection
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.new_connections += 1
+
+    async def _atrace(self, event_name: str, info: Dict):
+        self._trace(event_name, info)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            reused = max(0, self.requests - self.new_connections)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_rate": round(reused / self.requests, 3) if self.requests else 0.0
+            }
+
+
+class ClientRegistry:
+    """Process-wide home for the HTTP pool, OpenAI clients and generators"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._http_client = None
+        self._openai_clients = {}
+        self._anthropic_clients = {}
+        # Async connections belong to the event loop that opened them, so async
+        # pools and clients are kept per loop and dropped with it
+        self._async_http_clients = weakref.WeakKeyDictionary()
+        self._async_openai_clients = weakref.WeakKeyDictionary()
+        self._generators = OrderedDict()
+        self._connection_stats = ConnectionStats()
+        self._stats = {"generator_hits": 0, "generator_misses": 0}
+
+    def get_http_client(self) -> httpx.Client:
+        """Get the shared keep-alive connection pool"""
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=HTTP_POOL_SETTINGS['max_connections'],
+                        max_keepalive_connections=HTTP_POOL_SETTINGS['max_keepalive_connections'],
+                        keepalive_expiry=HTTP_POOL_SETTINGS['keepalive_expiry']
+                    ),
+                    timeout=httpx.Timeout(
+                        GENERATION_SETTINGS['timeout_seconds'],
+                        connect=HTTP_POOL_SETTINGS['connect_timeout']
+                    ),
+                    event_hooks={"request": [self._connection_stats.on_request]}
+                )
+            return self._http_client
+
+    def get_async_http_client(self) -> httpx.AsyncClient:
+        """Get the keep-alive connection pool of the running event loop"""
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            http_client = self._async_http_clients.get(loop)
+            if http_client is None:
+                http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=HTTP_POOL_SETTINGS['max_connections'],
+                        max_keepalive_connections=HTTP_POOL_SETTINGS['max_keepalive_connections'],
+                        keepalive_expiry=HTTP_POOL_SETTINGS['keepalive_expiry']
+                    ),
+                    timeout=httpx.Timeout(
+                        GENERATION_SETTINGS['timeout_seconds'],
+                        connect=HTTP_POOL_SETTINGS['connect_timeout']
+                    ),
+                    event_hooks={"request": [self._connection_stats.on_async_request]}
+                )
+                self._async_http_clients[loop] = http_client
+            return http_client
+
+    def get_openai_client(self, api_key: str) -> openai.OpenAI:
+        """Get the OpenAI client for a key, sharing the process-wide connection pool"""
+        http_client = self.get_http_client()
+        client_key = key_id(api_key)
+
+        with self._lock:
+            client = self._openai_clients.get(client_key)
+            if client is None:
+                # Retries are handled by RetryPolicy so attempts can be reported
+                client = openai.OpenAI(api_key=api_key, max_retries=0, http_client=http_client)
+                self._openai_clients[client_key] = client
+            return client
+
+    def get_async_openai_client(self, api_key: str) -> openai.AsyncOpenAI:
+        """Get the async OpenAI client for a key on the running event loop's pool"""
+        http_client = self.get_async_http_client()
+        loop = asyncio.get_running_loop()
+        client_key = key_id(api_key)
+
+        with self._lock:
+            clients = self._async_openai_clients.setdefault(loop, {})
+            client = clients.get(client_key)
+            if client is None:
+                client = openai.AsyncOpenAI(api_key=api_key, max_retries=0, http_client=http_client)
+                clients[client_key] = client
+            return client
+
+    def get_anthropic_client(self, api_key: str):
+        """Get the Anthropic client for a key, or None if the SDK or key is unavailable"""
+        if not api_key:
+            return None
+        try:
+            # Imported on first use: the SDK is slow to import and only hedge backups need it
+            import anthropic
+        except ImportError:
+            return None
+        client_key = key_id(api_key)
+
+        with self._lock:
+            client = self._anthropic_clients.get(client_key)
+            if client is None:
+                # Keeps its own keep-alive pool; SDK versions differ in the httpx flavour they accept
+                client = anthropic.Anthropic(api_key=api_key, max_retries=0)
+                self._anthropic_clients[client_key] = client
+            return client
+
+    def get_generator(self, generator_cls: Type, api_key: str, model: str):
+        """Get a long-lived generator for this class, key and model"""
+        registry_key = (generator_cls, key_id(api_key), model)
+
+        with self._lock:
+            generator = self._generators.get(registry_key)
+            if generator is not None:
+                self._generators.move_to_end(registry_key)
+                self._stats["generator_hits"] += 1
+                return generator
+            self._stats["generator_misses"] += 1
+
+        # Build outside the lock; a concurrent duplicate is simply discarded
+        generator = generator_cls(api_key, model)
+
+        with self._lock:
+            generator = self._generators.setdefault(registry_key, generator)
+            while len(self._generators) > HTTP_POOL_SETTINGS['max_generators']:
+                self._generators.popitem(last=False)
+            return generator
+
+    def stats(self) -> Dict:
+        """Get registry sizes and connection reuse counters"""
+        with self._lock:
+            stats = {
+                **self._stats,
+                "generators": len(self._generators),
+                "openai_clients": len(self._openai_clients),
+                "async_pools": len(self._async_http_clients)
+            }
+        stats.update(self._connection_stats.snapshot())
+        return stats
+
+
+def key_id(api_key: str) -> str:
+    """Short stable identifier for an API key; raw keys are never stored"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+_registry = ClientRegistry()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Get the process-wide client registry shared by all sessions"""
+    return _registry
+
+
+def get_openai_client(api_key: str) -> openai.OpenAI:
+    """Shortcut for get_client_registry().get_openai_client"""
+    return _registry.get_openai_client(api_key)
+
+
+def get_generator(generator_cls: Type, api_key: str, model: str):
+    """Shortcut for get_client_registry().get_generator"""
+    return _registry.get_generator(generator_cls, api_key, model)
@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+# Add config to path - daha güvenli yol
+config_path = Path(__file__).resolve().parent.parent.parent / "config"
+if str(config_path) not in sys.path:
+    sys.path.insert(0, str(config_path))
+
+from settings import (
+    API_CONFIG,
+    CACHE_SETTINGS,
+    CIRCUIT_BREAKER_SETTINGS,
+    GENERATION_SETTINGS,
+    HTTP_POOL_SETTINGS,
+    PATHS,
+    PLATFORM_CONFIG,
+    get_env_config
+)
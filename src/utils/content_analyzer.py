@@ -0,0 +1,412 @@
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.config import CACHE_SETTINGS, GENERATION_SETTINGS
+from utils.metrics import timed
+from utils.readability import atesman, bezirci_yilmaz, long_word_counts, syllable_counts
+from utils.turkish_text import SentenceCounter, sentiment, split_sentences, tokenize
+
+try:
+    from textblob import TextBlob
+except ImportError:  # Analysis falls back to basic counts
+    TextBlob = None
+
+# Bump whenever the metrics change, so memoized and stored results are not reused
+ANALYZER_VERSION = 3
+
+# Columns of analyze_batch, in the key order of analyze_content
+COLUMNS = (
+    "word_count",
+    "char_count",
+    "sentence_count",
+    "avg_sentence_length",
+    "readability_score",
+    "readability_grade",
+    "sentiment_polarity",
+    "sentiment_subjectivity",
+    "hashtags",
+    "mentions",
+    "hashtag_count",
+    "mention_count",
+    "error"
+)
+
+# long_words of a document the full analysis failed on
+_NO_LONG_WORDS = (np.nan,) * 4
+
+
+def _tokenize(content: str, language: str) -> Dict:
+    """Split a document once and collect everything the metrics need"""
+    words = content.split()
+    readability = {}
+
+    if language == "tr":
+        # Built-in regex splitter and lexicon; needs no corpus download
+        tokens = tokenize(content)
+        sentence_count = len(split_sentences(content))
+        polarity, subjectivity = sentiment(tokens)
+        syllables = syllable_counts(tokens)
+        readability = {
+            "syllables_per_word": float(syllables.sum()) / max(len(tokens), 1),
+            "long_words": long_word_counts(syllables)
+        }
+    else:
+        if TextBlob is None:
+            raise ImportError("textblob is not installed")
+        blob = TextBlob(content)
+        sentence_count = len(blob.sentences)
+        polarity, subjectivity = blob.sentiment
+
+    return {
+        "word_count": len(words),
+        "char_count": len(content),
+        "sentence_count": sentence_count,
+        "sentiment_polarity": polarity,
+        "sentiment_subjectivity": subjectivity,
+        "hashtags": [word for word in words if word.startswith('#')],
+        "mentions": [word for word in words if word.startswith('@')],
+        **readability
+    }
+
+
+def _fallback(content: str, error: Exception) -> Dict:
+    """Basic counts for a document the full analysis failed on"""
+    return {
+        "word_count": len(content.split()),
+        "char_count": len(content),
+        "sentence_count": content.count('.') + content.count('!') + content.count('?'),
+        "error": f"Advanced analysis failed: {str(error)}"
+    }
+
+
+def _score(word_counts: np.ndarray,
+           sentence_counts: np.ndarray,
+           polarities: np.ndarray,
+           subjectivities: np.ndarray,
+           syllables_per_word: Optional[np.ndarray] = None,
+           long_words: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Derived metrics for any number of documents; the single-item path uses it too
+
+    With syllable counts (Turkish), readability is the Ateşman score and the
+    grade the Bezirci-Yılmaz level; otherwise a simple approximation and no grade.
+    """
+    sentences = np.maximum(sentence_counts, 1)
+    avg_sentence_length = word_counts / sentences
+
+    if syllables_per_word is None:
+        readability_score = np.maximum(0, 100 - (avg_sentence_length * 2))
+        readability_grade = np.full(len(avg_sentence_length), np.nan)
+    else:
+        readability_score = atesman(syllables_per_word, avg_sentence_length)
+        readability_grade = bezirci_yilmaz(avg_sentence_length, long_words / sentences[:, None])
+
+    return {
+        "avg_sentence_length": np.round(avg_sentence_length, 1),
+        "readability_score": np.round(readability_score, 1),
+        "readability_grade": np.round(readability_grade, 1),
+        "sentiment_polarity": np.round(polarities, 2),
+        "sentiment_subjectivity": np.round(subjectivities, 2)
+    }
+
+
+def _object_column(documents: List[Dict], name: str) -> np.ndarray:
+    values = np.empty(len(documents), dtype=object)
+    values[:] = [document.get(name) for document in documents]
+    return values
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def _lengths(lists: np.ndarray, failed: np.ndarray) -> pd.arrays.IntegerArray:
+    """Item counts per document, missing where the analysis failed"""
+    lengths = np.fromiter((len(items) if items is not None else 0 for items in lists), dtype=np.int64, count=len(lists))
+    return pd.arrays.IntegerArray(lengths, failed)
+
+
+class AnalysisMemo:
+    """Bounded LRU of analysis results keyed by analysis_key, shared by all sessions"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "primed": 0}
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            metrics = self._entries.get(key)
+            if metrics is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        return copy.deepcopy(metrics)
+
+    def set(self, key: str, metrics: Dict):
+        with self._lock:
+            self._entries[key] = copy.deepcopy(metrics)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def prime(self, key: Optional[str], metrics: Optional[Dict]) -> bool:
+        """
+        Seed the memo with metrics stored earlier, e.g. in a history item
+
+        Returns:
+            False if the metrics were made by another analyzer version or are incomplete
+        """
+        if not key or not metrics or "error" in metrics or not key.startswith(f"v{ANALYZER_VERSION}:"):
+            return False
+        self.set(key, metrics)
+        with self._lock:
+            self._stats["primed"] += 1
+        return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0
+            }
+
+
+_analysis_memo = None
+_analysis_memo_lock = threading.Lock()
+
+
+def get_analysis_memo() -> AnalysisMemo:
+    """Get the process-wide analysis memo shared by all sessions"""
+    global _analysis_memo
+
+    with _analysis_memo_lock:
+        if _analysis_memo is None:
+            _analysis_memo = AnalysisMemo(CACHE_SETTINGS['analysis_memo_max_entries'])
+        return _analysis_memo
+
+
+def analysis_key(content: str, language: Optional[str] = None) -> str:
+    """Memo key of a text: analyzer version, language and a hash of the content"""
+    language = language or GENERATION_SETTINGS['default_language']
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return f"v{ANALYZER_VERSION}:{language}:{digest}"
+
+
+class ContentAnalyzer:
+    """Analyze generated content quality and metrics"""
+
+    @staticmethod
+    def analyze_content(content: str, language: Optional[str] = None) -> Dict:
+        """
+        Analyze content and return metrics, reusing earlier results for the same text
+
+        Args:
+            content: Text to analyze
+            language: 'tr' uses the built-in Turkish splitter and lexicon, anything
+                else TextBlob (defaults to GENERATION_SETTINGS['default_language'])
+        """
+        language = language or GENERATION_SETTINGS['default_language']
+        key = analysis_key(content, language)
+        memo = get_analysis_memo()
+
+        metrics = memo.get(key)
+        if metrics is None:
+            metrics = ContentAnalyzer._analyze(content, language)
+            # Fallback results (e.g. missing corpora) are not worth keeping
+            if "error" not in metrics:
+                memo.set(key, metrics)
+        return metrics
+
+    @staticmethod
+    @timed("content_analysis_seconds")
+    def _analyze(content: str, language: str) -> Dict:
+        try:
+            document = _tokenize(content, language)
+        except Exception as e:
+            return _fallback(content, e)
+
+        turkish = "long_words" in document
+        scores = _score(
+            np.array([document["word_count"]]),
+            np.array([document["sentence_count"]]),
+            np.array([document["sentiment_polarity"]]),
+            np.array([document["sentiment_subjectivity"]]),
+            np.array([document["syllables_per_word"]]) if turkish else None,
+            np.array([document["long_words"]]) if turkish else None
+        )
+
+        return {
+            "word_count": document["word_count"],
+            "char_count": document["char_count"],
+            "sentence_count": document["sentence_count"],
+            "avg_sentence_length": float(scores["avg_sentence_length"][0]),
+            "readability_score": float(scores["readability_score"][0]),
+            "readability_grade": _optional(scores["readability_grade"][0]),
+            "sentiment_polarity": float(scores["sentiment_polarity"][0]),
+            "sentiment_subjectivity": float(scores["sentiment_subjectivity"][0]),
+            "hashtags": document["hashtags"],
+            "mentions": document["mentions"],
+            "hashtag_count": len(document["hashtags"]),
+            "mention_count": len(document["mentions"])
+        }
+
+    @staticmethod
+    @timed("content_batch_analysis_seconds")
+    def analyze_batch(texts: Iterable[str], language: Optional[str] = None) -> pd.DataFrame:
+        """
+        Analyze many documents at once, e.g. a whole history archive
+
+        Each document is tokenized once; the derived metrics are computed over
+        NumPy arrays for the whole batch with the same code as analyze_content,
+        so every row matches the single-item result.
+
+        Args:
+            texts: Documents to analyze
+            language: As for analyze_content
+
+        Returns:
+            DataFrame with one row per document and the analyze_content keys as
+            columns; rows the full analysis failed on hold the basic counts,
+            NaN elsewhere and the reason in 'error'
+        """
+        language = language or GENERATION_SETTINGS['default_language']
+        documents = []
+        for content in texts:
+            try:
+                documents.append(_tokenize(content, language))
+            except Exception as e:
+                documents.append(_fallback(content, e))
+
+        count = len(documents)
+        failed = np.fromiter(("error" in document for document in documents), dtype=bool, count=count)
+
+        def column(name: str, dtype=float) -> np.ndarray:
+            return np.fromiter((document.get(name, np.nan) for document in documents), dtype=dtype, count=count)
+
+        word_counts = column("word_count", dtype=np.int64)
+        sentence_counts = column("sentence_count", dtype=np.int64)
+        hashtags = _object_column(documents, "hashtags")
+        mentions = _object_column(documents, "mentions")
+
+        syllables_per_word = long_words = None
+        if language == "tr":
+            syllables_per_word = column("syllables_per_word")
+            long_words = np.array(
+                [document.get("long_words", _NO_LONG_WORDS) for document in documents], dtype=float
+            ).reshape(count, len(_NO_LONG_WORDS))
+
+        scores = _score(
+            word_counts,
+            sentence_counts,
+            column("sentiment_polarity"),
+            column("sentiment_subjectivity"),
+            syllables_per_word,
+            long_words
+        )
+        for name in ("avg_sentence_length", "readability_score", "readability_grade"):
+            scores[name] = np.where(failed, np.nan, scores[name])
+
+        frame = pd.DataFrame({
+            "word_count": word_counts,
+            "char_count": column("char_count", dtype=np.int64),
+            "sentence_count": sentence_counts,
+            **scores,
+            "hashtags": hashtags,
+            "mentions": mentions,
+            "hashtag_count": _lengths(hashtags, failed),
+            "mention_count": _lengths(mentions, failed),
+            "error": _object_column(documents, "error")
+        }, columns=list(COLUMNS))
+        return frame
+
+
+class IncrementalAnalyzer:
+    """
+    Live metrics of content that is still streaming in
+
+    Each appended chunk updates the counts, hashtags, mentions and sentence
+    boundaries in amortized O(len(chunk)) instead of rescanning the whole
+    text. Once the stream ends, counts and readability match analyze_content
+    for the built-in Turkish analysis; sentiment is left to the final analysis.
+    """
+
+    def __init__(self):
+        self.char_count = 0
+        self._word_count = 0
+        self._hashtags = []
+        self._mentions = []
+        self._token_count = 0
+        self._syllable_count = 0
+        self._long_words = np.zeros(4, dtype=np.int64)
+        # Trailing word the next chunk may still extend
+        self._partial = ""
+        self._sentences = SentenceCounter()
+
+    def append(self, chunk: str) -> Dict:
+        """Add a streamed chunk and return the metrics so far"""
+        if chunk:
+            self.char_count += len(chunk)
+            self._sentences.feed(chunk)
+
+            text = self._partial + chunk
+            words = text.split()
+            self._partial = words.pop() if words and not text[-1].isspace() else ""
+
+            self._word_count += len(words)
+            self._hashtags.extend(word for word in words if word.startswith('#'))
+            self._mentions.extend(word for word in words if word.startswith('@'))
+
+            tokens = tokenize(" ".join(words))
+            syllables = syllable_counts(tokens)
+            self._token_count += len(tokens)
+            self._syllable_count += int(syllables.sum())
+            self._long_words += long_word_counts(syllables)
+
+        return self.metrics()
+
+    def metrics(self) -> Dict:
+        """Metrics of the text appended so far, counting the unfinished word"""
+        partial = [self._partial] if self._partial else []
+        hashtags = self._hashtags + [word for word in partial if word.startswith('#')]
+        mentions = self._mentions + [word for word in partial if word.startswith('@')]
+        word_count = self._word_count + len(partial)
+        sentence_count = self._sentences.count
+
+        tokens = tokenize(self._partial)
+        syllables = syllable_counts(tokens)
+        token_count = self._token_count + len(tokens)
+        syllables_per_word = (self._syllable_count + int(syllables.sum())) / max(token_count, 1)
+        long_words = self._long_words + long_word_counts(syllables)
+
+        scores = _score(
+            np.array([word_count]),
+            np.array([sentence_count]),
+            np.zeros(1),
+            np.zeros(1),
+            np.array([syllables_per_word]),
+            long_words[np.newaxis]
+        )
+
+        return {
+            "word_count": word_count,
+            "char_count": self.char_count,
+            "sentence_count": sentence_count,
+            "avg_sentence_length": float(scores["avg_sentence_length"][0]),
+            "readability_score": float(scores["readability_score"][0]),
+            "readability_grade": float(scores["readability_grade"][0]),
+            "hashtags": hashtags,
+            "mentions": mentions,
+            "hashtag_count": len(hashtags),
+            "mention_count": len(mentions)
+        }
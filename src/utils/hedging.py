@@ -0,0 +1,301 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from utils.tokenizer import get_tokenizer
+
+# Anthropic stop reasons mapped to the OpenAI finish_reason vocabulary
+ANTHROPIC_FINISH_REASONS = {
+    "end_turn": "stop",
+    "stop_sequence": "stop",
+    "max_tokens": "length"
+}
+
+
+class Attempt:
+    """One streamed completion taking part in a hedged call"""
+
+    def __init__(self, name: str, model: str, messages: List[Dict], stream_fn: Callable[["Attempt"], None]):
+        """
+        Initialize the attempt
+
+        Args:
+            name: 'primary' or 'backup'
+            model: Model the attempt runs on, used for pricing
+            messages: Chat messages sent, used to estimate usage if cancelled
+            stream_fn: Streams the completion into the attempt (see openai_stream)
+        """
+        self.name = name
+        self.model = model
+        self.messages = messages
+        self.stream_fn = stream_fn
+        self.cancelled = threading.Event()
+        # Open response stream, set by stream_fn so cancel can close it
+        self.stream = None
+        # Rate limit reservation held by the attempt, if its model is rate limited
+        self.reservation = None
+        self.parts = []
+        self.finish_reason = None
+        self.usage = None
+        self.error = None
+        self.started_at = None
+        self.first_token_at = None
+        self._events = None
+
+    @property
+    def content(self) -> str:
+        return "".join(self.parts)
+
+    def start(self, events: queue.Queue):
+        self._events = events
+        self.started_at = time.time()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def cancel(self):
+        """Stop the attempt and close its stream, even while it waits for a chunk"""
+        self.cancelled.set()
+        stream = self.stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                # The streaming thread may be closing it at the same time
+                pass
+
+    def add_delta(self, text: str):
+        """Called by stream_fn for every text delta"""
+        if self.first_token_at is None:
+            self.first_token_at = time.time()
+            self._events.put(("first_token", self))
+        self.parts.append(text)
+
+    @property
+    def usage_estimated(self) -> bool:
+        """Whether usage_counts is an estimate because no final usage chunk arrived"""
+        return self.usage is None
+
+    def usage_counts(self) -> Dict:
+        """Reported usage, or an estimate for attempts cut off before the final chunk"""
+        if self.usage is not None:
+            return self.usage
+        tokenizer = get_tokenizer(self.model)
+        return {
+            "prompt_tokens": tokenizer.count_messages(self.messages),
+            "completion_tokens": tokenizer.count(self.content),
+            "cached_tokens": 0
+        }
+
+    def _run(self):
+        try:
+            self.stream_fn(self)
+        except Exception as e:
+            # Closing a cancelled attempt's stream can surface as a read error
+            if not self.cancelled.is_set():
+                self.error = e
+        self._events.put(("done", self))
+
+
+class HedgeOutcome:
+    """Result of a hedged call: the winning attempt and everything that was started"""
+
+    def __init__(self, winner: Attempt, attempts: List[Attempt]):
+        self.winner = winner
+        self.attempts = attempts
+
+    @property
+    def fired(self) -> bool:
+        return len(self.attempts) > 1
+
+    @property
+    def losers(self) -> List[Attempt]:
+        return [attempt for attempt in self.attempts if attempt is not self.winner]
+
+
+def run_hedged(primary: Attempt,
+               start_backup: Callable[[], Optional[Attempt]],
+               delay: float,
+               timeout: float) -> HedgeOutcome:
+    """
+    Race a backup attempt against a primary that is slow to produce its first token
+
+    The backup is started when the primary has not streamed a token within
+    delay seconds, or straight away if the primary fails first. The first
+    attempt to finish successfully wins and the others are cancelled.
+
+    Args:
+        primary: Attempt to start immediately
+        start_backup: Builds the backup attempt, or returns None if there is none
+        delay: Seconds to wait for the primary's first token
+        timeout: Overall limit for the call
+
+    Returns:
+        HedgeOutcome with the winner
+
+    Raises:
+        The primary's error if every attempt failed, TimeoutError if none finished in time
+    """
+    events = queue.Queue()
+    attempts = [primary]
+    primary.start(events)
+    started_at = time.time()
+    backup_pending = True
+    failed = []
+
+    def fire_backup():
+        nonlocal backup_pending
+        backup_pending = False
+        backup = start_backup()
+        if backup is not None:
+            attempts.append(backup)
+            backup.start(events)
+
+    while True:
+        remaining = timeout - (time.time() - started_at)
+        wait = min(remaining, started_at + delay - time.time()) if backup_pending else remaining
+        try:
+            kind, attempt = events.get(timeout=max(wait, 0))
+        except queue.Empty:
+            if backup_pending and remaining > 0:
+                fire_backup()
+                continue
+            _cancel(attempts)
+            raise TimeoutError(f"Hedged request did not finish within {timeout:.0f}s")
+
+        if kind == "first_token":
+            if attempt is primary:
+                # The primary is streaming in time, so there is nothing to hedge
+                backup_pending = False
+            continue
+
+        if attempt.error is None:
+            _cancel(attempts, keep=attempt)
+            return HedgeOutcome(attempt, attempts)
+
+        failed.append(attempt)
+        if backup_pending:
+            fire_backup()
+        if len(failed) == len(attempts) and not backup_pending:
+            raise primary.error or failed[0].error
+
+
+def _cancel(attempts: List[Attempt], keep: Optional[Attempt] = None):
+    for attempt in attempts:
+        if attempt is not keep:
+            attempt.cancel()
+
+
+def openai_stream(client, model: str, messages: List[Dict], max_tokens: int,
+                  temperature: float, timeout: float) -> Callable[[Attempt], None]:
+    """Build a stream_fn that streams a chat completion from an OpenAI client"""
+    def stream_fn(attempt: Attempt):
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=1,
+            frequency_penalty=0,
+            presence_penalty=0,
+            stream=True,
+            stream_options={"include_usage": True},
+            timeout=timeout
+        )
+        attempt.stream = stream
+        try:
+            # Cancelled while the request was being sent
+            if attempt.cancelled.is_set():
+                return
+            for chunk in stream:
+                if attempt.cancelled.is_set():
+                    return
+                if chunk.usage:
+                    details = chunk.usage.prompt_tokens_details
+                    attempt.usage = {
+                        "prompt_tokens": chunk.usage.prompt_tokens,
+                        "completion_tokens": chunk.usage.completion_tokens,
+                        "cached_tokens": (details.cached_tokens if details else 0) or 0
+                    }
+                if not chunk.choices:
+                    continue
+                if chunk.choices[0].finish_reason:
+                    attempt.finish_reason = chunk.choices[0].finish_reason
+                if chunk.choices[0].delta.content:
+                    attempt.add_delta(chunk.choices[0].delta.content)
+        finally:
+            stream.close()
+
+    return stream_fn
+
+
+def anthropic_stream(client, model: str, messages: List[Dict], max_tokens: int,
+                     temperature: float, timeout: float) -> Callable[[Attempt], None]:
+    """Build a stream_fn that streams the same request from an Anthropic client"""
+    system = "\n\n".join(message["content"] for message in messages if message["role"] == "system")
+    chat = [message for message in messages if message["role"] != "system"]
+    params = {
+        "model": model,
+        "messages": chat,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "timeout": timeout
+    }
+    if system:
+        params["system"] = system
+
+    def stream_fn(attempt: Attempt):
+        with client.messages.stream(**params) as stream:
+            attempt.stream = stream
+            if attempt.cancelled.is_set():
+                return
+            for text in stream.text_stream:
+                if attempt.cancelled.is_set():
+                    return
+                attempt.add_delta(text)
+            message = stream.get_final_message()
+
+        attempt.finish_reason = ANTHROPIC_FINISH_REASONS.get(message.stop_reason, message.stop_reason)
+        cached_tokens = message.usage.cache_read_input_tokens or 0
+        attempt.usage = {
+            "prompt_tokens": message.usage.input_tokens + cached_tokens,
+            "completion_tokens": message.usage.output_tokens,
+            "cached_tokens": cached_tokens
+        }
+
+    return stream_fn
+
+
+class HedgeStats:
+    """How often hedging fires, who wins and what the backups cost"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "fired": 0, "backup_wins": 0, "extra_cost": 0.0}
+
+    def record(self, outcome: HedgeOutcome, extra_cost: float):
+        with self._lock:
+            self._stats["requests"] += 1
+            if outcome.fired:
+                self._stats["fired"] += 1
+            if outcome.winner.name == "backup":
+                self._stats["backup_wins"] += 1
+            self._stats["extra_cost"] += extra_cost
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            requests = self._stats["requests"]
+            return {
+                **self._stats,
+                "extra_cost": round(self._stats["extra_cost"], 6),
+                "fire_rate": round(self._stats["fired"] / requests, 3) if requests else 0.0,
+                "backup_win_rate": round(self._stats["backup_wins"] / self._stats["fired"], 3)
+                if self._stats["fired"] else 0.0
+            }
+
+
+_hedge_stats = HedgeStats()
+
+
+def get_hedge_stats() -> HedgeStats:
+    """Get the process-wide hedging counters"""
+    return _hedge_stats
@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import openai
+
+from utils.client_registry import get_openai_client, key_id
+from utils.config import CACHE_SETTINGS
+
+# Prefixes of chat models the generators can use
+CHAT_MODEL_PREFIXES = ('gpt-3.5', 'gpt-4')
+
+
+class KeyValidator:
+    """Validates API keys and lists their models once per TTL, shared by all sessions"""
+
+    def __init__(self,
+                 valid_ttl: float = 60 * 60,
+                 invalid_ttl: float = 5 * 60,
+                 error_ttl: float = 30,
+                 timeout: float = 10):
+        """
+        Initialize the validator
+
+        Args:
+            valid_ttl: How long a working key and its model list are trusted
+            invalid_ttl: How long a rejected key stays rejected before rechecking
+            error_ttl: How long an inconclusive check (network error, outage) is kept
+            timeout: Timeout of the models.list call
+        """
+        self.valid_ttl = valid_ttl
+        self.invalid_ttl = invalid_ttl
+        self.error_ttl = error_ttl
+        self.timeout = timeout
+
+        self._statuses = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="key-validator")
+
+    def validate(self, api_key: str) -> Dict:
+        """Get the key status, checking the key now if there is no fresh status"""
+        return self.validate_async(api_key).result()
+
+    def validate_async(self, api_key: str) -> Future:
+        """
+        Start a background check unless a fresh status exists or one is already running
+
+        Returns:
+            Future resolving to the status dict
+        """
+        cache_key = key_id(api_key)
+        with self._lock:
+            status = self._fresh_status(cache_key)
+            if status is not None:
+                future = Future()
+                future.set_result(status)
+                return future
+
+            future = self._pending.get(cache_key)
+            if future is None:
+                future = self._executor.submit(self._check, api_key, cache_key)
+                self._pending[cache_key] = future
+            return future
+
+    def peek(self, api_key: str) -> Optional[Dict]:
+        """Get the cached status without checking; None if unknown or still being checked"""
+        with self._lock:
+            return self._fresh_status(key_id(api_key))
+
+    def get_models(self, api_key: str) -> List[str]:
+        """Chat models available to the key (empty if the key cannot list models)"""
+        return self.validate(api_key)["models"]
+
+    def invalidate(self, api_key: str):
+        with self._lock:
+            self._statuses.pop(key_id(api_key), None)
+
+    def _fresh_status(self, cache_key: str) -> Optional[Dict]:
+        status = self._statuses.get(cache_key)
+        if status is None or time.time() >= status["expires_at"]:
+            return None
+        return status
+
+    def _check(self, api_key: str, cache_key: str) -> Dict:
+        """List models, which costs no tokens and fails with 401 for a bad key"""
+        try:
+            models = get_openai_client(api_key).models.list(timeout=self.timeout)
+            chat_models = sorted(model.id for model in models.data if model.id.startswith(CHAT_MODEL_PREFIXES))
+            status = self._status(True, chat_models, None, self.valid_ttl)
+        except openai.AuthenticationError as e:
+            status = self._status(False, [], str(e), self.invalid_ttl)
+        except openai.PermissionDeniedError:
+            # Restricted keys may be allowed to chat without being allowed to list models
+            status = self._status(True, [], None, self.valid_ttl)
+        except Exception as e:
+            logging.warning(f"API key check inconclusive: {str(e)}")
+            status = self._status(None, [], str(e), self.error_ttl)
+
+        with self._lock:
+            self._statuses[cache_key] = status
+            self._pending.pop(cache_key, None)
+        return status
+
+    def _status(self, valid: Optional[bool], models: List[str], error: Optional[str], ttl: float) -> Dict:
+        now = time.time()
+        return {
+            "valid": valid,
+            "models": models,
+            "error": error,
+            "checked_at": now,
+            "expires_at": now + ttl
+        }
+
+
+_key_validator = None
+_key_validator_lock = threading.Lock()
+
+
+def get_key_validator() -> KeyValidator:
+    """Get the process-wide key validator shared by all sessions"""
+    global _key_validator
+
+    with _key_validator_lock:
+        if _key_validator is None:
+            _key_validator = KeyValidator(
+                valid_ttl=CACHE_SETTINGS['key_status_ttl_seconds'],
+                invalid_ttl=CACHE_SETTINGS['invalid_key_ttl_seconds'],
+                error_ttl=CACHE_SETTINGS['key_check_error_ttl_seconds']
+            )
+        return _key_validator
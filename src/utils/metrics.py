@@ -0,0 +1,203 @@
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from utils.config import PATHS
+
+# Upper bounds in seconds, from cache hits to long completions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+METRIC_HELP = {
+    "generation_queue_wait_seconds": "Time spent waiting for the client-side rate limiter",
+    "generation_time_to_first_token_seconds": "Time from sending a streamed request to its first token",
+    "generation_latency_seconds": "Upstream time for a completed generation, excluding queue wait",
+    "prompt_build_seconds": "Time spent building prompts before the API call",
+    "post_process_seconds": "Time spent post-processing generated content",
+    "content_analysis_seconds": "Time spent analyzing content not found in the analysis memo",
+    "content_batch_analysis_seconds": "Time spent in ContentAnalyzer.analyze_batch"
+}
+
+# Labels of the generation in progress, e.g. platform or email_type
+_metric_labels = contextvars.ContextVar("metric_labels", default={})
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a reservoir of recent samples for quantiles"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, reservoir: int = 1024):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=reservoir)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class MetricsRegistry:
+    """Process-wide latency histograms keyed by metric name and labels"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Record one duration; labels of the current generation are added automatically"""
+        labels = {**_metric_labels.get(), **labels}
+        key = (name, tuple(sorted((label, str(value)) for label, value in labels.items() if value is not None)))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(self.buckets)
+                self._histograms[key] = histogram
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Time the body of a with block"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start_time, **labels)
+
+    def snapshot(self) -> Dict:
+        """
+        Summaries of every series
+
+        Returns:
+            Dict of metric name to a list of {labels, count, mean, p50, p95, p99}
+        """
+        with self._lock:
+            series = list(self._histograms.items())
+            summaries = {}
+            for (name, labels), histogram in sorted(series):
+                summary = {
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "mean": round(histogram.sum / histogram.count, 4) if histogram.count else 0.0
+                }
+                for q in QUANTILES:
+                    summary[f"p{int(q * 100)}"] = round(histogram.quantile(q), 4)
+                summaries.setdefault(name, []).append(summary)
+        return summaries
+
+    def to_prometheus(self) -> str:
+        """Render every histogram in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            series = sorted(self._histograms.items())
+            described = set()
+            for (name, labels), histogram in series:
+                if name not in described:
+                    described.add(name)
+                    lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                    lines.append(f"# TYPE {name} histogram")
+                for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', _format_bound(bound)))} {count}")
+                lines.append(f'{name}_bucket{_format_labels(labels, ("le", "+Inf"))} {histogram.count}')
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self, path: Optional[str] = None) -> Optional[str]:
+        """Write the Prometheus text to a file (for node_exporter's textfile collector)"""
+        path = path or PATHS['metrics_file']
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, path)
+            return path
+        except OSError as e:
+            logging.warning(f"Metrics export failed: {str(e)}")
+            return None
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]], *extra: Tuple[str, str]) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{label}="{value}"' for (label, _), value in zip(pairs, escaped)) + "}"
+
+
+def current_labels() -> Dict:
+    """Labels of the generation in progress in this context"""
+    return dict(_metric_labels.get())
+
+
+@contextmanager
+def metric_labels(**labels):
+    """Add labels to every metric observed inside the block (including worker threads)"""
+    token = _metric_labels.set({**_metric_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _metric_labels.reset(token)
+
+
+def _bound_labels(fn: Callable, names: Tuple[str, ...], args, kwargs) -> Dict:
+    bound = inspect.signature(fn).bind_partial(*args, **kwargs)
+    return {name: bound.arguments[name] for name in names if name in bound.arguments}
+
+
+def labeled(*names: str):
+    """Decorator: label metrics observed during the call with the named arguments"""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with metric_labels(**_bound_labels(fn, names, args, kwargs)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timed(name: str, labels: Tuple[str, ...] = ()):
+    """Decorator: observe the call's duration as metric name, labeled by the named arguments"""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_metrics().timer(name, **_bound_labels(fn, labels, args, kwargs)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide metrics registry shared by all sessions"""
+    return _metrics
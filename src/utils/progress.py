@@ -0,0 +1,39 @@
+import contextlib
+import contextvars
+from typing import ContextManager
+
+
+class ProgressHook:
+    """Receives progress notifications from API calls; the default shows nothing"""
+
+    def task(self, message: str) -> ContextManager:
+        """
+        Context manager wrapped around a long-running step
+
+        Args:
+            message: User-facing description of the step
+        """
+        return contextlib.nullcontext()
+
+
+_progress_hook = contextvars.ContextVar("progress_hook", default=ProgressHook())
+
+
+def get_progress_hook() -> ProgressHook:
+    """Get the hook active in the current context"""
+    return _progress_hook.get()
+
+
+def set_progress_hook(hook: ProgressHook) -> contextvars.Token:
+    """Use hook for API calls made from the current context (e.g. one script run)"""
+    return _progress_hook.set(hook)
+
+
+@contextlib.contextmanager
+def progress_scope(hook: ProgressHook):
+    """Use hook for API calls made inside the with block"""
+    token = _progress_hook.set(hook)
+    try:
+        yield hook
+    finally:
+        _progress_hook.reset(token)
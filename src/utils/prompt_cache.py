@@ -0,0 +1,56 @@
+import threading
+from typing import Dict
+
+# OpenAI only caches prompts at least this long, in 128-token steps after it
+MIN_CACHEABLE_PROMPT_TOKENS = 1024
+
+
+class PromptCacheStats:
+    """How much of each prompt template's input the provider served from its prompt cache"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._templates = {}
+
+    def record(self, template: str, prompt_tokens: int, cached_tokens: int):
+        """Record the usage of one fresh (not locally cached) completion"""
+        with self._lock:
+            stats = self._templates.get(template)
+            if stats is None:
+                stats = {"requests": 0, "eligible_requests": 0, "hits": 0, "prompt_tokens": 0, "cached_tokens": 0}
+                self._templates[template] = stats
+
+            stats["requests"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["cached_tokens"] += cached_tokens
+            if prompt_tokens >= MIN_CACHEABLE_PROMPT_TOKENS:
+                stats["eligible_requests"] += 1
+            if cached_tokens:
+                stats["hits"] += 1
+
+    def snapshot(self) -> Dict:
+        """
+        Per-template totals
+
+        Returns:
+            Dict of template name to its counters plus hit_rate (share of requests
+            with any cached tokens) and token_hit_ratio (share of prompt tokens cached)
+        """
+        with self._lock:
+            return {
+                template: {
+                    **stats,
+                    "hit_rate": round(stats["hits"] / stats["requests"], 3) if stats["requests"] else 0.0,
+                    "token_hit_ratio": round(stats["cached_tokens"] / stats["prompt_tokens"], 3)
+                    if stats["prompt_tokens"] else 0.0
+                }
+                for template, stats in sorted(self._templates.items())
+            }
+
+
+_prompt_cache_stats = PromptCacheStats()
+
+
+def get_prompt_cache_stats() -> PromptCacheStats:
+    """Get the process-wide prompt cache counters"""
+    return _prompt_cache_stats
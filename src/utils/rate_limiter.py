@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional
+
+from utils.client_registry import key_id
+from utils.config import API_CONFIG, GENERATION_SETTINGS
+from utils.tokenizer import get_tokenizer
+
+
+class RateLimitWaitTooLong(Exception):
+    """Raised when admission would take longer than the caller is willing to wait"""
+
+
+class TokenBucket:
+    """Token bucket that lets reservations go into debt so callers queue in order"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount could be taken, without taking it"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_per_second
+
+    def take(self, amount: float):
+        """Take amount, possibly leaving the bucket in debt"""
+        self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        """Return unused tokens (or charge extra when amount is negative)"""
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class Reservation:
+    """Admission granted by a RateLimiter, reconciled once usage is known"""
+
+    def __init__(self, limiter: "RateLimiter", estimated_tokens: int, wait_time: float):
+        self.limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.wait_time = wait_time
+        self.reconciled = False
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budget for one API key and model"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_wait: float = None):
+        """
+        Initialize the limiter
+
+        Args:
+            requests_per_minute: Request budget per minute
+            tokens_per_minute: Token budget (prompt + completion) per minute
+            max_wait: Longest a caller is queued before admission fails
+        """
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+        self.max_wait = GENERATION_SETTINGS['deadline_seconds'] if max_wait is None else max_wait
+        self._lock = threading.Lock()
+        self._stats = {"admitted": 0, "queued": 0, "rejected": 0, "total_wait": 0.0}
+
+    def _reserve(self, estimated_tokens: int) -> Reservation:
+        # A single request can never need more than a full bucket
+        estimated_tokens = min(estimated_tokens, int(self.tokens.capacity))
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self.requests.wait_time(1, now),
+                self.tokens.wait_time(estimated_tokens, now)
+            )
+            if wait > self.max_wait:
+                self._stats["rejected"] += 1
+                raise RateLimitWaitTooLong(
+                    f"Rate limit kuyruğu çok uzun ({wait:.0f} sn). Lütfen biraz bekleyip tekrar deneyin."
+                )
+
+            self.requests.take(1)
+            self.tokens.take(estimated_tokens)
+
+            self._stats["admitted"] += 1
+            if wait > 0:
+                self._stats["queued"] += 1
+                self._stats["total_wait"] += wait
+
+            return Reservation(self, estimated_tokens, wait)
+
+    def acquire(self, estimated_tokens: int) -> Reservation:
+        """Block until the request fits the budget"""
+        reservation = self._reserve(estimated_tokens)
+        if reservation.wait_time > 0:
+            time.sleep(reservation.wait_time)
+        return reservation
+
+    def try_acquire(self, estimated_tokens: int) -> Optional[Reservation]:
+        """Reserve budget only if it is free right now, e.g. for a hedge backup that must not queue"""
+        estimated_tokens = min(estimated_tokens, int(self.tokens.capacity))
+        with self._lock:
+            now = time.monotonic()
+            if self.requests.wait_time(1, now) > 0 or self.tokens.wait_time(estimated_tokens, now) > 0:
+                return None
+
+            self.requests.take(1)
+            self.tokens.take(estimated_tokens)
+            self._stats["admitted"] += 1
+            return Reservation(self, estimated_tokens, 0.0)
+
+    async def aacquire(self, estimated_tokens: int) -> Reservation:
+        """Wait without blocking the event loop until the request fits the budget"""
+        reservation = self._reserve(estimated_tokens)
+        if reservation.wait_time > 0:
+            await asyncio.sleep(reservation.wait_time)
+        return reservation
+
+    def reconcile(self, reservation: Reservation, actual_tokens: int):
+        """Correct the token budget once the real usage is known"""
+        with self._lock:
+            if reservation.reconciled:
+                return
+            reservation.reconciled = True
+            self.tokens.give_back(reservation.estimated_tokens - actual_tokens)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "total_wait": round(self._stats["total_wait"], 2),
+                "available_requests": int(self.requests.tokens),
+                "available_tokens": int(self.tokens.tokens)
+            }
+
+
+def estimate_tokens(messages: List[Dict], max_tokens: int, model: str = None) -> int:
+    """Pre-charge for a request: counted prompt tokens plus the completion budget"""
+    return get_tokenizer(model).count_messages(messages) + max_tokens
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api_key: str, model: str) -> RateLimiter:
+    """Get the process-wide limiter shared by every session using this key and model"""
+    limits = API_CONFIG['openai']['rate_limits']
+    model_limits = limits.get(model, limits['default'])
+
+    # Same id as the client pool and usage ledger; raw keys are never stored
+    limiter_key = (key_id(api_key), model)
+
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(limiter_key)
+        if limiter is None:
+            limiter = RateLimiter(model_limits['rpm'], model_limits['tpm'])
+            _rate_limiters[limiter_key] = limiter
+        return limiter
+
+
+def get_rate_limiter_stats() -> Dict:
+    """Get stats for every active limiter, keyed by 'key_id/model'"""
+    with _rate_limiters_lock:
+        limiters = dict(_rate_limiters)
+    return {f"{key}/{model}": limiter.stats() for (key, model), limiter in limiters.items()}
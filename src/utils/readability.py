@@ -0,0 +1,75 @@
+from typing import Sequence
+
+import numpy as np
+
+# Every Turkish syllable has exactly one vowel, so syllables are counted as vowels
+VOWELS = "aeıioöuüâîû"
+_SPACE = ord(" ")
+
+# Vowel lookup by code point; everything past the last vowel maps to the final False slot
+_IS_VOWEL = np.zeros(max(map(ord, VOWELS)) + 2, dtype=bool)
+_IS_VOWEL[[ord(vowel) for vowel in VOWELS]] = True
+
+# Bezirci-Yılmaz weights of words with 3, 4, 5 and 6+ syllables
+BEZIRCI_YILMAZ_WEIGHTS = np.array([0.84, 1.5, 3.5, 26.25])
+
+# Lower bounds of the Ateşman score bands, easiest first
+ATESMAN_LEVELS = (
+    (90, "Çok Kolay"),
+    (70, "Kolay"),
+    (50, "Orta"),
+    (30, "Zor"),
+    (0, "Çok Zor")
+)
+
+
+def syllable_counts(words: Sequence[str]) -> np.ndarray:
+    """
+    Syllables of each lowercased word (as from turkish_text.tokenize)
+
+    The vowels of all words are counted at once over their code points.
+    Words without a vowel ("km", "tl") count as one syllable.
+    """
+    if not words:
+        return np.zeros(0, dtype=np.int64)
+
+    codes = np.frombuffer(" ".join(words).encode("utf-32-le"), dtype=np.uint32)
+    word_ids = np.cumsum(codes == _SPACE)
+    is_vowel = _IS_VOWEL[np.minimum(codes, len(_IS_VOWEL) - 1)]
+    vowels = np.bincount(word_ids[is_vowel], minlength=len(words))
+    return np.maximum(vowels, 1)
+
+
+def long_word_counts(syllables: np.ndarray) -> np.ndarray:
+    """Number of words with 3, 4, 5 and 6+ syllables"""
+    return np.bincount(np.minimum(syllables, 6), minlength=7)[3:]
+
+
+def atesman(syllables_per_word: np.ndarray, words_per_sentence: np.ndarray) -> np.ndarray:
+    """
+    Ateşman (1997) reading ease, 0 (very hard) to 100 (very easy)
+
+    Turkish adaptation of Flesch reading ease; works on any number of documents.
+    """
+    score = 198.825 - 40.175 * syllables_per_word - 2.610 * words_per_sentence
+    return np.clip(score, 0, 100)
+
+
+def bezirci_yilmaz(words_per_sentence: np.ndarray, long_words_per_sentence: np.ndarray) -> np.ndarray:
+    """
+    Bezirci-Yılmaz (2010) grade level, i.e. years of schooling the text needs
+
+    Args:
+        words_per_sentence: Average sentence length of each document
+        long_words_per_sentence: Shape (documents, 4); average number of words
+            with 3, 4, 5 and 6+ syllables per sentence
+    """
+    return np.sqrt(words_per_sentence * (long_words_per_sentence @ BEZIRCI_YILMAZ_WEIGHTS))
+
+
+def atesman_level(score: float) -> str:
+    """Difficulty band of an Ateşman score"""
+    for lower_bound, level in ATESMAN_LEVELS:
+        if score >= lower_bound:
+            return level
+    return ATESMAN_LEVELS[-1][1]
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from utils.config import CACHE_SETTINGS, PATHS
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + disk) cache for successful generation results"""
+
+    def __init__(self,
+                 max_entries: int = 256,
+                 ttl_seconds: float = 6 * 60 * 60,
+                 disk_dir: Optional[str] = None,
+                 disk_max_bytes: int = 50 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of results kept in memory
+            ttl_seconds: Time after which an entry is considered stale
+            disk_dir: Directory for the disk tier, None disables it
+            disk_max_bytes: Size budget of the disk tier
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory = OrderedDict()
+        self._disk_index = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0}
+
+        if self.disk_dir:
+            self._load_disk_index()
+
+    @staticmethod
+    def make_key(**request) -> str:
+        """Build a content-addressed key from the full request parameters"""
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a cached result, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._is_fresh(entry["stored_at"]):
+                    self._memory.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return dict(entry["value"])
+                del self._memory[key]
+
+            entry = self._read_disk(key)
+            if entry is not None:
+                self._remember(key, entry)
+                self._stats["hits"] += 1
+                self._stats["disk_hits"] += 1
+                return dict(entry["value"])
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Dict):
+        """Store a result in both tiers"""
+        entry = {"stored_at": time.time(), "value": dict(value)}
+        with self._lock:
+            self._remember(key, entry)
+            self._write_disk(key, entry)
+
+    def stats(self) -> Dict:
+        """Get hit/miss counters and tier sizes"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk_index),
+                "disk_bytes": self._disk_bytes
+            }
+
+    def clear(self):
+        """Remove all entries from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._disk_index):
+                self._remove_disk(key)
+
+    def _is_fresh(self, stored_at: float) -> bool:
+        return time.time() - stored_at < self.ttl_seconds
+
+    def _remember(self, key: str, entry: Dict):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _load_disk_index(self):
+        """Index existing disk entries, oldest first"""
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            files = []
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".json"):
+                    stat = os.stat(os.path.join(self.disk_dir, name))
+                    files.append((stat.st_mtime, name[:-5], stat.st_size))
+            for _, key, size in sorted(files):
+                self._disk_index[key] = size
+                self._disk_bytes += size
+        except OSError as e:
+            logging.warning(f"Response cache disk tier disabled: {str(e)}")
+            self.disk_dir = None
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        if not self.disk_dir or key not in self._disk_index:
+            return None
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._remove_disk(key)
+            return None
+
+        if not self._is_fresh(entry.get("stored_at", 0)):
+            self._remove_disk(key)
+            return None
+
+        self._disk_index.move_to_end(key)
+        return entry
+
+    def _write_disk(self, key: str, entry: Dict):
+        if not self.disk_dir:
+            return
+        try:
+            data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+            if len(data) > self.disk_max_bytes:
+                return
+
+            # Write atomically so concurrent readers never see partial files
+            tmp_path = f"{self._disk_path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._disk_path(key))
+
+            self._disk_bytes += len(data) - self._disk_index.pop(key, 0)
+            self._disk_index[key] = len(data)
+
+            while self._disk_bytes > self.disk_max_bytes and self._disk_index:
+                oldest_key = next(iter(self._disk_index))
+                self._remove_disk(oldest_key)
+        except OSError as e:
+            logging.warning(f"Response cache write failed: {str(e)}")
+
+    def _remove_disk(self, key: str):
+        self._disk_bytes -= self._disk_index.pop(key, 0)
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the process-wide response cache, or None if caching is disabled"""
+    global _response_cache
+
+    if not CACHE_SETTINGS['enabled']:
+        return None
+
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                max_entries=CACHE_SETTINGS['memory_max_entries'],
+                ttl_seconds=CACHE_SETTINGS['ttl_seconds'],
+                disk_dir=PATHS['cache_dir'] if CACHE_SETTINGS['disk_enabled'] else None,
+                disk_max_bytes=CACHE_SETTINGS['disk_max_bytes']
+            )
+        return _response_cache
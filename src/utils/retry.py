@@ -0,0 +1,190 @@
+import asyncio
+import email.utils
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import openai
+
+from utils.config import GENERATION_SETTINGS
+
+# HTTP status codes worth another attempt
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Rate limit reset headers use Go-style durations such as "1s", "6m0s" or "120ms"
+DURATION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the overall retry deadline leaves no time for another attempt"""
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter that honors server rate limit hints"""
+
+    def __init__(self,
+                 max_retries: int = None,
+                 timeout_seconds: float = None,
+                 deadline_seconds: float = None,
+                 base_delay: float = None,
+                 max_delay: float = None):
+        """
+        Initialize the retry policy
+
+        Args:
+            max_retries: Retries after the first attempt
+            timeout_seconds: Timeout for a single attempt
+            deadline_seconds: Overall budget across all attempts and waits
+            base_delay: Backoff delay for the first retry
+            max_delay: Upper bound for a single backoff delay
+        """
+        self.max_retries = GENERATION_SETTINGS['max_retries'] if max_retries is None else max_retries
+        self.timeout_seconds = timeout_seconds or GENERATION_SETTINGS['timeout_seconds']
+        self.deadline_seconds = deadline_seconds or GENERATION_SETTINGS['deadline_seconds']
+        self.base_delay = base_delay or GENERATION_SETTINGS['retry_base_delay']
+        self.max_delay = max_delay or GENERATION_SETTINGS['retry_max_delay']
+
+    def call(self, fn: Callable[[float], Any], attempts: Optional[List[Dict]] = None) -> Any:
+        """
+        Call fn until it succeeds or the policy gives up
+
+        Args:
+            fn: Callable receiving the timeout for this attempt
+            attempts: Optional list that receives one telemetry dict per attempt
+
+        Returns:
+            Return value of the first successful call
+        """
+        attempts = [] if attempts is None else attempts
+        deadline = time.time() + self.deadline_seconds
+
+        for attempt in range(self.max_retries + 1):
+            timeout = self._attempt_timeout(deadline)
+            start_time = time.time()
+            try:
+                value = fn(timeout)
+                attempts.append(self._record(attempt, start_time))
+                return value
+            except Exception as e:
+                delay = self._next_delay(attempt, e, deadline)
+                attempts.append(self._record(attempt, start_time, e, delay))
+                if delay is None:
+                    raise
+            time.sleep(delay)
+
+    async def acall(self, fn: Callable[[float], Any], attempts: Optional[List[Dict]] = None) -> Any:
+        """Async variant of call; fn must return an awaitable"""
+        attempts = [] if attempts is None else attempts
+        deadline = time.time() + self.deadline_seconds
+
+        for attempt in range(self.max_retries + 1):
+            timeout = self._attempt_timeout(deadline)
+            start_time = time.time()
+            try:
+                value = await fn(timeout)
+                attempts.append(self._record(attempt, start_time))
+                return value
+            except Exception as e:
+                delay = self._next_delay(attempt, e, deadline)
+                attempts.append(self._record(attempt, start_time, e, delay))
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    def is_retryable(self, error: Exception) -> bool:
+        """Check whether an error is transient"""
+        if isinstance(error, openai.RateLimitError):
+            # Quota exhaustion also arrives as a 429 but will not recover by waiting
+            return getattr(error, 'code', None) != 'insufficient_quota'
+        if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in RETRYABLE_STATUS_CODES
+        return False
+
+    def _attempt_timeout(self, deadline: float) -> float:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise DeadlineExceeded("Toplam istek süresi aşıldı.")
+        return min(self.timeout_seconds, remaining)
+
+    def _next_delay(self, attempt: int, error: Exception, deadline: float) -> Optional[float]:
+        """Get the wait before the next attempt, or None to give up"""
+        if attempt >= self.max_retries or not self.is_retryable(error):
+            return None
+
+        backoff = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = backoff / 2 + random.uniform(0, backoff / 2)
+
+        server_delay = retry_after_seconds(error)
+        if server_delay is not None:
+            delay = max(delay, server_delay + random.uniform(0, self.base_delay / 2))
+
+        if time.time() + delay >= deadline:
+            return None
+        return delay
+
+    def _record(self,
+                attempt: int,
+                start_time: float,
+                error: Optional[Exception] = None,
+                delay: Optional[float] = None) -> Dict:
+        record = {
+            "attempt": attempt + 1,
+            "duration": round(time.time() - start_time, 3),
+            "success": error is None
+        }
+        if error is not None:
+            record["error"] = error.__class__.__name__
+            record["status_code"] = getattr(error, 'status_code', None)
+            record["wait"] = round(delay, 3) if delay is not None else None
+        return record
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the server's requested wait from Retry-After / x-ratelimit-reset-* headers"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get('retry-after')
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            try:
+                retry_date = email.utils.parsedate_to_datetime(retry_after)
+                return max(0.0, retry_date.timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    # Prefer the reset of whichever budget is exhausted
+    resets = []
+    for limit in ('requests', 'tokens'):
+        reset = parse_duration(headers.get(f'x-ratelimit-reset-{limit}'))
+        if reset is None:
+            continue
+        if headers.get(f'x-ratelimit-remaining-{limit}') == '0':
+            return reset
+        resets.append(reset)
+    return min(resets) if resets else None
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse durations like '1s', '6m0s' or '120ms' into seconds"""
+    if not value:
+        return None
+    parts = DURATION_PATTERN.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class Flight:
+    """An in-flight call that followers can wait on"""
+
+    def __init__(self):
+        self.result = None
+        self._done = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """Wait for the leader; None means it gave up without a result"""
+        self._done.wait(timeout)
+        return self.result
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls so only one of them does the work"""
+
+    def __init__(self):
+        self._flights = {}
+        self._async_flights = {}
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "followers": 0}
+
+    def join(self, key: str) -> Tuple[Flight, bool]:
+        """
+        Join the flight for key, starting it if none is in progress
+
+        Returns:
+            Tuple of (flight, True if the caller is the leader and must call land)
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._stats["followers"] += 1
+                return flight, False
+
+            flight = Flight()
+            self._flights[key] = flight
+            self._stats["leaders"] += 1
+            return flight, True
+
+    def land(self, key: str, flight: Flight, result: Any = None):
+        """Publish the leader's result (None if it gave up) and release followers"""
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.result = result
+        flight._done.set()
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers with the same key
+
+        Returns:
+            Tuple of (result, True if the result was shared from another caller)
+        """
+        flight, leader = self.join(key)
+        if not leader:
+            result = flight.wait(timeout)
+            if result is not None:
+                return result, True
+            # The leader failed to produce anything; do the work ourselves
+            return fn(), False
+
+        result = None
+        try:
+            result = fn()
+            return result, False
+        finally:
+            self.land(key, flight, result)
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async variant of do for callers on the same event loop"""
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+
+        with self._lock:
+            future = self._async_flights.get(flight_key)
+            leader = future is None
+            if leader:
+                future = loop.create_future()
+                self._async_flights[flight_key] = future
+                self._stats["leaders"] += 1
+            else:
+                self._stats["followers"] += 1
+
+        if not leader:
+            result = await asyncio.shield(future)
+            if result is not None:
+                return result, True
+            return await fn(), False
+
+        result = None
+        try:
+            result = await fn()
+            return result, False
+        finally:
+            with self._lock:
+                self._async_flights.pop(flight_key, None)
+            future.set_result(result)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._flights) + len(self._async_flights)}
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group shared by all sessions"""
+    return _single_flight
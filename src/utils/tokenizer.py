@@ -0,0 +1,268 @@
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+from utils.config import API_CONFIG, GENERATION_SETTINGS
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to the ~4 characters per token estimate
+    tiktoken = None
+
+# Chat formatting overhead per message and for priming the assistant reply
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+DEFAULT_CONTEXT_WINDOW = 4096
+
+
+class ContextLengthExceeded(Exception):
+    """Raised when a prompt cannot fit the model's context window"""
+
+
+class Tokenizer:
+    """Token counting for one model, exact with tiktoken and estimated without it"""
+    
+    def __init__(self, encoding=None):
+        self.encoding = encoding
+    
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+    
+    def count(self, text: str) -> int:
+        """Count the tokens in text"""
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / 4)
+    
+    def count_messages(self, messages: List[Dict]) -> int:
+        """Count the prompt tokens of a chat messages list"""
+        return sum(
+            TOKENS_PER_MESSAGE + self.count(message.get("content") or "")
+            for message in messages
+        ) + TOKENS_PER_REPLY
+    
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text down to at most max_tokens tokens"""
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            return self.encoding.decode(tokens[:max_tokens])
+        return text[:max_tokens * 4]
+
+
+class EncodingLoader:
+    """
+    Loads tiktoken encodings, which are downloaded on first use
+
+    A failed download is retried after a doubling backoff instead of being
+    remembered for good, and callers never wait on a download another
+    thread already started: they get None (the estimate) meanwhile.
+    """
+
+    def __init__(self, retry_seconds: float, retry_max_seconds: float):
+        self.retry_seconds = retry_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._encodings = {}
+        self._loading = set()
+        self._failures = {}
+        self._retry_at = {}
+        self._lock = threading.Lock()
+
+    def get(self, model: Optional[str]):
+        """Get the encoding for a model, or None while it is unavailable"""
+        if tiktoken is None:
+            return None
+        with self._lock:
+            if model in self._encodings:
+                return self._encodings[model]
+            if model in self._loading or time.monotonic() < self._retry_at.get(model, 0):
+                return None
+            self._loading.add(model)
+
+        encoding = None
+        try:
+            encoding = self._fetch(model)
+        except Exception as e:
+            # Stay usable offline and try again later
+            with self._lock:
+                failures = self._failures.get(model, 0) + 1
+                self._failures[model] = failures
+                backoff = min(self.retry_max_seconds, self.retry_seconds * 2 ** (failures - 1))
+                self._retry_at[model] = time.monotonic() + backoff
+            logging.warning(f"tiktoken encoding unavailable, estimating tokens for {backoff:.0f}s: {str(e)}")
+        finally:
+            with self._lock:
+                self._loading.discard(model)
+                if encoding is not None:
+                    self._encodings[model] = encoding
+                    self._failures.pop(model, None)
+                    self._retry_at.pop(model, None)
+        return encoding
+
+    def warm(self, models: Iterable[Optional[str]]):
+        """Load encodings in a background thread so requests do not download them"""
+        with self._lock:
+            now = time.monotonic()
+            models = [
+                model for model in models
+                if model not in self._encodings and model not in self._loading and now >= self._retry_at.get(model, 0)
+            ]
+        if tiktoken is None or not models:
+            return
+        threading.Thread(target=lambda: [self.get(model) for model in models], daemon=True).start()
+
+    @staticmethod
+    def _fetch(model: Optional[str]):
+        if not model:
+            return tiktoken.get_encoding("cl100k_base")
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+
+
+_encoding_loader = EncodingLoader(
+    GENERATION_SETTINGS['encoding_retry_seconds'],
+    GENERATION_SETTINGS['encoding_retry_max_seconds']
+)
+
+
+def get_encoding_loader() -> EncodingLoader:
+    """Get the process-wide tiktoken encoding loader"""
+    return _encoding_loader
+
+
+def get_tokenizer(model: Optional[str] = None) -> Tokenizer:
+    """Get the tokenizer for a model (cl100k_base when unknown)"""
+    return Tokenizer(_encoding_loader.get(model))
+
+
+def context_window(model: str) -> int:
+    """Get the total token budget (prompt + completion) of a model"""
+    return API_CONFIG['openai']['max_tokens'].get(model, DEFAULT_CONTEXT_WINDOW)
+
+
+def fit_to_context(messages: List[Dict], max_tokens: int, model: str, allow_compress: Optional[bool] = None):
+    """
+    Make a request fit the model's context window before it is sent
+    
+    The completion budget is lowered first, down to min_completion_tokens.
+    If the prompt is still too long, the last user message is truncated when
+    compression is allowed (by default when GENERATION_SETTINGS['context_overflow']
+    is 'compress'); otherwise, or if even that is not enough,
+    ContextLengthExceeded is raised.
+    
+    Returns:
+        Tuple of (messages, max_tokens, info dict describing any adjustment)
+    """
+    tokenizer = get_tokenizer(model)
+    window = context_window(model)
+    min_completion = GENERATION_SETTINGS['min_completion_tokens']
+    prompt_tokens = tokenizer.count_messages(messages)
+    info = {"prompt_tokens_estimate": prompt_tokens}
+    
+    if prompt_tokens + max_tokens <= window:
+        return messages, max_tokens, info
+    
+    if prompt_tokens + min_completion <= window:
+        info["max_tokens_adjusted"] = window - prompt_tokens
+        return messages, window - prompt_tokens, info
+    
+    if allow_compress is None:
+        allow_compress = GENERATION_SETTINGS['context_overflow'] == 'compress'
+    if not allow_compress:
+        raise ContextLengthExceeded(
+            f"İstem çok uzun ({prompt_tokens} token). Model sınırı: {window} token."
+        )
+    
+    last = messages[-1]
+    last_tokens = tokenizer.count(last["content"])
+    allowed = last_tokens - (prompt_tokens + min_completion - window)
+    if allowed <= 0:
+        raise ContextLengthExceeded(
+            f"Sistem talimatları modele sığmıyor ({prompt_tokens - last_tokens} token). Model sınırı: {window} token."
+        )
+    
+    messages = messages[:-1] + [{**last, "content": tokenizer.truncate(last["content"], allowed)}]
+    prompt_tokens = tokenizer.count_messages(messages)
+    info.update({
+        "prompt_tokens_estimate": prompt_tokens,
+        "prompt_truncated": True,
+        "max_tokens_adjusted": min(max_tokens, window - prompt_tokens)
+    })
+    return messages, info["max_tokens_adjusted"], info
+
+
+class CompletionSizer:
+    """Sizes max_tokens per bucket (e.g. platform or email length) from observed completions"""
+    
+    def __init__(self, min_samples: int = 10, headroom: float = 1.25, history: int = 200):
+        self.min_samples = min_samples
+        self.headroom = headroom
+        self.history = history
+        self._samples = {}
+        self._lock = threading.Lock()
+    
+    def record(self, bucket: str, result: Dict):
+        """Record the completion length of a fresh (not cached or shared) result"""
+        if not result.get('success') or result.get('cache_hit') or result.get('coalesced'):
+            return
+        completion_tokens = result.get('completion_tokens')
+        if not completion_tokens:
+            return
+        
+        truncated = result.get('finish_reason') == 'length'
+        with self._lock:
+            samples = self._samples.setdefault(bucket, deque(maxlen=self.history))
+            samples.append((completion_tokens, truncated))
+    
+    def suggest(self, bucket: str, default: int) -> int:
+        """
+        Suggest max_tokens for a bucket
+        
+        Uses the 95th percentile of observed completions plus headroom once
+        enough samples exist, bounded to [default / 2, default * 2]. Frequent
+        truncation pushes the suggestion up instead.
+        """
+        with self._lock:
+            samples = list(self._samples.get(bucket, ()))
+        if len(samples) < self.min_samples:
+            return default
+        
+        lengths = sorted(length for length, _ in samples)
+        p95 = lengths[min(len(lengths) - 1, int(len(lengths) * 0.95))]
+        suggestion = math.ceil(p95 * self.headroom)
+        
+        truncation_rate = sum(1 for _, truncated in samples if truncated) / len(samples)
+        if truncation_rate > 0.05:
+            suggestion = max(suggestion, default) * 1.5
+        
+        return int(min(max(suggestion, default // 2), default * 2))
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                bucket: {
+                    "samples": len(samples),
+                    "truncated": sum(1 for _, truncated in samples if truncated)
+                }
+                for bucket, samples in self._samples.items()
+            }
+
+
+_completion_sizer = CompletionSizer(min_samples=GENERATION_SETTINGS['adaptive_min_samples'])
+
+
+def get_completion_sizer() -> CompletionSizer:
+    """Get the process-wide completion sizer shared by all sessions"""
+    return _completion_sizer
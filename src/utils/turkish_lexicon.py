@@ -0,0 +1,234 @@
+# Turkish polarity lexicon: stem -> (polarity, subjectivity), both as in
+# TextBlob's pattern lexicon (polarity -1..1, subjectivity 0..1).
+# Words are matched on their longest lexicon prefix, so one stem covers its
+# inflected forms ("harika", "harikaydı", "harikalar"); longer entries such as
+# "sorunsuz" override shorter ones such as "sorun". Stems shorter than
+# MIN_STEM_LENGTH are never matched to keep prefixes like "sev" from hitting
+# unrelated words ("seviye"). Entries set to None block a shorter match.
+
+MIN_STEM_LENGTH = 3
+
+TURKISH_POLARITY = {
+    # Positive
+    "harika": (0.9, 1.0),
+    "mükemmel": (1.0, 1.0),
+    "muhteşem": (1.0, 1.0),
+    "müthiş": (0.9, 1.0),
+    "şahane": (0.9, 1.0),
+    "enfes": (0.9, 1.0),
+    "kusursuz": (0.9, 0.9),
+    "olağanüstü": (0.9, 0.9),
+    "fevkalade": (0.9, 0.9),
+    "efsane": (0.8, 0.9),
+    "süper": (0.8, 0.9),
+    "güzel": (0.7, 0.8),
+    "iyi": (0.6, 0.6),
+    "iyileş": (0.5, 0.5),
+    "hoş": (0.5, 0.7),
+    "keyif": (0.6, 0.7),
+    "keyifli": (0.7, 0.8),
+    "eğlen": (0.6, 0.7),
+    "eğlenceli": (0.7, 0.8),
+    "mutlu": (0.8, 0.9),
+    "mutluluk": (0.8, 0.9),
+    "sevinç": (0.8, 0.9),
+    "sevin": (0.7, 0.8),
+    "sevgi": (0.7, 0.8),
+    "seviyor": (0.6, 0.7),
+    "sevdi": (0.6, 0.7),
+    "sevecek": (0.6, 0.7),
+    "sever": (0.5, 0.6),
+    "sevimli": (0.6, 0.8),
+    "beğen": (0.6, 0.7),
+    "bayıl": (0.8, 0.9),
+    "hayran": (0.7, 0.8),
+    "tavsiye": (0.5, 0.5),
+    "öneririm": (0.6, 0.7),
+    "memnun": (0.7, 0.8),
+    "teşekkür": (0.5, 0.5),
+    "başarı": (0.7, 0.6),
+    "başarılı": (0.7, 0.6),
+    "kazan": (0.5, 0.4),
+    "kazanç": (0.5, 0.4),
+    "fırsat": (0.5, 0.4),
+    "avantaj": (0.6, 0.5),
+    "fayda": (0.5, 0.4),
+    "faydalı": (0.6, 0.5),
+    "yararlı": (0.6, 0.5),
+    "değerli": (0.6, 0.6),
+    "kaliteli": (0.7, 0.6),
+    "kalite": (0.4, 0.4),
+    "güven": (0.5, 0.5),
+    "güvenilir": (0.6, 0.5),
+    "güvenli": (0.5, 0.4),
+    "sağlıklı": (0.5, 0.4),
+    "rahat": (0.5, 0.6),
+    "kolay": (0.5, 0.5),
+    "pratik": (0.5, 0.5),
+    "hızlı": (0.4, 0.4),
+    "ekonomik": (0.4, 0.4),
+    "uygun": (0.3, 0.4),
+    "ucuz": (0.2, 0.4),
+    "indirim": (0.4, 0.3),
+    "hediye": (0.5, 0.4),
+    "ücretsiz": (0.5, 0.3),
+    "bedava": (0.4, 0.4),
+    "yeni": (0.2, 0.3),
+    "yenilik": (0.4, 0.4),
+    "yenilikçi": (0.6, 0.6),
+    "özel": (0.4, 0.5),
+    "benzersiz": (0.7, 0.7),
+    "eşsiz": (0.8, 0.8),
+    "etkileyici": (0.7, 0.8),
+    "etkili": (0.5, 0.5),
+    "verimli": (0.5, 0.5),
+    "şık": (0.6, 0.7),
+    "zarif": (0.6, 0.7),
+    "lezzetli": (0.8, 0.9),
+    "nefis": (0.8, 0.9),
+    "ferah": (0.5, 0.6),
+    "temiz": (0.4, 0.4),
+    "samimi": (0.5, 0.7),
+    "sıcak": (0.3, 0.4),
+    "dost": (0.4, 0.5),
+    "heyecan": (0.5, 0.8),
+    "heyecanlı": (0.6, 0.8),
+    "ilham": (0.6, 0.7),
+    "ilginç": (0.4, 0.7),
+    "merak": (0.3, 0.6),
+    "umut": (0.5, 0.6),
+    "umutlu": (0.6, 0.7),
+    "huzur": (0.7, 0.7),
+    "huzurlu": (0.7, 0.7),
+    "gurur": (0.6, 0.7),
+    "tebrik": (0.7, 0.7),
+    "kutla": (0.6, 0.6),
+    "destek": (0.4, 0.4),
+    "çözüm": (0.4, 0.4),
+    "sorunsuz": (0.6, 0.6),
+    "hatasız": (0.6, 0.6),
+    "zahmetsiz": (0.6, 0.6),
+    "kazasız": (0.4, 0.4),
+    "ödül": (0.6, 0.5),
+    "ödüllü": (0.6, 0.5),
+    "lider": (0.4, 0.4),
+    "profesyonel": (0.4, 0.4),
+    "uzman": (0.4, 0.4),
+    "doğru": (0.3, 0.4),
+    "güçlü": (0.5, 0.5),
+    "sağlam": (0.5, 0.5),
+    "dayanıklı": (0.5, 0.4),
+    "konfor": (0.5, 0.5),
+    "konforlu": (0.6, 0.6),
+    "işlevsel": (0.4, 0.4),
+    "şanslı": (0.6, 0.7),
+    "bereket": (0.5, 0.5),
+    "neşe": (0.7, 0.8),
+    "neşeli": (0.7, 0.8),
+    "coşku": (0.7, 0.8),
+    "bravo": (0.8, 0.9),
+    "aferin": (0.7, 0.8),
+
+    # Negative
+    "kötü": (-0.7, 0.7),
+    "berbat": (-0.9, 1.0),
+    "rezalet": (-1.0, 1.0),
+    "rezil": (-0.9, 1.0),
+    "korkunç": (-0.9, 1.0),
+    "felaket": (-0.9, 0.9),
+    "iğrenç": (-1.0, 1.0),
+    "vasat": (-0.4, 0.7),
+    "sıradan": (-0.2, 0.5),
+    "sıkıcı": (-0.6, 0.8),
+    "sıkıntı": (-0.5, 0.6),
+    "sorun": (-0.4, 0.4),
+    "sorunlu": (-0.6, 0.6),
+    "problem": (-0.4, 0.4),
+    "hata": (-0.5, 0.4),
+    "hatalı": (-0.6, 0.5),
+    "arıza": (-0.6, 0.4),
+    "arızalı": (-0.7, 0.5),
+    "bozuk": (-0.7, 0.5),
+    "kusur": (-0.5, 0.5),
+    "kusurlu": (-0.6, 0.6),
+    "eksik": (-0.4, 0.4),
+    "yetersiz": (-0.6, 0.6),
+    "zayıf": (-0.5, 0.5),
+    "pahalı": (-0.4, 0.5),
+    "yavaş": (-0.4, 0.4),
+    "zor": (-0.4, 0.5),
+    "karmaşık": (-0.4, 0.5),
+    "pişman": (-0.7, 0.8),
+    "kırgın": (-0.6, 0.8),
+    "üzgün": (-0.6, 0.8),
+    "üzücü": (-0.6, 0.8),
+    "üzül": (-0.6, 0.8),
+    "mutsuz": (-0.7, 0.8),
+    "öfke": (-0.7, 0.8),
+    "kızgın": (-0.7, 0.8),
+    "sinir": (-0.6, 0.8),
+    "şikayet": (-0.6, 0.6),
+    "rahatsız": (-0.5, 0.6),
+    "tehlike": (-0.6, 0.5),
+    "tehlikeli": (-0.7, 0.6),
+    "risk": (-0.3, 0.4),
+    "riskli": (-0.5, 0.5),
+    "kayıp": (-0.5, 0.4),
+    "kaybet": (-0.5, 0.5),
+    "zarar": (-0.6, 0.5),
+    "başarısız": (-0.7, 0.6),
+    "başarısızlık": (-0.7, 0.6),
+    "gereksiz": (-0.5, 0.6),
+    "faydasız": (-0.6, 0.6),
+    "değersiz": (-0.6, 0.7),
+    "kalitesiz": (-0.7, 0.7),
+    "güvensiz": (-0.6, 0.6),
+    "sahte": (-0.7, 0.7),
+    "yalan": (-0.7, 0.7),
+    "dolandırıcı": (-0.9, 0.8),
+    "kandır": (-0.7, 0.7),
+    "nefret": (-0.9, 0.9),
+    "kork": (-0.5, 0.7),
+    "endişe": (-0.5, 0.7),
+    "stres": (-0.5, 0.6),
+    "stresli": (-0.6, 0.7),
+    "yorucu": (-0.4, 0.6),
+    "yorgun": (-0.4, 0.6),
+    "acı": (-0.5, 0.6),
+    "ağrı": (-0.4, 0.4),
+    "kirli": (-0.5, 0.5),
+    "bayat": (-0.5, 0.6),
+    "tatsız": (-0.5, 0.7),
+    "çirkin": (-0.7, 0.8),
+    "kaba": (-0.6, 0.7),
+    "ilgisiz": (-0.5, 0.6),
+    "gecikme": (-0.4, 0.4),
+    "iptal": (-0.4, 0.4),
+    "iade": (-0.3, 0.3),
+
+    # Neutral words that would otherwise match a shorter entry above
+    "özellik": None,
+    "yeniden": None,
+    "doğrudan": None,
+    "zorunlu": None,
+    "iyice": None,
+}
+
+# Words that flip (and weaken) the sentiment of the word before them
+NEGATORS = frozenset((
+    "değil", "değildi", "değildir", "değiliz", "değilim", "değilsiniz",
+    "yok", "yoktu", "yoktur"
+))
+
+# Words that strengthen the sentiment of the word after them
+INTENSIFIERS = {
+    "çok": 1.3,
+    "gerçekten": 1.3,
+    "oldukça": 1.2,
+    "epey": 1.2,
+    "aşırı": 1.4,
+    "en": 1.3,
+    "daha": 1.1,
+    "biraz": 0.8,
+    "az": 0.7,
+}
@@ -0,0 +1,200 @@
+import functools
+import re
+from typing import List, Optional, Tuple
+
+from utils.turkish_lexicon import INTENSIFIERS, MIN_STEM_LENGTH, NEGATORS, TURKISH_POLARITY
+
+# Sentence-final punctuation (plus closing quotes/brackets) before whitespace, or a line break
+_BOUNDARY = re.compile(r'[.!?…]+["\'”’»)\]]*(?=\s|$)|\n')
+_NEXT_CHAR = re.compile(r'\s*(\S)')
+_WORD = re.compile(r'[^\W\d_]+')
+
+# Suffixes that negate a verb stem: beğenmedi, beğenmez, beğenmeyecek, beğenmeyin, beğenmiyor
+_VERB_NEGATION = re.compile(r'm[ae](?:d[ıiuü]|z|y[ae]c[ae]k|y[ıiuü]n|m$)|m[ıiuü]yor')
+# "Without" suffix: stressiz, zahmetsiz
+_PRIVATIVE = re.compile(r's[ıiuü]z')
+
+# Negated sentiment is flipped and weakened, as in TextBlob's pattern analyzer
+NEGATION_FACTOR = -0.5
+
+# Abbreviations whose period does not end a sentence
+ABBREVIATIONS = frozenset((
+    "dr", "prof", "doç", "yrd", "av", "op", "sn", "bkz", "vb", "vs", "örn",
+    "yy", "no", "tel", "ltd", "şti", "mah", "cad", "sok", "apt"
+))
+
+_MISSING = object()
+
+
+def turkish_lower(text: str) -> str:
+    """Lowercase with the Turkish dotted/dotless i rules (I -> ı, İ -> i)"""
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split Turkish text into sentences without any corpus
+
+    Sentences end at . ! ? … followed by whitespace, or at a line break. A
+    period is not a boundary after an abbreviation, an initial, list numbering
+    ("1. Madde") or when the next word starts in lowercase ("15. yüzyıl").
+    """
+    sentences = []
+    start = 0
+    for match in _BOUNDARY.finditer(text):
+        if match.group() != "\n" and not _is_boundary(text, start, match):
+            continue
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+
+    rest = text[start:].strip()
+    if rest:
+        sentences.append(rest)
+    return sentences
+
+
+def _is_boundary(text: str, start: int, match: re.Match) -> bool:
+    if not match.group().startswith("."):
+        return True
+
+    following = _NEXT_CHAR.match(text, match.end())
+    if following and following.group(1).islower():
+        return False
+
+    if match.group() != ".":
+        return True
+
+    before = text[start:match.start()].split()
+    if not before:
+        return True
+    word = turkish_lower(before[-1]).lstrip('("\'“‘')
+    if word in ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+        return False
+    # Numbering at the start of a list item
+    return not (word.isdigit() and len(before) == 1)
+
+
+class SentenceCounter:
+    """
+    Counts the sentences of text arriving in chunks, as split_sentences would
+    count the whole text, in amortized O(len(chunk)) per chunk
+    """
+
+    def __init__(self):
+        self.closed = 0
+        # Text of the sentence still being written and where to look for its end
+        self._open = ""
+        self._open_has_text = False
+        self._scan_from = 0
+
+    @property
+    def count(self) -> int:
+        return self.closed + (1 if self._open_has_text else 0)
+
+    def feed(self, chunk: str) -> int:
+        """Add a chunk and return the sentence count so far"""
+        self._open += chunk
+        self._open_has_text = self._open_has_text or not chunk.isspace()
+
+        while True:
+            match = _BOUNDARY.search(self._open, self._scan_from)
+            if match is None:
+                self._scan_from = len(self._open)
+                break
+            if not self._resolved(match):
+                # Wait for the text after it before deciding
+                self._scan_from = match.start()
+                break
+
+            if match.group() == "\n" or _is_boundary(self._open, 0, match):
+                if self._open[:match.end()].strip():
+                    self.closed += 1
+                self._open = self._open[match.end():]
+                self._open_has_text = bool(self._open.strip())
+                self._scan_from = 0
+            else:
+                self._scan_from = match.end()
+
+        return self.count
+
+    def _resolved(self, match: re.Match) -> bool:
+        if match.group() == "\n":
+            return True
+        if match.end() == len(self._open):
+            # More punctuation or a closing quote may still follow
+            return False
+        if match.group().startswith("."):
+            # "15. yüzyıl" vs. a sentence end depends on the next word
+            return _NEXT_CHAR.match(self._open, match.end()) is not None
+        return True
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words (letters only) for lexicon lookups"""
+    return _WORD.findall(turkish_lower(text))
+
+
+@functools.lru_cache(maxsize=65536)
+def word_polarity(word: str) -> Optional[Tuple[float, float]]:
+    """
+    (polarity, subjectivity) of a lowercased word from its longest lexicon stem
+
+    Returns:
+        None if the word carries no sentiment
+    """
+    for length in range(len(word), MIN_STEM_LENGTH - 1, -1):
+        entry = TURKISH_POLARITY.get(word[:length], _MISSING)
+        if entry is _MISSING:
+            continue
+        if entry is None:
+            return None
+
+        polarity, subjectivity = entry
+        suffix = word[length:]
+        if _VERB_NEGATION.match(suffix) or _PRIVATIVE.match(suffix):
+            polarity *= NEGATION_FACTOR
+        return polarity, subjectivity
+    return None
+
+
+def sentiment(tokens: List[str]) -> Tuple[float, float]:
+    """
+    Lexicon sentiment of tokenized text
+
+    Averages the sentiment-bearing words like TextBlob's pattern analyzer:
+    an intensifier ("çok") scales the next word and a negator ("değil",
+    "yok") flips the word right before it.
+
+    Returns:
+        Tuple of (polarity -1..1, subjectivity 0..1)
+    """
+    hits = []
+    last_hit = None
+    intensity = 1.0
+
+    for index, token in enumerate(tokens):
+        if token in NEGATORS:
+            if hits and last_hit == index - 1:
+                polarity, subjectivity = hits[-1]
+                hits[-1] = (polarity * NEGATION_FACTOR, subjectivity)
+            continue
+
+        if token in INTENSIFIERS:
+            intensity = INTENSIFIERS[token]
+            continue
+
+        entry = word_polarity(token)
+        if entry is not None:
+            polarity, subjectivity = entry
+            hits.append((max(-1.0, min(1.0, polarity * intensity)), min(1.0, subjectivity * intensity)))
+            last_hit = index
+        intensity = 1.0
+
+    if not hits:
+        return 0.0, 0.0
+    return (
+        sum(polarity for polarity, _ in hits) / len(hits),
+        sum(subjectivity for _, subjectivity in hits) / len(hits)
+    )
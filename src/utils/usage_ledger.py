@@ -0,0 +1,193 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from utils.config import PATHS
+
+# Rollups kept up to date on every record, so summaries never rescan the ledger
+ROLLUPS = (
+    ("day",),
+    ("key_id",),
+    ("generator",),
+    ("model",),
+    ("key_id", "day"),
+    ("generator", "key_id"),
+    ("model", "key_id")
+)
+
+COUNTERS = ("calls", "prompt_tokens", "completion_tokens", "cached_tokens", "cost", "latency")
+
+
+def _empty_totals() -> Dict:
+    return {counter: 0 for counter in COUNTERS}
+
+
+class UsageLedger:
+    """Append-only JSONL ledger of API spend with in-memory rollups"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the ledger
+
+        Args:
+            path: JSONL file to append to and replay on start, None keeps it in memory
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._totals = _empty_totals()
+        self._rollups = {fields: {} for fields in ROLLUPS}
+
+        if self.path:
+            self._replay()
+
+    def record(self,
+               key_id: str,
+               model: str,
+               generator: Optional[str],
+               prompt_tokens: int,
+               completion_tokens: int,
+               cached_tokens: int,
+               latency: float,
+               cost: float,
+               batch: bool = False,
+               estimated: bool = False) -> Dict:
+        """
+        Append one API call to the ledger
+
+        Args:
+            estimated: The token counts are an estimate, e.g. for a cancelled
+                hedge attempt that never reported its usage
+
+        Returns:
+            The stored ledger entry
+        """
+        now = time.time()
+        entry = {
+            "timestamp": now,
+            "day": datetime.fromtimestamp(now).strftime('%Y-%m-%d'),
+            "key_id": key_id,
+            "model": model,
+            "generator": generator or "direct",
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+            "latency": round(latency, 3),
+            "cost": cost,
+            "batch": batch,
+            "estimated": estimated
+        }
+
+        with self._lock:
+            self._append(entry)
+            self._add(entry)
+        return entry
+
+    def summary(self, **filters) -> Dict:
+        """
+        Get totals, optionally for one value of a maintained rollup
+
+        Example: summary(key_id=..., day='2024-05-01')
+
+        Raises:
+            ValueError: If the filter fields do not match any rollup in ROLLUPS
+        """
+        with self._lock:
+            if not filters:
+                return self._describe(self._totals)
+
+            fields = self._rollup_fields(filters)
+            value = tuple(filters[field] for field in fields)
+            return self._describe(self._rollups[fields].get(value, _empty_totals()))
+
+    def rollup(self, *fields: str, **filters) -> Dict:
+        """
+        Get the totals of every value of a rollup, e.g. rollup('model')
+
+        Filters narrow it to one value of the other fields of a maintained
+        rollup, e.g. rollup('model', key_id=...) for one key's spend per model.
+        """
+        rollup_fields = self._rollup_fields(dict.fromkeys((*fields, *filters)))
+        with self._lock:
+            totals_by_value = {}
+            for value, totals in self._rollups[rollup_fields].items():
+                entry = dict(zip(rollup_fields, value))
+                if any(entry[field] != wanted for field, wanted in filters.items()):
+                    continue
+                group = tuple(entry[field] for field in fields)
+                totals_by_value[group[0] if len(group) == 1 else group] = self._describe(totals)
+            return totals_by_value
+
+    def _rollup_fields(self, filters: Dict) -> tuple:
+        for fields in ROLLUPS:
+            if set(fields) == set(filters):
+                return fields
+        raise ValueError(f"No usage rollup for fields: {', '.join(filters)}")
+
+    def _describe(self, totals: Dict) -> Dict:
+        calls = totals["calls"]
+        return {
+            "calls": calls,
+            "prompt_tokens": totals["prompt_tokens"],
+            "completion_tokens": totals["completion_tokens"],
+            "cached_tokens": totals["cached_tokens"],
+            "total_tokens": totals["prompt_tokens"] + totals["completion_tokens"],
+            "cost": round(totals["cost"], 4),
+            "average_latency": round(totals["latency"] / calls, 2) if calls else 0.0
+        }
+
+    def _add(self, entry: Dict):
+        for target in self._targets(entry):
+            for counter in COUNTERS:
+                target[counter] += 1 if counter == "calls" else entry[counter]
+
+    def _targets(self, entry: Dict):
+        yield self._totals
+        for fields, rollup in self._rollups.items():
+            value = tuple(entry[field] for field in fields)
+            if value not in rollup:
+                rollup[value] = _empty_totals()
+            yield rollup[value]
+
+    def _append(self, entry: Dict):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logging.warning(f"Usage ledger write failed: {str(e)}")
+
+    def _replay(self):
+        """Rebuild the rollups from the entries already on disk"""
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            if not os.path.exists(self.path):
+                return
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._add(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        # A torn last line from a crash should not lose the rest
+                        continue
+        except OSError as e:
+            logging.warning(f"Usage ledger disabled: {str(e)}")
+            self.path = None
+
+
+_usage_ledger = None
+_usage_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Get the process-wide usage ledger shared by all sessions"""
+    global _usage_ledger
+
+    with _usage_ledger_lock:
+        if _usage_ledger is None:
+            _usage_ledger = UsageLedger(PATHS['usage_ledger'])
+        return _usage_ledger
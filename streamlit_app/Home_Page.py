@@ -13,7 +13,15 @@ sys.path.insert(0, str(config_path))
 
 # Artık src olmadan import edebiliriz
 from utils.api_handler import APIHandler
-from settings import APP_CONFIG
+from utils.circuit_breaker import get_circuit_breaker_states
+from utils.client_registry import get_client_registry, key_id
+from utils.content_analyzer import get_analysis_memo
+from utils.hedging import get_hedge_stats
+from utils.key_validator import get_key_validator
+from utils.metrics import get_metrics
+from utils.prompt_cache import MIN_CACHEABLE_PROMPT_TOKENS, get_prompt_cache_stats
+from utils.usage_ledger import get_usage_ledger
+from settings import APP_CONFIG, GENERATION_SETTINGS
 import json
 from datetime import datetime
 
@@ -350,7 +358,12 @@ def load_history():
     try:
         if os.path.exists("data/history.json"):
             with open("data/history.json", "r", encoding="utf-8") as f:
-                return json.load(f)
+                history = json.load(f)
+            # Stored metrics spare the pages from analyzing old content again
+            memo = get_analysis_memo()
+            for item in history:
+                memo.prime(item.get('metrics_key'), item.get('metrics'))
+            return history
     except:
         pass
     return []
@@ -364,6 +377,103 @@ def save_history():
     except Exception as e:
         st.error(f"History kaydedilemedi: {str(e)}")
 
+def render_key_status(api_key):
+    """Show the cached validation status of a key, starting a background check if needed"""
+    validator = get_key_validator()
+    validator.validate_async(api_key)
+    key_status = validator.peek(api_key)
+    
+    if key_status is None:
+        poll_key_status(api_key)
+    elif key_status['valid']:
+        st.success("✅ API anahtarı doğrulandı!")
+    elif key_status['valid'] is False:
+        st.error("❌ API anahtarı geçersiz. Lütfen kontrol edin.")
+    else:
+        st.warning("⚠️ API anahtarı şu anda doğrulanamadı, birazdan tekrar denenecek.")
+    return key_status
+
+@st.fragment(run_every=1)
+def poll_key_status(api_key):
+    """Wait for the background key check without blocking the rest of the page"""
+    if get_key_validator().peek(api_key) is not None:
+        st.rerun()
+    st.info("🔄 API anahtarı doğrulanıyor...")
+
+def render_usage_stats(api_key):
+    """Show token usage and cost for an API key from the usage ledger"""
+    ledger = get_usage_ledger()
+    current_key = key_id(api_key)
+    today_usage = ledger.summary(key_id=current_key, day=datetime.now().strftime('%Y-%m-%d'))
+    total_usage = ledger.summary(key_id=current_key)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>${today_usage['cost']:.4f}</h3>
+            <p>Bugünkü Maliyet</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>{today_usage['total_tokens']:,}</h3>
+            <p>Bugünkü Token</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with st.expander("💰 Kullanım ve Maliyet", expanded=False):
+        st.markdown(f"""
+        - **Toplam istek:** {total_usage['calls']}
+        - **Toplam maliyet:** ${total_usage['cost']:.4f}
+        - **İstem / yanıt token:** {total_usage['prompt_tokens']:,} / {total_usage['completion_tokens']:,}
+        - **Önbellekten gelen istem token:** {total_usage['cached_tokens']:,}
+        - **Ortalama süre:** {total_usage['average_latency']}s
+        """)
+        
+        by_model = ledger.rollup("model", key_id=current_key)
+        if by_model:
+            st.markdown("**Modele göre:**")
+            for model_name, usage in by_model.items():
+                st.markdown(f"- {model_name}: {usage['calls']} istek · ${usage['cost']:.4f}")
+        
+        by_generator = ledger.rollup("generator", key_id=current_key)
+        if by_generator:
+            st.markdown("**Üreticiye göre:**")
+            for generator_name, usage in by_generator.items():
+                st.markdown(f"- {generator_name}: {usage['calls']} istek · ${usage['cost']:.4f}")
+
+def render_latency_metrics():
+    """Show p50/p95/p99 for every metric series and offer a Prometheus export"""
+    metrics = get_metrics()
+    snapshot = metrics.snapshot()
+    if not snapshot:
+        st.caption("Henüz ölçüm yok.")
+        return
+    
+    rows = []
+    for name, series in snapshot.items():
+        for summary in series:
+            rows.append({
+                "Metrik": name,
+                "Etiketler": ", ".join(f"{label}={value}" for label, value in summary['labels'].items()),
+                "Adet": summary['count'],
+                "p50 (s)": summary['p50'],
+                "p95 (s)": summary['p95'],
+                "p99 (s)": summary['p99']
+            })
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+    
+    metrics.export_prometheus()
+    st.download_button(
+        "📥 Prometheus formatında indir",
+        data=metrics.to_prometheus(),
+        file_name="metrics.prom",
+        mime="text/plain"
+    )
+
 def main():
     initialize_session_state()
     
@@ -393,15 +503,18 @@ def main():
                 placeholder="sk-..."
             )
             
+            model_choices = ["gpt-3.5-turbo", "gpt-4", "gpt-4-turbo-preview"]
+            
             if api_key:
                 st.session_state.api_key = api_key
-                # Validate API key
-                if len(api_key) > 20:
-                    st.success("✅ API anahtarı kaydedildi!")
+                # Validated in the background and shared by every session using this key
+                key_status = render_key_status(api_key)
+                if key_status and key_status['models']:
+                    model_choices = [m for m in model_choices if m in key_status['models']] or model_choices
                 
             model = st.selectbox(
                 "Model Seçimi",
-                ["gpt-3.5-turbo", "gpt-4", "gpt-4-turbo-preview"],
+                model_choices,
                 index=0,
                 help="Kullanmak istediğiniz AI modelini seçin"
             )
@@ -450,6 +563,66 @@ def main():
         <small style="color: rgba(255,255,255,0.7);">Günlük kullanım: {today_count}/{daily_limit}</small>
         """, unsafe_allow_html=True)
         
+        # Real spend for this API key from the usage ledger
+        if st.session_state.api_key:
+            render_usage_stats(st.session_state.api_key)
+        
+        # Shared connection pool usage across all sessions
+        with st.expander("🔌 Bağlantı Havuzu", expanded=False):
+            pool_stats = get_client_registry().stats()
+            st.markdown(f"""
+            - **İstekler:** {pool_stats['requests']}
+            - **Yeni bağlantı:** {pool_stats['new_connections']}
+            - **Yeniden kullanım oranı:** %{pool_stats['reuse_rate'] * 100:.0f}
+            - **Aktif generator:** {pool_stats['generators']} ({pool_stats['generator_hits']} tekrar kullanım)
+            """)
+        
+        # Per-model circuit breakers; an open breaker fails fast or reroutes
+        breaker_states = get_circuit_breaker_states()
+        any_open = any(state['state'] != 'closed' for state in breaker_states.values())
+        with st.expander("⚡ Model Durumu", expanded=any_open):
+            if not breaker_states:
+                st.caption("Henüz API çağrısı yapılmadı.")
+            state_labels = {
+                'closed': "🟢 Normal",
+                'half_open': "🟡 Deneniyor",
+                'open': "🔴 Devre dışı"
+            }
+            for model_name, state in breaker_states.items():
+                line = (f"**{model_name}:** {state_labels.get(state['state'], state['state'])} · "
+                        f"hata oranı %{state['failure_rate'] * 100:.0f} ({state['calls']} çağrı)")
+                if state['state'] == 'open':
+                    line += f" · {state['retry_after']:.0f}s sonra tekrar denenecek"
+                st.markdown(line)
+        
+        # Share of prompt tokens the provider served from its prompt cache, per template
+        with st.expander("🗂️ İstem Önbelleği", expanded=False):
+            prompt_cache = get_prompt_cache_stats().snapshot()
+            if not prompt_cache:
+                st.caption("Henüz şablonlu istek yok.")
+            for template, stats in prompt_cache.items():
+                st.markdown(
+                    f"**{template}:** token isabet oranı %{stats['token_hit_ratio'] * 100:.0f} · "
+                    f"istek isabet oranı %{stats['hit_rate'] * 100:.0f} "
+                    f"({stats['hits']}/{stats['requests']}, {stats['eligible_requests']} istek önbelleğe uygun)"
+                )
+            st.caption(f"Sağlayıcı yalnızca {MIN_CACHEABLE_PROMPT_TOKENS} token ve üzeri istemleri önbelleğe alır.")
+        
+        # Latency percentiles per path, exportable for Prometheus
+        with st.expander("⏱️ Performans Metrikleri", expanded=False):
+            render_latency_metrics()
+        
+        # Backup requests fired for slow first tokens
+        if GENERATION_SETTINGS['hedging_enabled']:
+            with st.expander("🛡️ Yedek İstekler (Hedging)", expanded=False):
+                hedge_stats = get_hedge_stats().snapshot()
+                st.markdown(f"""
+                - **Gecikme eşiği:** {GENERATION_SETTINGS['hedge_delay_seconds']}s
+                - **Yedek tetiklenme oranı:** %{hedge_stats['fire_rate'] * 100:.1f} ({hedge_stats['fired']}/{hedge_stats['requests']})
+                - **Yedeğin kazanma oranı:** %{hedge_stats['backup_win_rate'] * 100:.0f}
+                - **Ek maliyet:** ${hedge_stats['extra_cost']:.4f}
+                """)
+        
         # Clear History
         if st.button("🗑️ Geçmişi Temizle", type="secondary"):
             st.session_state.generation_history = []
@@ -554,6 +727,11 @@ def main():
                     st.markdown(f"**📊 Tür:** {item.get('type', 'N/A')}")
                     st.markdown(f"**🎯 Platform:** {item.get('platform', 'N/A')}")
                     st.markdown(f"**📝 Konu:** {item.get('topic', 'N/A')}")
+                    
+                    # Metrics were stored with the item, nothing is re-analyzed here
+                    item_metrics = item.get('metrics') or {}
+                    if 'word_count' in item_metrics:
+                        st.markdown(f"**💬 Kelime:** {item_metrics['word_count']}")
                 
                 with col2:
                     content_preview = item.get('content', '')
@@ -0,0 +1,18 @@
+import streamlit as st
+
+from utils.readability import atesman_level
+
+
+def render_readability_card(metrics: dict):
+    """Metric card for the Ateşman readability score and the Bezirci-Yılmaz grade level"""
+    score = metrics.get('readability_score', 0)
+    grade = metrics.get('readability_grade')
+    score_class = "good" if score >= 70 else "warning" if score >= 50 else "error"
+    grade_text = f" · {grade:.0f}. sınıf" if grade is not None else ""
+
+    st.markdown(f"""
+    <div class="metric-card">
+        <h3 class="{score_class}">{score:.0f}</h3>
+        <p>📖 {atesman_level(score)}{grade_text}</p>
+    </div>
+    """, unsafe_allow_html=True)
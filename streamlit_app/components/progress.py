@@ -0,0 +1,22 @@
+import contextlib
+import threading
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from utils.progress import ProgressHook
+
+
+class StreamlitProgressHook(ProgressHook):
+    """Show API progress as Streamlit spinners, also from generator worker threads"""
+
+    def __init__(self):
+        # Captured in the script thread so worker threads can render into the same page
+        self.ctx = get_script_run_ctx(suppress_warning=True)
+
+    def task(self, message: str):
+        if self.ctx is None:
+            return contextlib.nullcontext()
+        if get_script_run_ctx(suppress_warning=True) is None:
+            add_script_run_ctx(threading.current_thread(), self.ctx)
+        return st.spinner(message)
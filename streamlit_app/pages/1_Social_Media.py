@@ -11,9 +11,16 @@ current_dir = Path(__file__).parent
 project_root = current_dir.parent.parent
 src_path = project_root / "src"
 sys.path.insert(0, str(src_path))
+sys.path.insert(0, str(current_dir.parent))
 
-from utils.api_handler import APIHandler, ContentAnalyzer, PromptOptimizer
+from utils.api_handler import APIHandler, PromptOptimizer
+from utils.config import PLATFORM_CONFIG
+from utils.content_analyzer import ContentAnalyzer, IncrementalAnalyzer, analysis_key
 from generators.social_media_generator import SocialMediaGenerator
+from utils.client_registry import get_generator
+from utils.progress import set_progress_hook
+from components.content_display import render_readability_card
+from components.progress import StreamlitProgressHook
 
 st.set_page_config(
     page_title="Social Media Content Generator",
@@ -235,6 +242,18 @@ st.markdown("""
         color: white;
     }
     
+    .metric-card h3.warning {
+        color: #ffc107;
+    }
+    
+    .metric-card h3.error {
+        color: #dc3545;
+    }
+    
+    .metric-card h3.good {
+        color: #28a745;
+    }
+    
     .metric-card p {
         font-size: 0.9rem;
         margin: 0;
@@ -429,6 +448,8 @@ def save_to_history(content_data):
         'content': content_data.get('content', ''),
         'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'metrics': content_data.get('metrics', {}),
+        # Lets the analysis memo reuse the stored metrics after a reload
+        'metrics_key': content_data.get('metrics_key'),
         'settings': content_data.get('settings', {})
     }
     
@@ -438,6 +459,122 @@ def save_to_history(content_data):
     if len(st.session_state.generation_history) > 50:
         st.session_state.generation_history = st.session_state.generation_history[-50:]
 
+def render_char_limit(char_count, platform, platform_info):
+    """Show how the content length compares to the platform character limit"""
+    limit = PLATFORM_CONFIG.get(platform, {}).get('char_limit', 3000)
+    remaining = limit - char_count
+    
+    if char_count > limit:
+        limit_class = "danger"
+        limit_message = f"⚠️ İçerik {platform_info['name']} karakter limitini ({limit:,}) aşıyor! {char_count - limit} karakter fazla."
+    elif remaining < 50:
+        limit_class = "warning"
+        limit_message = f"⚡ Limit yaklaşıyor! {remaining} karakter kaldı."
+    else:
+        limit_class = "good"
+        limit_message = f"✅ İçerik uygun! {remaining:,} karakter kaldı."
+    
+    st.markdown(f'<div class="char-limit {limit_class}">{limit_message}</div>', unsafe_allow_html=True)
+
+def render_multi_platform_results(generator, platforms, platform_options, generation_params, bypass_cache):
+    """Generate one brief for several platforms in parallel and show them in tabs"""
+    with st.spinner(f"🔄 {len(platforms)} platform için içerikler paralel olarak oluşturuluyor..."):
+        result = generator.generate_multi_platform(
+            platforms=platforms,
+            **generation_params,
+            bypass_cache=bypass_cache
+        )
+    
+    if not result['success']:
+        st.error(f"❌ Hata: {result['error']}")
+        return
+    
+    st.success(f"✅ {result['succeeded']}/{len(platforms)} platform için içerik oluşturuldu!")
+    st.caption(
+        f"⏱️ Toplam: {result['generation_time']}s (en yavaş platform: {result['slowest_platform_time']}s) · "
+        f"🔢 {result['tokens_used']} token · "
+        f"💰 ${result['cost_estimate']:.4f}"
+    )
+    
+    tabs = st.tabs([f"{platform_options[platform]['icon']} {platform_options[platform]['name']}" for platform in platforms])
+    
+    for tab, platform in zip(tabs, platforms):
+        platform_info = platform_options[platform]
+        platform_result = result['results'][platform]
+        
+        with tab:
+            if not platform_result['success']:
+                st.error(f"❌ Hata: {platform_result['error']}")
+                continue
+            
+            content = platform_result['content']
+            
+            st.markdown("""
+            <div class="content-preview animate-in">
+                <div class="platform-preview-header">
+                    <span style="font-size: 2rem;">{}</span>
+                    <h4>{} Postu</h4>
+                    <span style="background: {}; color: white; padding: 0.3rem 0.8rem; border-radius: 15px; font-size: 0.8rem;">LIVE</span>
+                </div>
+                <div class="content-text">{}</div>
+            </div>
+            """.format(
+                platform_info['icon'],
+                platform_info['name'],
+                platform_info['color'],
+                content.replace('\n', '<br>')
+            ), unsafe_allow_html=True)
+            
+            metrics = ContentAnalyzer().analyze_content(content)
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <h3>{metrics.get('word_count', 0)}</h3>
+                    <p>💬 Kelime Sayısı</p>
+                </div>
+                """, unsafe_allow_html=True)
+            with col2:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <h3>{metrics.get('char_count', 0)}</h3>
+                    <p>📏 Karakter</p>
+                </div>
+                """, unsafe_allow_html=True)
+            with col3:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <h3>{metrics.get('hashtag_count', 0)}</h3>
+                    <p># Hashtag</p>
+                </div>
+                """, unsafe_allow_html=True)
+            with col4:
+                render_readability_card(metrics)
+            
+            render_char_limit(metrics.get('char_count', 0), platform, platform_info)
+            
+            st.download_button(
+                label="📥 TXT İndir",
+                data=content,
+                file_name=f"{platform}_post_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                mime="text/plain",
+                key=f"download_{platform}"
+            )
+            
+            save_to_history({
+                'platform': platform_info['name'],
+                'topic': generation_params['topic'],
+                'content': content,
+                'metrics': metrics,
+                'metrics_key': analysis_key(content),
+                'settings': {**generation_params, 'platform': platform}
+            })
+    
+    if st.button("🔄 Tümünü Yeniden Üret", key="regenerate_multi_btn"):
+        st.session_state.regenerate_requested = True
+        st.rerun()
+
 def main():
     # Header
     st.markdown("""
@@ -457,8 +594,12 @@ def main():
         """, unsafe_allow_html=True)
         st.stop()
     
-    # Initialize generator
-    generator = SocialMediaGenerator(
+    # Show API progress as spinners on this page
+    set_progress_hook(StreamlitProgressHook())
+    
+    # Initialize generator (shared across reruns and sessions for this key and model)
+    generator = get_generator(
+        SocialMediaGenerator,
         st.session_state.api_key,
         st.session_state.get('selected_model', 'gpt-3.5-turbo')
     )
@@ -481,13 +622,29 @@ def main():
     col1, col2, col3, col4 = st.columns(4)
     cols = [col1, col2, col3, col4]
     
-    selected_platform = st.selectbox(
-        "Platform seçin:",
-        list(platform_options.keys()),
-        format_func=lambda x: f"{platform_options[x]['icon']} {platform_options[x]['name']}",
-        key="platform_select"
+    multi_platform_mode = st.checkbox(
+        "🌐 Çoklu Platform Modu",
+        value=False,
+        help="Aynı brief ile seçilen tüm platformlar için içerikleri paralel olarak oluşturur"
     )
     
+    if multi_platform_mode:
+        selected_platforms = st.multiselect(
+            "Platformları seçin:",
+            list(platform_options.keys()),
+            default=list(platform_options.keys()),
+            format_func=lambda x: f"{platform_options[x]['icon']} {platform_options[x]['name']}",
+            key="platform_multiselect"
+        )
+        selected_platform = selected_platforms[0] if selected_platforms else "instagram"
+    else:
+        selected_platform = st.selectbox(
+            "Platform seçin:",
+            list(platform_options.keys()),
+            format_func=lambda x: f"{platform_options[x]['icon']} {platform_options[x]['name']}",
+            key="platform_select"
+        )
+    
     platform_info = platform_options[selected_platform]
     
     # Platform specific guidelines
@@ -649,37 +806,70 @@ def main():
                 value="Orta",
                 help="Platform limitlerini göz önünde bulundurarak içerik uzunluğu"
             )
+            
+            stream_output = st.checkbox(
+                "⚡ Canlı Yazım",
+                value=True,
+                help="İçerik üretilirken metni anlık olarak gösterir"
+            )
+            
+            unique_result = st.checkbox(
+                "🎲 Her Seferinde Yeni Sonuç",
+                value=False,
+                help="Aynı istek için önbellekteki veya eş zamanlı üretilen içeriği paylaşmak yerine her zaman yeni içerik üretir"
+            )
     
     # Generate Content Button
-    if st.button("🚀 İçerik Oluştur", type="primary", key="generate_btn"):
+    # "Yeniden Üret" reruns the page and asks for a fresh, uncached result
+    regenerate_requested = st.session_state.pop('regenerate_requested', False)
+    
+    # Prepare generation parameters
+    generation_params = {
+        'platform': selected_platform,
+        'topic': topic,
+        'target_audience': target_audience,
+        'tone': tone,
+        'post_type': post_type,
+        'include_hashtags': include_hashtags,
+        'include_emojis': include_emojis,
+        'include_cta': include_cta,
+        'custom_instructions': custom_instructions,
+        'creativity_level': creativity_level
+    }
+    
+    # Add brand voice to custom instructions
+    if brand_voice != "Standart":
+        brand_voice_instructions = {
+            "Lüks & Premium": "Lüks, elit ve premium bir marka sesi kullan",
+            "Genç & Modern": "Genç, modern ve trendy bir dil kullan", 
+            "Güvenilir & Klasik": "Güvenilir, klasik ve saygın bir ton kullan",
+            "İnovatif & Teknolojik": "İnovatif, teknolojik ve gelecek odaklı bir yaklaşım kullan"
+        }
+        generation_params['custom_instructions'] += f" {brand_voice_instructions.get(brand_voice, '')}"
+    
+    if multi_platform_mode:
+        if st.button("🚀 Tüm Platformlar İçin Oluştur", type="primary", key="generate_multi_btn") or regenerate_requested:
+            if not topic:
+                st.error("❌ Lütfen bir konu girin!")
+                return
+            if not selected_platforms:
+                st.error("❌ Lütfen en az bir platform seçin!")
+                return
+            
+            generation_params.pop('platform')
+            render_multi_platform_results(
+                generator,
+                selected_platforms,
+                platform_options,
+                generation_params,
+                bypass_cache=regenerate_requested or unique_result
+            )
+    
+    elif st.button("🚀 İçerik Oluştur", type="primary", key="generate_btn") or regenerate_requested:
         if not topic:
             st.error("❌ Lütfen bir konu girin!")
             return
         
-        # Prepare generation parameters
-        generation_params = {
-            'platform': selected_platform,
-            'topic': topic,
-            'target_audience': target_audience,
-            'tone': tone,
-            'post_type': post_type,
-            'include_hashtags': include_hashtags,
-            'include_emojis': include_emojis,
-            'include_cta': include_cta,
-            'custom_instructions': custom_instructions,
-            'creativity_level': creativity_level
-        }
-        
-        # Add brand voice to custom instructions
-        if brand_voice != "Standart":
-            brand_voice_instructions = {
-                "Lüks & Premium": "Lüks, elit ve premium bir marka sesi kullan",
-                "Genç & Modern": "Genç, modern ve trendy bir dil kullan", 
-                "Güvenilir & Klasik": "Güvenilir, klasik ve saygın bir ton kullan",
-                "İnovatif & Teknolojik": "İnovatif, teknolojik ve gelecek odaklı bir yaklaşım kullan"
-            }
-            generation_params['custom_instructions'] += f" {brand_voice_instructions.get(brand_voice, '')}"
-        
         # Generate content with progress
         progress_bar = st.progress(0)
         status_text = st.empty()
@@ -688,13 +878,49 @@ def main():
             status_text.text(f"🔄 {platform_info['icon']} {platform_info['name']} için içerik oluşturuluyor...")
             progress_bar.progress(25)
             
-            result = generator.generate_post(**generation_params)
+            if stream_output:
+                stream = generator.stream_post(
+                    **generation_params,
+                    bypass_cache=regenerate_requested or unique_result
+                )
+                live_preview = st.empty()
+                live_stats = st.empty()
+                live_analyzer = IncrementalAnalyzer()
+                streamed_text = ""
+                for delta in stream:
+                    streamed_text += delta
+                    live_metrics = live_analyzer.append(delta)
+                    live_preview.markdown(streamed_text)
+                    with live_stats.container():
+                        st.caption(
+                            f"💬 {live_metrics['word_count']} kelime · "
+                            f"📏 {live_metrics['char_count']} karakter · "
+                            f"# {live_metrics['hashtag_count']} hashtag"
+                        )
+                        render_char_limit(live_metrics['char_count'], selected_platform, platform_info)
+                live_preview.empty()
+                live_stats.empty()
+                result = stream.result
+            else:
+                result = generator.generate_post(
+                    **generation_params,
+                    bypass_cache=regenerate_requested or unique_result
+                )
             progress_bar.progress(75)
             
             if result['success']:
                 progress_bar.progress(100)
                 status_text.text("✅ İçerik başarıyla oluşturuldu!")
                 
+                if result.get('cache_hit'):
+                    st.caption("♻️ Aynı istek için önbellekteki içerik kullanıldı. Yeni bir versiyon için 🔄 Yeniden Üret'e tıklayın.")
+                elif result.get('streamed'):
+                    st.caption(
+                        f"⚡ İlk token: {result['time_to_first_token']}s · "
+                        f"{result['tokens_per_second']} token/sn · "
+                        f"Toplam: {result['generation_time']}s"
+                    )
+                
                 content = result['content']
                 
                 # Display generated content with beautiful styling
@@ -721,7 +947,7 @@ def main():
                 # Display metrics with beautiful cards
                 st.markdown("## 📊 İçerik Analizi ve Performans Tahmini")
                 
-                col1, col2, col3, col4, col5 = st.columns(5)
+                col1, col2, col3, col4, col5, col6 = st.columns(6)
                 
                 with col1:
                     st.markdown(f"""
@@ -757,6 +983,9 @@ def main():
                     """, unsafe_allow_html=True)
                 
                 with col5:
+                    render_readability_card(metrics)
+                
+                with col6:
                     sentiment = metrics.get('sentiment_polarity', 0)
                     if sentiment > 0.3:
                         sentiment_score, sentiment_emoji = "Pozitif", "😊"
@@ -773,28 +1002,7 @@ def main():
                     """, unsafe_allow_html=True)
                 
                 # Platform specific feedback
-                char_count = metrics.get('char_count', 0)
-                platform_limits = {
-                    'twitter': 280,
-                    'instagram': 2200,
-                    'linkedin': 3000,
-                    'facebook': 63206
-                }
-                
-                limit = platform_limits.get(selected_platform, 3000)
-                remaining = limit - char_count
-                
-                if char_count > limit:
-                    limit_class = "danger"
-                    limit_message = f"⚠️ İçerik {platform_info['name']} karakter limitini ({limit:,}) aşıyor! {char_count - limit} karakter fazla."
-                elif remaining < 50:
-                    limit_class = "warning"
-                    limit_message = f"⚡ Limit yaklaşıyor! {remaining} karakter kaldı."
-                else:
-                    limit_class = "good"
-                    limit_message = f"✅ İçerik uygun! {remaining:,} karakter kaldı."
-                
-                st.markdown(f'<div class="char-limit {limit_class}">{limit_message}</div>', unsafe_allow_html=True)
+                render_char_limit(metrics.get('char_count', 0), selected_platform, platform_info)
                 
                 # Action buttons with modern styling
                 st.markdown('<div class="action-buttons">', unsafe_allow_html=True)
@@ -833,6 +1041,7 @@ def main():
                 
                 with col4:
                     if st.button("🔄 Yeniden Üret", key="regenerate_btn"):
+                        st.session_state.regenerate_requested = True
                         st.rerun()
                 
                 with col5:
@@ -847,6 +1056,7 @@ def main():
                     'topic': topic,
                     'content': content,
                     'metrics': metrics,
+                    'metrics_key': analysis_key(content),
                     'settings': generation_params
                 }
                 save_to_history(content_data)
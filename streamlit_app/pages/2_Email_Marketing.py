@@ -10,9 +10,15 @@ current_dir = Path(__file__).parent
 project_root = current_dir.parent.parent
 src_path = project_root / "src"
 sys.path.insert(0, str(src_path))
+sys.path.insert(0, str(current_dir.parent))
 
-from utils.api_handler import APIHandler, ContentAnalyzer
+from utils.api_handler import APIHandler
+from utils.content_analyzer import ContentAnalyzer, IncrementalAnalyzer, analysis_key
 from generators.email_generator import EmailGenerator
+from utils.client_registry import get_generator
+from utils.progress import set_progress_hook
+from components.content_display import render_readability_card
+from components.progress import StreamlitProgressHook
 
 st.set_page_config(
     page_title="Email Marketing Generator",
@@ -561,6 +567,8 @@ def save_to_history(content_data):
         'content': content_data.get('content', ''),
         'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'metrics': content_data.get('metrics', {}),
+        # Lets the analysis memo reuse the stored metrics after a reload
+        'metrics_key': content_data.get('metrics_key'),
         'settings': content_data.get('settings', {})
     }
     
@@ -589,8 +597,12 @@ def main():
         """, unsafe_allow_html=True)
         st.stop()
     
-    # Initialize generator
-    generator = EmailGenerator(
+    # Show API progress as spinners on this page
+    set_progress_hook(StreamlitProgressHook())
+    
+    # Initialize generator (shared across reruns and sessions for this key and model)
+    generator = get_generator(
+        EmailGenerator,
         st.session_state.api_key,
         st.session_state.get('selected_model', 'gpt-3.5-turbo')
     )
@@ -827,9 +839,24 @@ def main():
                 height=80,
                 help="AI'ya verilecek özel yönergeler ve istekler"
             )
+            
+            stream_output = st.checkbox(
+                "⚡ Canlı Yazım",
+                value=True,
+                help="Email metnini üretilirken anlık olarak gösterir"
+            )
+            
+            unique_result = st.checkbox(
+                "🎲 Her Seferinde Yeni Sonuç",
+                value=False,
+                help="Aynı istek için önbellekteki veya eş zamanlı üretilen içeriği paylaşmak yerine her zaman yeni içerik üretir"
+            )
     
     # Generate Email Button
-    if st.button("📧 Email Kampanyası Oluştur", type="primary", key="generate_email_btn"):
+    # "Yeniden Üret" reruns the page and asks for a fresh, uncached result
+    regenerate_requested = st.session_state.pop('regenerate_requested', False)
+    
+    if st.button("📧 Email Kampanyası Oluştur", type="primary", key="generate_email_btn") or regenerate_requested:
         if not main_topic:
             st.error("❌ Lütfen ana konu girin!")
             return
@@ -891,12 +918,46 @@ def main():
             status_text.text(f"🔄 {email_info['name']} oluşturuluyor...")
             progress_bar.progress(25)
             
-            result = generator.generate_email(**generation_params)
+            if stream_output:
+                stream = generator.stream_email(
+                    **generation_params,
+                    bypass_cache=regenerate_requested or unique_result
+                )
+                live_preview = st.empty()
+                live_stats = st.empty()
+                live_analyzer = IncrementalAnalyzer()
+                streamed_text = ""
+                for delta in stream:
+                    streamed_text += delta
+                    live_metrics = live_analyzer.append(delta)
+                    live_preview.markdown(streamed_text)
+                    live_stats.caption(
+                        f"💬 {live_metrics['word_count']} kelime · "
+                        f"📏 {live_metrics['char_count']} karakter · "
+                        f"📝 {live_metrics['sentence_count']} cümle"
+                    )
+                live_preview.empty()
+                live_stats.empty()
+                result = stream.result
+            else:
+                result = generator.generate_email(
+                    **generation_params,
+                    bypass_cache=regenerate_requested or unique_result
+                )
             progress_bar.progress(100)
             
             if result['success']:
                 status_text.text("✅ Email başarıyla oluşturuldu!")
                 
+                if result.get('cache_hit'):
+                    st.caption("♻️ Aynı istek için önbellekteki içerik kullanıldı. Yeni bir versiyon için 🔄 Yeniden Üret'e tıklayın.")
+                elif result.get('streamed'):
+                    st.caption(
+                        f"⚡ İlk token: {result['time_to_first_token']}s · "
+                        f"{result['tokens_per_second']} token/sn · "
+                        f"Toplam: {result['generation_time']}s"
+                    )
+                
                 # Update final progress
                 st.markdown("""
                 <div class="progress-steps">
@@ -956,7 +1017,7 @@ def main():
                 # Display metrics with beautiful cards
                 st.markdown("## 📊 Email Analizi ve Performans Tahmini")
                 
-                col1, col2, col3, col4, col5 = st.columns(5)
+                col1, col2, col3, col4, col5, col6 = st.columns(6)
                 
                 with col1:
                     word_count = metrics.get('word_count', 0)
@@ -1007,6 +1068,9 @@ def main():
                     """, unsafe_allow_html=True)
                 
                 with col5:
+                    render_readability_card(metrics)
+                
+                with col6:
                     sentiment = metrics.get('sentiment_polarity', 0)
                     if sentiment > 0.3:
                         sentiment_score, sentiment_emoji = "Pozitif", "😊"
@@ -1138,6 +1202,7 @@ AI Model: {st.session_state.get('selected_model', 'gpt-3.5-turbo')}
                 
                 with col4:
                     if st.button("🔄 Yeniden Üret", key="regenerate_email_btn"):
+                        st.session_state.regenerate_requested = True
                         st.rerun()
                 
                 with col5:
@@ -1152,6 +1217,7 @@ AI Model: {st.session_state.get('selected_model', 'gpt-3.5-turbo')}
                     'subject': email_data.get('subject', ''),
                     'content': email_data.get('content', ''),
                     'metrics': metrics,
+                    'metrics_key': analysis_key(content_for_analysis),
                     'settings': generation_params
                 }
                 save_to_history(content_data)
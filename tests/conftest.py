@@ -0,0 +1,93 @@
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import openai
+import pytest
+
+SRC_PATH = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from utils import circuit_breaker, rate_limiter, response_cache, usage_ledger  # noqa: E402
+
+
+class TrackedStream(httpx.SyncByteStream):
+    """Response body that remembers whether the client closed it"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.closed = False
+
+    def __iter__(self):
+        # One SSE event per chunk so the client can stop after the first delta
+        for event in self.body.split(b"\n\n"):
+            if event:
+                yield event + b"\n\n"
+
+    def close(self):
+        self.closed = True
+
+
+def chat_completion(content: str, model="gpt-4") -> dict:
+    """Non-streamed chat completion response body"""
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    }
+
+
+def completion_chunk(delta=None, finish_reason=None, usage=None, model="gpt-4"):
+    choices = [] if usage else [{
+        "index": 0,
+        "delta": {"content": delta} if delta else {},
+        "finish_reason": finish_reason
+    }]
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": model,
+        "choices": choices,
+        "usage": usage
+    }
+
+
+def sse_body(parts, model="gpt-4") -> bytes:
+    """Chat completion stream for the given deltas, ending with usage"""
+    chunks = [completion_chunk(part, model=model) for part in parts]
+    chunks.append(completion_chunk(finish_reason="stop", model=model))
+    chunks.append(completion_chunk(usage={"prompt_tokens": 10, "completion_tokens": len(parts), "total_tokens": 10 + len(parts)}, model=model))
+    events = [f"data: {json.dumps(chunk)}" for chunk in chunks] + ["data: [DONE]"]
+    return ("\n\n".join(events) + "\n\n").encode()
+
+
+def mock_openai_client(handler) -> openai.OpenAI:
+    """OpenAI client whose requests are answered by handler(request) -> httpx.Response"""
+    return openai.OpenAI(
+        api_key="sk-test",
+        max_retries=0,
+        http_client=httpx.Client(transport=httpx.MockTransport(handler))
+    )
+
+
+@pytest.fixture
+def rate_limiters(monkeypatch) -> dict:
+    """Empty rate limiter registry, restored after the test"""
+    limiters = {}
+    monkeypatch.setattr(rate_limiter, "_rate_limiters", limiters)
+    return limiters
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch, rate_limiters):
+    """Run every test in its own data directory with fresh breakers, limiters, cache and an in-memory ledger"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    monkeypatch.setattr(response_cache, "_response_cache", None)
+    monkeypatch.setattr(usage_ledger, "_usage_ledger", usage_ledger.UsageLedger())
@@ -0,0 +1,135 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from generators.email_generator import EmailGenerator
+from generators.social_media_generator import SocialMediaGenerator
+from utils.batch_runner import BatchRunner, LocalBatchRunner, OpenAIBatchRunner, read_batch_output
+
+
+def success_line(custom_id: str, content: str) -> dict:
+    return {
+        "custom_id": custom_id,
+        "response": {
+            "status_code": 200,
+            "body": {
+                "choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150}
+            }
+        },
+        "error": None
+    }
+
+
+def error_line(custom_id: str, message: str) -> dict:
+    return {
+        "custom_id": custom_id,
+        "response": {"status_code": 400, "body": {"error": {"message": message}}},
+        "error": None
+    }
+
+
+def write_jsonl(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    return str(path)
+
+
+def test_post_ingest_reports_error_and_missing_lines(tmp_path):
+    generator = SocialMediaGenerator("sk-test")
+    input_path = str(tmp_path / "posts.jsonl")
+    generator.export_post_batch(
+        [{"platform": "instagram", "topic": topic} for topic in ("kahve", "çay", "kakao")],
+        input_path
+    )
+    output_path = write_jsonl(tmp_path / "out.jsonl", [
+        success_line("post-1", "Yeni kahvelerimiz geldi!"),
+        error_line("post-2", "Invalid request")
+    ])
+
+    summary = generator.ingest_post_batch(output_path, input_path)
+
+    assert summary["succeeded"] == 1
+    assert summary["failed"] == 2
+    assert summary["results"]["post-1"]["success"]
+    assert summary["results"]["post-2"]["error"] == "Invalid request"
+    assert "post-3" in summary["results"]["post-3"]["error"]
+    assert summary["results"]["post-3"]["error_type"] == "batch"
+
+
+def test_email_ingest_reports_missing_body(tmp_path):
+    generator = EmailGenerator("sk-test")
+    input_path = str(tmp_path / "emails.jsonl")
+    generator.export_email_batch(
+        [{"email_type": "newsletter", "company_name": "Kahveci", "main_topic": "Yeni sezon"}],
+        input_path
+    )
+    output_path = write_jsonl(tmp_path / "out.jsonl", [success_line("email-1:subject", "Yeni sezon başladı")])
+
+    summary = generator.ingest_email_batch(output_path, input_path)
+
+    assert summary["failed"] == 1
+    assert "email-1:body" in summary["results"]["email-1"]["error"]
+
+
+def test_read_batch_output_handles_line_errors(tmp_path):
+    path = write_jsonl(tmp_path / "out.jsonl", [
+        success_line("a", "ok"),
+        error_line("b", "bad"),
+        {"custom_id": "c", "response": None, "error": {"code": "expired", "message": "Batch expired"}}
+    ])
+
+    outputs = read_batch_output(path)
+
+    assert outputs["a"]["content"] == "ok"
+    assert outputs["b"] == {"error": "bad"}
+    assert outputs["c"] == {"error": "Batch expired"}
+
+
+class FakeBatchClient:
+    """Just enough of the OpenAI client for OpenAIBatchRunner.download"""
+
+    def __init__(self, output_file_id, error_file_id, files):
+        batch = SimpleNamespace(output_file_id=output_file_id, error_file_id=error_file_id)
+        self.batches = SimpleNamespace(retrieve=lambda batch_id: batch)
+        self.files = SimpleNamespace(content=lambda file_id: SimpleNamespace(read=lambda: files[file_id]))
+
+
+@pytest.mark.parametrize("output_file_id, error_file_id, expected", [
+    ("file-out", "file-err", {"a", "b"}),
+    (None, "file-err", {"b"}),
+    ("file-out", None, {"a"}),
+    (None, None, set())
+])
+def test_download_merges_output_and_error_files(tmp_path, output_file_id, error_file_id, expected):
+    files = {
+        # The output file lacks a trailing newline to check the files are not glued together
+        "file-out": json.dumps(success_line("a", "ok")).encode(),
+        "file-err": (json.dumps(error_line("b", "bad")) + "\n").encode()
+    }
+    runner = OpenAIBatchRunner(FakeBatchClient(output_file_id, error_file_id, files))
+
+    path = runner.download("batch_1", str(tmp_path / "out.jsonl"))
+
+    assert set(read_batch_output(path)) == expected
+
+
+def test_batch_runner_is_abstract():
+    with pytest.raises(TypeError):
+        BatchRunner()
+
+
+def test_local_runner_round_trip(tmp_path):
+    generator = SocialMediaGenerator("sk-test")
+    input_path = str(tmp_path / "posts.jsonl")
+    generator.export_post_batch([{"platform": "twitter", "topic": "kahve"}], input_path)
+
+    run = LocalBatchRunner(batch_dir=str(tmp_path / "batches")).run(
+        input_path, str(tmp_path / "out.jsonl"), poll_interval=0
+    )
+    summary = generator.ingest_post_batch(run["output_path"], input_path)
+
+    assert run["status"] == "completed"
+    assert summary["succeeded"] == 1
@@ -0,0 +1,188 @@
+import time
+
+import httpx
+import openai
+import pytest
+
+from conftest import TrackedStream, mock_openai_client, sse_body
+from utils.api_handler import APIHandler
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, get_circuit_breaker
+
+
+def make_breaker(**overrides) -> CircuitBreaker:
+    settings = {"window_seconds": 60, "min_calls": 4, "failure_rate_threshold": 0.5, "open_seconds": 30}
+    settings.update(overrides)
+    return CircuitBreaker(**settings)
+
+
+def open_breaker(breaker: CircuitBreaker):
+    """Trip the breaker and let its open period run out"""
+    for _ in range(breaker.min_calls):
+        breaker.record(breaker.allow(), 0.1, failed=True)
+    assert breaker.snapshot()["state"] == OPEN
+    breaker._opened_at -= breaker.open_seconds
+
+
+def test_trips_on_failure_rate():
+    breaker = make_breaker()
+    for failed in (False, True, False, True):
+        breaker.record(breaker.allow(), 0.1, failed=failed)
+
+    assert breaker.snapshot()["state"] == OPEN
+    assert not breaker.allow()
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_stays_closed_below_min_calls():
+    breaker = make_breaker()
+    for _ in range(breaker.min_calls - 1):
+        breaker.record(breaker.allow(), 0.1, failed=True)
+
+    assert breaker.snapshot()["state"] == CLOSED
+
+
+def test_slow_calls_trip():
+    breaker = make_breaker(slow_call_seconds=5, slow_call_rate_threshold=0.75)
+    for latency in (6, 6, 6, 0.1):
+        breaker.record(breaker.allow(), latency)
+
+    assert breaker.snapshot()["state"] == OPEN
+
+
+def test_half_open_probe_success_closes():
+    breaker = make_breaker(half_open_max_calls=1)
+    open_breaker(breaker)
+
+    probe = breaker.allow()
+    assert probe
+    assert not breaker.allow()  # Only one probe at a time
+    breaker.record(probe, 0.1)
+
+    assert breaker.snapshot()["state"] == CLOSED
+    assert breaker.allow()
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = make_breaker()
+    open_breaker(breaker)
+
+    breaker.record(breaker.allow(), 0.1, failed=True)
+
+    assert breaker.snapshot()["state"] == OPEN
+    assert breaker.snapshot()["trips"] == 2
+
+
+def test_late_success_does_not_close_half_open():
+    breaker = make_breaker()
+    late_call = breaker.allow()
+    open_breaker(breaker)
+    probe = breaker.allow()
+
+    # A slow call admitted before the breaker opened finishes first
+    breaker.record(late_call, 0.1)
+    assert breaker.snapshot()["state"] == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record(probe, 0.1)
+    assert breaker.snapshot()["state"] == CLOSED
+
+
+def test_late_failure_does_not_count_after_recovery():
+    breaker = make_breaker(min_calls=1)
+    late_call = breaker.allow()
+    open_breaker(breaker)
+    breaker.record(breaker.allow(), 0.1)
+
+    breaker.record(late_call, 0.1, failed=True)
+
+    assert breaker.snapshot()["state"] == CLOSED
+    assert breaker.snapshot()["calls"] == 0
+
+
+def test_released_probe_is_given_back():
+    breaker = make_breaker()
+    open_breaker(breaker)
+
+    breaker.release(breaker.allow())
+
+    assert breaker.allow()
+
+
+def test_leaked_probe_times_out():
+    breaker = make_breaker(probe_timeout_seconds=60)
+    open_breaker(breaker)
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    # No outcome is ever recorded for the probe
+    breaker._probe_started_at -= 60
+    assert not breaker.allow()
+    assert breaker._state == OPEN
+
+    breaker._opened_at -= breaker.open_seconds
+    assert breaker.allow()
+
+
+def test_abandoned_stream_releases_probe_and_reservation():
+    body = TrackedStream(sse_body(["Merhaba", " dünya", "!"]))
+    handler = APIHandler("sk-test", model="gpt-4")
+    handler.client = mock_openai_client(
+        lambda request: httpx.Response(200, stream=body, headers={"content-type": "text/event-stream"})
+    )
+    limiter = handler.rate_limiter
+    available_tokens = limiter.stats()["available_tokens"]
+
+    breaker = get_circuit_breaker("gpt-4")
+    open_breaker(breaker)
+
+    stream = iter(handler.stream_content("Test", max_tokens=50, bypass_cache=True))
+    assert next(stream) == "Merhaba"
+    assert breaker._state == HALF_OPEN
+    stream.close()  # The page dropped the stream after the first chunk
+
+    assert body.closed
+    assert breaker._probes == 0
+    assert breaker.allow()
+    # The reservation was handed back (within the refill that happened meanwhile)
+    assert limiter.stats()["available_tokens"] >= available_tokens - 1
+
+
+def test_interrupted_call_releases_probe():
+    class Interrupted(BaseException):
+        """Stands in for Streamlit's RerunException"""
+
+    def interrupt(request):
+        raise Interrupted()
+
+    handler = APIHandler("sk-test", model="gpt-4")
+    handler.client = mock_openai_client(interrupt)
+    breaker = get_circuit_breaker("gpt-4")
+    open_breaker(breaker)
+
+    with pytest.raises(Interrupted):
+        handler.generate_content("Test", max_tokens=50, bypass_cache=True)
+
+    assert breaker._probes == 0
+    assert breaker.allow()
+
+
+def test_upstream_errors_count_as_failures():
+    def server_error(request):
+        return httpx.Response(500, json={"error": {"message": "boom"}})
+
+    handler = APIHandler("sk-test", model="gpt-4")
+    handler.client = mock_openai_client(server_error)
+    handler.retry_policy.max_retries = 0
+
+    result = handler.generate_content("Test", max_tokens=50, bypass_cache=True)
+
+    assert not result["success"]
+    assert get_circuit_breaker("gpt-4").snapshot()["failure_rate"] == 1.0
+
+
+def test_client_errors_do_not_count():
+    error = openai.AuthenticationError("bad key", response=httpx.Response(401, request=httpx.Request("POST", "https://x")), body=None)
+    handler = APIHandler("sk-test", model="gpt-4")
+    handler._record_outcome(get_circuit_breaker("gpt-4").allow(), time.time(), error)
+
+    assert get_circuit_breaker("gpt-4").snapshot()["failure_rate"] == 0.0
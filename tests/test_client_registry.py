@@ -0,0 +1,71 @@
+import asyncio
+
+import httpx
+
+from conftest import chat_completion
+from utils.api_handler import AsyncAPIHandler
+from utils.client_registry import ClientRegistry, get_client_registry, key_id
+
+
+def test_key_id_is_stable_and_hides_the_key():
+    assert key_id("sk-a") == key_id("sk-a")
+    assert key_id("sk-a") != key_id("sk-b")
+    assert "sk-a" not in key_id("sk-a")
+
+
+def test_generators_are_reused_per_key_and_model():
+    class Generator:
+        def __init__(self, api_key, model):
+            self.model = model
+
+    registry = ClientRegistry()
+
+    first = registry.get_generator(Generator, "sk-a", "gpt-4")
+
+    assert registry.get_generator(Generator, "sk-a", "gpt-4") is first
+    assert registry.get_generator(Generator, "sk-b", "gpt-4") is not first
+    assert registry.stats()["generator_hits"] == 1
+
+
+def test_async_clients_share_one_pool_per_event_loop():
+    registry = ClientRegistry()
+
+    async def clients():
+        return (
+            registry.get_async_openai_client("sk-a"),
+            registry.get_async_openai_client("sk-a"),
+            registry.get_async_openai_client("sk-b")
+        )
+
+    first, same, other_key = asyncio.run(clients())
+    other_loop, _, _ = asyncio.run(clients())
+
+    assert first is same
+    assert first is not other_key
+    assert first._client is other_key._client
+    # Connections cannot cross event loops
+    assert other_loop is not first
+    assert other_loop._client is not first._client
+
+
+def test_async_handler_uses_the_registry_pool(monkeypatch):
+    requests = []
+
+    def respond(request):
+        requests.append(request)
+        return httpx.Response(200, json=chat_completion("Merhaba"))
+
+    registry = get_client_registry()
+    monkeypatch.setattr(
+        registry,
+        "get_async_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(respond))
+    )
+
+    handler = AsyncAPIHandler("sk-registry", model="gpt-4")
+    results = handler.gather_generate([
+        {"prompt": f"Test {index}", "max_tokens": 20, "bypass_cache": True} for index in range(3)
+    ])
+
+    assert [result["content"] for result in results] == ["Merhaba"] * 3
+    assert len(requests) == 3
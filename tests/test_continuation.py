@@ -0,0 +1,53 @@
+import httpx
+
+from conftest import chat_completion, mock_openai_client
+from utils.api_handler import APIHandler, AsyncAPIHandler
+from utils.client_registry import get_client_registry
+
+
+def truncated_then_done(parts):
+    """Answer each call with the next part, cut off at max_tokens until the last one"""
+    calls = []
+
+    def respond(request):
+        calls.append(request)
+        body = chat_completion(parts[len(calls) - 1])
+        if len(calls) < len(parts):
+            body["choices"][0]["finish_reason"] = "length"
+        return httpx.Response(200, json=body)
+
+    return respond
+
+
+def assert_continued(result):
+    assert result["content"] == "Bir, iki, üç."
+    assert result["continuation_rounds"] == 2
+    assert len(result["continuation_attempts"]) == 2
+    # Continuation calls are not retries
+    assert result["retry_count"] == 0
+    assert len(result["attempts"]) == 1
+
+
+def test_continuation_rounds_are_not_retries():
+    handler = APIHandler("sk-test", model="gpt-4")
+    handler.client = mock_openai_client(truncated_then_done(["Bir, ", "iki, ", "üç."]))
+
+    result = handler.generate_content("Say", max_tokens=50, bypass_cache=True, max_continuations=3)
+
+    assert_continued(result)
+
+
+def test_async_continuation_rounds_are_not_retries(monkeypatch):
+    respond = truncated_then_done(["Bir, ", "iki, ", "üç."])
+    monkeypatch.setattr(
+        get_client_registry(),
+        "get_async_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(respond))
+    )
+    handler = AsyncAPIHandler("sk-test", model="gpt-4")
+
+    [result] = handler.gather_generate([
+        {"prompt": "Say", "max_tokens": 50, "bypass_cache": True, "max_continuations": 3}
+    ])
+
+    assert_continued(result)
@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+
+import httpx
+
+from conftest import mock_openai_client, sse_body
+from utils.api_handler import APIHandler
+from utils.config import GENERATION_SETTINGS
+from utils.rate_limiter import RateLimiter, get_rate_limiter
+from utils.usage_ledger import get_usage_ledger
+
+
+class StalledStream(httpx.SyncByteStream):
+    """Response body that never sends a chunk until the client closes it"""
+
+    def __init__(self):
+        self.closed_at = None
+        self._closed = threading.Event()
+
+    def __iter__(self):
+        self._closed.wait(10)
+        return iter(())
+
+    def close(self):
+        if self.closed_at is None:
+            self.closed_at = time.time()
+        self._closed.set()
+
+
+def hedged_handler(monkeypatch, stalled: StalledStream, requests=None) -> APIHandler:
+    """Handler whose gpt-4 primary stalls and whose gpt-3.5-turbo backup answers"""
+    monkeypatch.setitem(GENERATION_SETTINGS, "hedge_delay_seconds", 0.1)
+    monkeypatch.setitem(GENERATION_SETTINGS, "hedge_backup", "fallback")
+    monkeypatch.setitem(GENERATION_SETTINGS, "hedge_fallback_model", "gpt-3.5-turbo")
+
+    def respond(request):
+        model = json.loads(request.content)["model"]
+        if requests is not None:
+            requests.append(model)
+        body = stalled if model == "gpt-4" else httpx.ByteStream(sse_body(["Merhaba", " dünya"], model=model))
+        return httpx.Response(200, stream=body, headers={"content-type": "text/event-stream"})
+
+    handler = APIHandler("sk-test", model="gpt-4")
+    handler.client = mock_openai_client(respond)
+    handler.hedging = True
+    return handler
+
+
+def track_reconciles(monkeypatch, limiter: RateLimiter) -> list:
+    reconciled = []
+    reconcile = limiter.reconcile
+
+    def tracked(reservation, actual_tokens):
+        if not reservation.reconciled:
+            reconciled.append(actual_tokens)
+        reconcile(reservation, actual_tokens)
+
+    monkeypatch.setattr(limiter, "reconcile", tracked)
+    return reconciled
+
+
+def test_stalled_primary_is_closed_when_the_backup_wins(monkeypatch):
+    stalled = StalledStream()
+    handler = hedged_handler(monkeypatch, stalled)
+
+    result = handler.generate_content("Test", max_tokens=50, bypass_cache=True)
+    finished_at = time.time()
+
+    assert result["success"]
+    assert result["hedge_winner"] == "backup"
+    assert result["content"] == "Merhaba dünya"
+    # Closed when the backup won, not when the stalled stream would next have spoken
+    assert stalled.closed_at is not None
+    assert stalled.closed_at <= finished_at
+
+
+def test_cancelled_attempt_is_billed_as_an_estimate(monkeypatch):
+    entries = []
+    ledger = get_usage_ledger()
+    record = ledger.record
+    monkeypatch.setattr(ledger, "record", lambda **entry: entries.append(record(**entry)))
+
+    handler = hedged_handler(monkeypatch, StalledStream())
+    primary_reconciles = track_reconciles(monkeypatch, handler.rate_limiter)
+    backup_limiter = get_rate_limiter("sk-test", "gpt-3.5-turbo")
+    backup_reconciles = track_reconciles(monkeypatch, backup_limiter)
+    admitted = backup_limiter.stats()["admitted"]
+
+    result = handler.generate_content("Test", max_tokens=50, bypass_cache=True)
+
+    assert [(entry["model"], entry["estimated"]) for entry in entries] == [
+        ("gpt-4", True),
+        ("gpt-3.5-turbo", False)
+    ]
+    assert result["hedge_extra_cost"] == entries[0]["cost"]
+    # The backup was admitted on its own model's budget; each reservation is settled with its own usage
+    assert backup_limiter.stats()["admitted"] == admitted + 1
+    assert backup_reconciles == [result["tokens_used"]]
+    assert primary_reconciles == [entries[0]["prompt_tokens"] + entries[0]["completion_tokens"]]
+
+
+def test_no_backup_without_rate_limit_budget(monkeypatch):
+    stalled = StalledStream()
+    requests = []
+    handler = hedged_handler(monkeypatch, stalled, requests)
+    handler.retry_policy.deadline_seconds = 0.5
+    # In debt for a few seconds, so a backup would have to queue
+    get_rate_limiter("sk-test", "gpt-3.5-turbo").requests.tokens = -200
+
+    result = handler.generate_content("Test", max_tokens=50, bypass_cache=True)
+
+    assert result["error_type"] == "timeout"
+    assert requests == ["gpt-4"]
+    assert stalled.closed_at is not None
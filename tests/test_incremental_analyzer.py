@@ -0,0 +1,56 @@
+import math
+import random
+
+import pytest
+
+from utils.content_analyzer import ContentAnalyzer, IncrementalAnalyzer
+
+TEXTS = [
+    "Yeni sezon kahvelerimiz geldi! Etiyopya ve Kolombiya çekirdekleri 3.5 kg'lık paketlerde. #kahve @kahveci",
+    "Merhaba dünya.\nBugün Dr. Yılmaz ile sürdürülebilirlik üzerine konuştuk... Sizce neler değişmeli?",
+    "Kısa bir not",
+    "  Başta ve sonda boşluk var.  \n\n#çay #demleme  ",
+    "Kampanya 15.10.2026 tarihinde başlıyor!!! Kaçırmayın :) @tumtakipciler"
+]
+
+COMPARED = ("word_count", "char_count", "sentence_count", "hashtags", "mentions", "hashtag_count", "mention_count")
+
+
+def chunkings(text: str):
+    """Whole text, one character at a time and a few random splits"""
+    yield [text]
+    yield list(text)
+    rng = random.Random(text)
+    for _ in range(5):
+        cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(1, 8))))
+        yield [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+def assert_close(actual: float, expected: float):
+    assert (math.isnan(actual) and math.isnan(expected)) or actual == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_streamed_metrics_match_full_analysis(text):
+    expected = ContentAnalyzer.analyze_content(text, language="tr")
+
+    for chunks in chunkings(text):
+        analyzer = IncrementalAnalyzer()
+        for chunk in chunks:
+            analyzer.append(chunk)
+        metrics = analyzer.metrics()
+
+        assert {key: metrics[key] for key in COMPARED} == {key: expected[key] for key in COMPARED}, chunks
+        for key in ("avg_sentence_length", "readability_score", "readability_grade"):
+            assert_close(metrics[key], expected[key])
+
+
+def test_metrics_while_streaming_count_the_unfinished_word():
+    analyzer = IncrementalAnalyzer()
+    analyzer.append("Kahve #kah")
+
+    metrics = analyzer.append("")
+
+    assert metrics["word_count"] == 2
+    assert metrics["hashtags"] == ["#kah"]
+    assert analyzer.append("ve")["hashtags"] == ["#kahve"]
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from utils.client_registry import key_id
+from utils.rate_limiter import RateLimiter, RateLimitWaitTooLong, get_rate_limiter, get_rate_limiter_stats
+
+
+def test_reconcile_returns_unused_tokens():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000)
+    reservation = limiter.acquire(1000)
+    assert limiter.stats()["available_tokens"] == 5000
+
+    limiter.reconcile(reservation, 300)
+
+    assert limiter.stats()["available_tokens"] == pytest.approx(5700, abs=1)
+
+
+def test_reconcile_charges_usage_above_the_estimate():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000)
+    reservation = limiter.acquire(1000)
+
+    limiter.reconcile(reservation, 1500)
+
+    assert limiter.stats()["available_tokens"] == pytest.approx(4500, abs=1)
+
+
+def test_reconcile_is_applied_once():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000)
+    reservation = limiter.acquire(1000)
+
+    limiter.reconcile(reservation, 0)
+    limiter.reconcile(reservation, 0)
+
+    assert reservation.reconciled
+    assert limiter.stats()["available_tokens"] == pytest.approx(6000, abs=1)
+
+
+def test_queues_when_budget_is_spent():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000)
+    limiter.acquire(6000)
+
+    # 100 tokens refill per second, so 50 tokens are a half second away
+    reservation = asyncio.run(limiter.aacquire(50))
+
+    assert reservation.wait_time == pytest.approx(0.5, abs=0.05)
+    assert limiter.stats()["queued"] == 1
+
+
+def test_rejects_waits_longer_than_max_wait():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000, max_wait=1)
+    limiter.acquire(6000)
+
+    with pytest.raises(RateLimitWaitTooLong):
+        limiter.acquire(6000)
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_try_acquire_does_not_queue():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000)
+
+    assert limiter.try_acquire(1000).wait_time == 0
+    limiter.acquire(5000)
+
+    assert limiter.try_acquire(50) is None
+    assert limiter.stats()["admitted"] == 2
+
+
+def test_limiters_are_shared_per_key_and_model(rate_limiters):
+    limiter = get_rate_limiter("sk-limiter", "gpt-4")
+
+    assert get_rate_limiter("sk-limiter", "gpt-4") is limiter
+    assert get_rate_limiter("sk-limiter", "gpt-3.5-turbo") is not limiter
+    assert set(rate_limiters) == {(key_id("sk-limiter"), "gpt-4"), (key_id("sk-limiter"), "gpt-3.5-turbo")}
+    assert set(get_rate_limiter_stats()) == {f"{key_id('sk-limiter')}/gpt-4", f"{key_id('sk-limiter')}/gpt-3.5-turbo"}
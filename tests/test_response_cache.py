@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from utils.response_cache import ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time; advance by adding to clock[0]"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", {"content": "A"})
+    cache.set("b", {"content": "B"})
+
+    assert cache.get("a") == {"content": "A"}  # "b" is now the least recently used
+    cache.set("c", {"content": "C"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"content": "A"}
+    assert cache.get("c") == {"content": "C"}
+    assert cache.stats()["memory_entries"] == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResponseCache(ttl_seconds=60)
+    cache.set("a", {"content": "A"})
+
+    clock[0] += 59
+    assert cache.get("a") == {"content": "A"}
+
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert cache.stats()["memory_entries"] == 0
+
+
+def test_disk_tier_survives_memory_eviction(tmp_path):
+    cache = ResponseCache(max_entries=1, disk_dir=str(tmp_path))
+    cache.set("a", {"content": "A"})
+    cache.set("b", {"content": "B"})
+
+    assert cache.get("a") == {"content": "A"}
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_expired_disk_entries_are_removed(tmp_path, clock):
+    ResponseCache(ttl_seconds=60, disk_dir=str(tmp_path)).set("a", {"content": "A"})
+
+    clock[0] += 60
+    cache = ResponseCache(ttl_seconds=60, disk_dir=str(tmp_path))
+
+    assert cache.get("a") is None
+    assert cache.stats()["disk_entries"] == 0
+    assert not list(tmp_path.iterdir())
+
+
+def test_disk_tier_evicts_oldest_over_budget(tmp_path, clock):
+    probe = ResponseCache(disk_dir=str(tmp_path / "probe"))
+    probe.set("a", {"content": "A"})
+    entry_bytes = probe.stats()["disk_bytes"]
+
+    cache = ResponseCache(max_entries=1, disk_dir=str(tmp_path / "cache"), disk_max_bytes=2 * entry_bytes)
+    for key in ("a", "b", "c"):
+        cache.set(key, {"content": key.upper()})
+
+    assert cache.stats()["disk_entries"] == 2
+    assert cache.get("a") is None
+    assert cache.get("b") == {"content": "B"}
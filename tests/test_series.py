@@ -0,0 +1,53 @@
+import httpx
+import pytest
+
+from conftest import chat_completion, mock_openai_client
+from generators.social_media_generator import SocialMediaGenerator
+
+
+def series_generator(statuses):
+    """Generator whose calls are answered with the given HTTP statuses in turn"""
+    calls = []
+
+    def respond(request):
+        status = statuses[len(calls)]
+        calls.append(status)
+        if status == 200:
+            return httpx.Response(200, json=chat_completion("1/3 Kahve serisi başlıyor"))
+        return httpx.Response(status, json={"error": {"message": "boom"}})
+
+    generator = SocialMediaGenerator("sk-test", model="gpt-4")
+    generator.api_handler.client = mock_openai_client(respond)
+    generator.api_handler.retry_policy.max_retries = 0
+    return generator, calls
+
+
+def generate_post(generator):
+    return generator._generate_series_post(
+        "twitter", "kahve", ["Giriş", "Çekirdekler", "Demleme"], 1, "", 0.7, False, False
+    )
+
+
+def test_server_error_is_retried():
+    generator, calls = series_generator([500, 200])
+
+    result = generate_post(generator)
+
+    assert result["success"]
+    assert result["series_attempts"] == 2
+    assert calls == [500, 200]
+
+
+@pytest.mark.parametrize("status, error_type", [
+    (400, "general"),
+    (401, "authentication")
+])
+def test_permanent_error_is_not_retried(status, error_type):
+    generator, calls = series_generator([status, 200])
+
+    result = generate_post(generator)
+
+    assert not result["success"]
+    assert result["error_type"] == error_type
+    assert result["series_attempts"] == 1
+    assert calls == [status]
@@ -0,0 +1,74 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from conftest import chat_completion, mock_openai_client
+from utils.api_handler import APIHandler
+from utils.single_flight import get_single_flight
+
+
+def concurrent_calls(temperature: float, respond, **kwargs):
+    """Two identical generate_content calls from separate threads"""
+    handler = APIHandler("sk-test", model="gpt-4")
+    handler.client = mock_openai_client(respond)
+    handler.hedging = False
+
+    def call():
+        return handler.generate_content("Kahve hakkında bir gönderi", max_tokens=50, temperature=temperature, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        return list(executor.map(lambda _: call(), range(2)))
+
+
+def test_sampled_requests_are_not_coalesced():
+    both_in_flight = threading.Barrier(2, timeout=5)
+    requests = []
+
+    def respond(request):
+        requests.append(request)
+        # Breaks (and fails the call) unless both callers reach the API
+        both_in_flight.wait()
+        return httpx.Response(200, json=chat_completion(f"Gönderi {len(requests)}"))
+
+    results = concurrent_calls(0.9, respond)
+
+    assert len(requests) == 2
+    assert all(result["success"] and not result.get("coalesced") for result in results)
+
+
+def wait_for_follower(followers: int):
+    deadline = time.time() + 5
+    while get_single_flight().stats()["followers"] <= followers and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_deterministic_requests_are_coalesced():
+    followers = get_single_flight().stats()["followers"]
+    requests = []
+
+    def respond(request):
+        requests.append(request)
+        wait_for_follower(followers)
+        return httpx.Response(200, json=chat_completion("Gönderi"))
+
+    results = concurrent_calls(0, respond)
+
+    assert len(requests) == 1
+    assert sorted(bool(result.get("coalesced")) for result in results) == [False, True]
+
+
+def test_sampled_requests_can_opt_in():
+    followers = get_single_flight().stats()["followers"]
+    requests = []
+
+    def respond(request):
+        requests.append(request)
+        wait_for_follower(followers)
+        return httpx.Response(200, json=chat_completion("Gönderi"))
+
+    results = concurrent_calls(0.9, respond, coalesce=True)
+
+    assert len(requests) == 1
+    assert sum(bool(result.get("coalesced")) for result in results) == 1
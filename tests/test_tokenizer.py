@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+from utils import tokenizer
+from utils.tokenizer import EncodingLoader
+
+
+class FlakyFetch:
+    """Stands in for the tiktoken download: fails a number of times, then succeeds"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, model):
+        self.calls += 1
+        self.release.wait(5)
+        if self.calls <= self.failures:
+            raise ConnectionError("offline")
+        return f"encoding:{model}"
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    if tokenizer.tiktoken is None:
+        monkeypatch.setattr(tokenizer, "tiktoken", object())
+    return EncodingLoader(retry_seconds=0.05, retry_max_seconds=1)
+
+
+def test_failed_download_is_retried_after_backoff(loader, monkeypatch):
+    fetch = FlakyFetch(failures=1)
+    monkeypatch.setattr(loader, "_fetch", fetch)
+
+    assert loader.get("gpt-4") is None
+    # Within the backoff the estimate is used without trying again
+    assert loader.get("gpt-4") is None
+    assert fetch.calls == 1
+
+    time.sleep(0.06)
+    assert loader.get("gpt-4") == "encoding:gpt-4"
+    assert loader.get("gpt-4") == "encoding:gpt-4"
+    assert fetch.calls == 2
+
+
+def test_backoff_doubles_per_failure(loader, monkeypatch):
+    monkeypatch.setattr(loader, "_fetch", FlakyFetch(failures=3))
+
+    for _ in range(3):
+        loader._retry_at.clear()
+        loader.get("gpt-4")
+
+    assert loader._retry_at["gpt-4"] - time.monotonic() == pytest.approx(0.2, abs=0.05)
+
+
+def test_requests_do_not_wait_for_a_warming_download(loader, monkeypatch):
+    fetch = FlakyFetch(failures=0)
+    fetch.release.clear()
+    monkeypatch.setattr(loader, "_fetch", fetch)
+
+    loader.warm(["gpt-4"])
+    while fetch.calls == 0:
+        time.sleep(0.01)
+
+    started_at = time.time()
+    assert loader.get("gpt-4") is None
+    assert time.time() - started_at < 0.5
+
+    fetch.release.set()
+    deadline = time.time() + 5
+    while loader.get("gpt-4") is None and time.time() < deadline:
+        time.sleep(0.01)
+    assert loader.get("gpt-4") == "encoding:gpt-4"
+    assert fetch.calls == 1
@@ -0,0 +1,73 @@
+import httpx
+
+from conftest import chat_completion
+from utils.api_handler import AsyncAPIHandler
+from utils.client_registry import get_client_registry
+from utils.usage_ledger import UsageLedger, get_usage_ledger
+
+
+def record(ledger: UsageLedger, **overrides):
+    entry = {
+        "key_id": "key-a",
+        "model": "gpt-4",
+        "generator": "SocialMediaGenerator",
+        "prompt_tokens": 100,
+        "completion_tokens": 50,
+        "cached_tokens": 0,
+        "latency": 1.0,
+        "cost": 0.01
+    }
+    entry.update(overrides)
+    return ledger.record(**entry)
+
+
+def test_rollups_and_filters():
+    ledger = UsageLedger()
+    record(ledger)
+    record(ledger, generator="EmailGenerator", cost=0.02)
+    record(ledger, key_id="key-b", generator=None)
+
+    assert ledger.summary()["calls"] == 3
+    assert ledger.summary(key_id="key-a")["cost"] == 0.03
+    assert set(ledger.rollup("generator")) == {"SocialMediaGenerator", "EmailGenerator", "direct"}
+
+
+def test_rollups_filtered_by_key():
+    ledger = UsageLedger()
+    record(ledger)
+    record(ledger, model="gpt-3.5-turbo", generator="EmailGenerator")
+    record(ledger, key_id="key-b", cost=0.05)
+
+    assert set(ledger.rollup("model", key_id="key-a")) == {"gpt-4", "gpt-3.5-turbo"}
+    assert ledger.rollup("model", key_id="key-a")["gpt-4"]["cost"] == 0.01
+    assert ledger.rollup("generator", key_id="key-b") == {
+        "SocialMediaGenerator": ledger.summary(key_id="key-b")
+    }
+    assert ledger.rollup("model", key_id="key-c") == {}
+
+
+def test_replays_entries_from_disk(tmp_path):
+    path = str(tmp_path / "usage.jsonl")
+    record(UsageLedger(path), prompt_tokens=7)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"torn": ')
+
+    assert UsageLedger(path).summary()["prompt_tokens"] == 7
+
+
+def test_async_handler_attributes_spend_to_its_generator(monkeypatch):
+    def respond(request):
+        return httpx.Response(200, json=chat_completion("Merhaba"))
+
+    monkeypatch.setattr(
+        get_client_registry(),
+        "get_async_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(respond))
+    )
+
+    handler = AsyncAPIHandler("sk-ledger", model="gpt-4", generator="EmailGenerator")
+    handler.gather_generate([{"prompt": "Test", "max_tokens": 20, "bypass_cache": True}])
+
+    assert get_usage_ledger().rollup("generator") == {
+        "EmailGenerator": get_usage_ledger().summary(generator="EmailGenerator")
+    }